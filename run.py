@@ -1,14 +1,20 @@
+import typing
+
 import click
 
 import src.configs as conf_geral
 from src.aquisicao.executa import executa_etl
+from src.aquisicao.executa import executa_etl_censo_escolar
 from src.aquisicao.executa import executa_etl_microdado_inep
 from src.aquisicao.opcoes import ETL
 from src.aquisicao.opcoes import MicroINEPETL
 from src.datamart.config import DMGran
 from src.datamart.executa import executa_datamart
+from src.io.configs import MOTORES_CSV
 from src.io.data_store import DataStore
+from src.utils.info import compila_info
 from src.utils.logs import configura_logs
+from src.utils.paralelo import POOLS
 
 
 @click.group()
@@ -16,6 +22,17 @@ def cli():
     pass
 
 
+@cli.command()
+def compila_configuracoes() -> None:
+    """
+    Compila os arquivos yaml e excel de configuração da pasta info,
+    que são recompilados automaticamente quando modificados
+    """
+    configura_logs()
+    for nome in compila_info():
+        click.echo(f"Compilado {nome}")
+
+
 @cli.group()
 def aquisicao():
     """
@@ -41,7 +58,14 @@ def aquisicao():
     default=conf_geral.ENV_DS,
     help="String com caminho para pasta de entrada",
 )
-def processa_dado(etl: str, criar_caminho: bool, reprocessar: bool, env: str) -> None:
+@click.option(
+    "--estagio",
+    is_flag=True,
+    help="Flag indicando se devemos reutilizar a cópia em parquet dos dados lidos",
+)
+def processa_dado(
+    etl: str, criar_caminho: bool, reprocessar: bool, env: str, estagio: bool
+) -> None:
     """
     Executa o pipeline de ETL de uma determinada fonte
 
@@ -49,10 +73,17 @@ def processa_dado(etl: str, criar_caminho: bool, reprocessar: bool, env: str) ->
     :param criar_caminho: flag indicando se devemos criar os caminhos
     :param reprocessar: flag indicando se devemos reprocessar a base
     :param env: ambiente do data store
+    :param estagio: flag indicando se devemos reutilizar a cópia em parquet dos dados lidos
     """
     configura_logs()
     ds = DataStore(env)
-    executa_etl(etl=etl, ds=ds, criar_caminho=criar_caminho, reprocessar=reprocessar)
+    executa_etl(
+        etl=etl,
+        ds=ds,
+        criar_caminho=criar_caminho,
+        reprocessar=reprocessar,
+        usar_estagio=estagio,
+    )
 
 
 @aquisicao.command()
@@ -78,8 +109,99 @@ def processa_dado(etl: str, criar_caminho: bool, reprocessar: bool, env: str) ->
     default=conf_geral.ENV_DS,
     help="String com caminho para pasta de entrada",
 )
+@click.option(
+    "--tamanho_bloco",
+    type=click.INT,
+    default=None,
+    help="Número de linhas por bloco para processar os dados em blocos",
+)
+@click.option(
+    "--estagio",
+    is_flag=True,
+    help="Flag indicando se devemos reutilizar a cópia em parquet dos dados lidos",
+)
+@click.option(
+    "--reduzir_tipos",
+    is_flag=True,
+    help="Flag indicando se devemos reduzir os tipos das colunas numéricas de saída",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Flag indicando se devemos utilizar apenas os arquivos do INEP já baixados",
+)
+@click.option(
+    "--validade_links",
+    type=click.INT,
+    default=None,
+    help="Horas pelas quais o índice de links da página do INEP é reaproveitado",
+)
+@click.option(
+    "--max_trabalhadores",
+    type=click.INT,
+    default=1,
+    help="Número máximo de regiões da matrícula processadas ao mesmo tempo",
+)
+@click.option(
+    "--memoria_trabalhador",
+    type=click.INT,
+    default=None,
+    help="Memória, em MB, reservada para o processamento de cada região da matrícula",
+)
+@click.option(
+    "--limite_memoria_regiao",
+    type=click.INT,
+    default=None,
+    help="Memória, em MB, acima da qual uma região da matrícula é processada em blocos",
+)
+@click.option(
+    "--motor_csv",
+    type=click.Choice(sorted(MOTORES_CSV)),
+    default="pandas",
+    help="Motor de leitura dos arquivos csv",
+)
+@click.option(
+    "--texto_arrow",
+    is_flag=True,
+    help="Flag indicando se devemos manter as colunas de texto nos buffers do arrow",
+)
+@click.option(
+    "--max_leitores",
+    type=click.INT,
+    default=1,
+    help="Número máximo de arquivos de um mesmo zip lidos ao mesmo tempo",
+)
+@click.option(
+    "--pool_leitura",
+    type=click.Choice(sorted(POOLS)),
+    default="thread",
+    help="Tipo de pool utilizado na leitura paralela dos arquivos de um zip",
+)
+@click.option(
+    "--limite_memoria_leitura",
+    type=click.INT,
+    default=None,
+    help="Memória máxima, em MB, estimada para os arquivos de um zip em leitura",
+)
 def processa_microdado_inep(
-    etl: str, ano: str, criar_caminho: bool, reprocessar: bool, env: str
+    etl: str,
+    ano: str,
+    criar_caminho: bool,
+    reprocessar: bool,
+    env: str,
+    tamanho_bloco: typing.Optional[int],
+    estagio: bool,
+    reduzir_tipos: bool,
+    offline: bool,
+    validade_links: typing.Optional[int],
+    max_trabalhadores: int,
+    memoria_trabalhador: typing.Optional[int],
+    limite_memoria_regiao: typing.Optional[int],
+    motor_csv: str,
+    texto_arrow: bool,
+    max_leitores: int,
+    pool_leitura: str,
+    limite_memoria_leitura: typing.Optional[int],
 ) -> None:
     """
     Executa o pipeline de ETL de uma determinada base de Microdados do INEP
@@ -89,11 +211,204 @@ def processa_microdado_inep(
     :param criar_caminho: flag indicando se devemos criar os caminhos
     :param reprocessar: flag indicando se devemos reprocessar a base
     :param env: ambiente do data store
+    :param tamanho_bloco: número de linhas por bloco para processar os dados em blocos
+    :param estagio: flag indicando se devemos reutilizar a cópia em parquet dos dados lidos
+    :param reduzir_tipos: flag indicando se devemos reduzir os tipos das colunas numéricas
+    :param offline: flag indicando se devemos utilizar apenas os arquivos já baixados
+    :param validade_links: horas pelas quais o índice de links da página do INEP é reaproveitado
+    :param max_trabalhadores: número máximo de regiões da matrícula processadas ao mesmo tempo
+    :param memoria_trabalhador: memória, em MB, reservada para cada região da matrícula
+    :param limite_memoria_regiao: memória, em MB, acima da qual uma região da matrícula
+    é processada em blocos
+    :param motor_csv: motor de leitura dos arquivos csv (pandas ou pyarrow)
+    :param texto_arrow: flag indicando se devemos manter as colunas de texto nos
+    buffers do arrow
+    :param max_leitores: número máximo de arquivos de um mesmo zip lidos ao mesmo tempo
+    :param pool_leitura: tipo de pool utilizado na leitura paralela (thread ou processo)
+    :param limite_memoria_leitura: memória máxima, em MB, estimada para os arquivos
+    de um zip em leitura
     """
     configura_logs()
-    ds = DataStore(env)
+    ds = DataStore(
+        env,
+        motor_csv=motor_csv,
+        texto_arrow=texto_arrow,
+        max_leitores=max_leitores,
+        pool_leitura=pool_leitura,
+        limite_memoria_leitura=(
+            None if limite_memoria_leitura is None else limite_memoria_leitura * 2**20
+        ),
+    )
     executa_etl_microdado_inep(
-        etl=etl, ds=ds, ano=ano, criar_caminho=criar_caminho, reprocessar=reprocessar
+        etl=etl,
+        ds=ds,
+        ano=ano,
+        criar_caminho=criar_caminho,
+        reprocessar=reprocessar,
+        tamanho_bloco=tamanho_bloco,
+        usar_estagio=estagio,
+        reduzir_tipos=reduzir_tipos,
+        offline=offline,
+        validade_links=None if validade_links is None else validade_links * 3600,
+        max_trabalhadores=max_trabalhadores,
+        memoria_trabalhador=(
+            None if memoria_trabalhador is None else memoria_trabalhador * 2**20
+        ),
+        limite_memoria_regiao=(
+            None if limite_memoria_regiao is None else limite_memoria_regiao * 2**20
+        ),
+    )
+
+
+@aquisicao.command()
+@click.option(
+    "--ano",
+    type=click.STRING,
+    default="ultimo",
+    help="Ano dos dados a serem processados (pode ser int ou 'ultimo')",
+)
+@click.option(
+    "--criar_caminho", default=True, help="Flag indicando se devemos criar os caminhos"
+)
+@click.option(
+    "--reprocessar", is_flag=True, help="Flag indicando se devemos reprocessar a base"
+)
+@click.option(
+    "--env",
+    default=conf_geral.ENV_DS,
+    help="String com caminho para pasta de entrada",
+)
+@click.option(
+    "--tamanho_bloco",
+    type=click.INT,
+    default=None,
+    help="Número de linhas por bloco para processar os dados em blocos",
+)
+@click.option(
+    "--estagio",
+    is_flag=True,
+    help="Flag indicando se devemos reutilizar a cópia em parquet dos dados lidos",
+)
+@click.option(
+    "--reduzir_tipos",
+    is_flag=True,
+    help="Flag indicando se devemos reduzir os tipos das colunas numéricas de saída",
+)
+@click.option(
+    "--offline",
+    is_flag=True,
+    help="Flag indicando se devemos utilizar apenas os arquivos do INEP já baixados",
+)
+@click.option(
+    "--validade_links",
+    type=click.INT,
+    default=None,
+    help="Horas pelas quais o índice de links da página do INEP é reaproveitado",
+)
+@click.option(
+    "--max_trabalhadores",
+    type=click.INT,
+    default=1,
+    help="Número máximo de tabelas processadas ao mesmo tempo",
+)
+@click.option(
+    "--limite_memoria",
+    type=click.INT,
+    default=None,
+    help="Memória máxima, em MB, estimada para as tabelas em processamento",
+)
+@click.option(
+    "--motor_csv",
+    type=click.Choice(sorted(MOTORES_CSV)),
+    default="pandas",
+    help="Motor de leitura dos arquivos csv",
+)
+@click.option(
+    "--texto_arrow",
+    is_flag=True,
+    help="Flag indicando se devemos manter as colunas de texto nos buffers do arrow",
+)
+@click.option(
+    "--max_leitores",
+    type=click.INT,
+    default=1,
+    help="Número máximo de arquivos de um mesmo zip lidos ao mesmo tempo",
+)
+@click.option(
+    "--pool_leitura",
+    type=click.Choice(sorted(POOLS)),
+    default="thread",
+    help="Tipo de pool utilizado na leitura paralela dos arquivos de um zip",
+)
+@click.option(
+    "--limite_memoria_leitura",
+    type=click.INT,
+    default=None,
+    help="Memória máxima, em MB, estimada para os arquivos de um zip em leitura",
+)
+def processa_censo_escolar(
+    ano: str,
+    criar_caminho: bool,
+    reprocessar: bool,
+    env: str,
+    tamanho_bloco: typing.Optional[int],
+    estagio: bool,
+    reduzir_tipos: bool,
+    offline: bool,
+    validade_links: typing.Optional[int],
+    max_trabalhadores: int,
+    limite_memoria: typing.Optional[int],
+    motor_csv: str,
+    texto_arrow: bool,
+    max_leitores: int,
+    pool_leitura: str,
+    limite_memoria_leitura: typing.Optional[int],
+) -> None:
+    """
+    Executa o pipeline de ETL de todas as tabelas do censo escolar de um ano
+
+    :param ano: Ano dos dados a serem processados (pode ser int ou 'ultimo')
+    :param criar_caminho: flag indicando se devemos criar os caminhos
+    :param reprocessar: flag indicando se devemos reprocessar a base
+    :param env: ambiente do data store
+    :param tamanho_bloco: número de linhas por bloco para processar os dados em blocos
+    :param estagio: flag indicando se devemos reutilizar a cópia em parquet dos dados lidos
+    :param reduzir_tipos: flag indicando se devemos reduzir os tipos das colunas numéricas
+    :param offline: flag indicando se devemos utilizar apenas os arquivos já baixados
+    :param validade_links: horas pelas quais o índice de links da página do INEP é reaproveitado
+    :param max_trabalhadores: número máximo de tabelas processadas ao mesmo tempo
+    :param limite_memoria: memória máxima, em MB, estimada para as tabelas em processamento
+    :param motor_csv: motor de leitura dos arquivos csv (pandas ou pyarrow)
+    :param texto_arrow: flag indicando se devemos manter as colunas de texto nos
+    buffers do arrow
+    :param max_leitores: número máximo de arquivos de um mesmo zip lidos ao mesmo tempo
+    :param pool_leitura: tipo de pool utilizado na leitura paralela (thread ou processo)
+    :param limite_memoria_leitura: memória máxima, em MB, estimada para os arquivos
+    de um zip em leitura
+    """
+    configura_logs()
+    ds = DataStore(
+        env,
+        motor_csv=motor_csv,
+        texto_arrow=texto_arrow,
+        max_leitores=max_leitores,
+        pool_leitura=pool_leitura,
+        limite_memoria_leitura=(
+            None if limite_memoria_leitura is None else limite_memoria_leitura * 2**20
+        ),
+    )
+    executa_etl_censo_escolar(
+        ds=ds,
+        ano=ano,
+        criar_caminho=criar_caminho,
+        reprocessar=reprocessar,
+        tamanho_bloco=tamanho_bloco,
+        usar_estagio=estagio,
+        reduzir_tipos=reduzir_tipos,
+        offline=offline,
+        validade_links=None if validade_links is None else validade_links * 3600,
+        max_trabalhadores=max_trabalhadores,
+        limite_memoria=None if limite_memoria is None else limite_memoria * 2**20,
     )
 
 
@@ -122,7 +437,20 @@ def datamart():
     default=conf_geral.ENV_DS,
     help="String com caminho para pasta de entrada",
 )
-def processa_datamart(granularidade: str, ano: str, env: str) -> None:
+@click.option(
+    "--motor_csv",
+    type=click.Choice(sorted(MOTORES_CSV)),
+    default="pandas",
+    help="Motor de leitura dos arquivos csv",
+)
+@click.option(
+    "--texto_arrow",
+    is_flag=True,
+    help="Flag indicando se devemos manter as colunas de texto nos buffers do arrow",
+)
+def processa_datamart(
+    granularidade: str, ano: str, env: str, motor_csv: str, texto_arrow: bool
+) -> None:
     """
     Constrói um datamart a um determinado nível de granularidade para um
     dado ano de dados
@@ -130,9 +458,12 @@ def processa_datamart(granularidade: str, ano: str, env: str) -> None:
     :param granularidade: nível do datamart a ser gerado
     :param ano: Ano dos dados a serem processados (pode ser int ou 'ultimo')
     :param env: ambiente do data store
+    :param motor_csv: motor de leitura dos arquivos csv (pandas ou pyarrow)
+    :param texto_arrow: flag indicando se devemos manter as colunas de texto nos
+    buffers do arrow
     """
     configura_logs()
-    ds = DataStore(env)
+    ds = DataStore(env, motor_csv=motor_csv, texto_arrow=texto_arrow)
     executa_datamart(granularidade, ds, ano)
 
 
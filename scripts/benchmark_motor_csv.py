@@ -0,0 +1,84 @@
+"""
+Compara o tempo de leitura dos arquivos do censo escolar contidos nos
+dados de teste utilizando o motor de leitura de csv do pandas e do pyarrow
+
+Execução a partir da raíz do projeto:
+
+    python scripts/benchmark_motor_csv.py
+"""
+import os
+import sys
+import time
+import typing
+from pathlib import Path
+
+sys.path.append(str(Path(os.path.dirname(__file__)).parent))
+
+from src.aquisicao import DocenteETL  # noqa: E402
+from src.aquisicao import EscolaETL  # noqa: E402
+from src.aquisicao import GestorETL  # noqa: E402
+from src.aquisicao import TurmaETL  # noqa: E402
+from src.aquisicao.inep.censo_matricula import _MatriculaRegiaoETL  # noqa: E402
+from src.configs import COLECAO_DADOS_WEB  # noqa: E402
+from src.io.data_store import Colecao  # noqa: E402
+from src.io.data_store import DataStore  # noqa: E402
+from src.io.data_store import Documento  # noqa: E402
+from src.io.configs import MOTORES_CSV  # noqa: E402
+
+
+def mede_leitura(
+    ds: DataStore, censo: Documento, conf: typing.Dict[str, typing.Any], motor: str
+) -> float:
+    """
+    Mede o menor tempo de leitura de um documento em 3 execuções
+
+    :param ds: instância de objeto data store
+    :param censo: documento do censo escolar
+    :param conf: configurações de leitura
+    :param motor: motor de leitura de arquivos csv
+    :return: tempo de leitura em segundos
+    """
+    tempos = list()
+    for _ in range(3):
+        inicio = time.perf_counter()
+        ds.carrega_como_objeto(censo, motor_csv=motor, **conf)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main() -> None:
+    ds = DataStore("teste")
+    colecao = Colecao(ds, COLECAO_DADOS_WEB, "censo_escolar")
+
+    motores = sorted(MOTORES_CSV)
+    print(f"{'ARQUIVO':<10}{'TABELA':<12}" + "".join(f"{m:>10}" for m in motores))
+    for censo in sorted(colecao, key=lambda d: d.nome):
+        ano = int(censo.nome[:4])
+        for tabela, gera_etl in [
+            ("escola", lambda: EscolaETL(ds, ano=ano)),
+            ("turma", lambda: TurmaETL(ds, ano=ano)),
+            ("docente", lambda: DocenteETL(ds, ano=ano)),
+            ("gestor", lambda: GestorETL(ds, ano=ano)),
+            ("matricula", lambda: _MatriculaRegiaoETL(ds, regiao="SUDESTE", ano=ano)),
+        ]:
+            try:
+                etl = gera_etl()
+                conf = dict(
+                    como_df=True,
+                    padrao_comp=etl.padrao_comp,
+                    sep="|",
+                    encoding="latin-1",
+                    usecols=etl._carrega_cols,
+                    dtype=etl._dtype,
+                )
+                tempos = [mede_leitura(ds, censo, conf, m) for m in motores]
+            except Exception as e:
+                print(f"{censo.nome:<10}{tabela:<12}  erro: {e}")
+                continue
+            print(
+                f"{censo.nome:<10}{tabela:<12}" + "".join(f"{t:>10.4f}" for t in tempos)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,14 @@ SCRIPT_DIR="$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 PROJ_DIR="$(dirname "$SCRIPT_DIR")"
 cd "$PROJ_DIR" || exit
 
-# cria as variáveis de ano de início e de fim e
-# a lista de bases a serem processadas
+# cria as variáveis de ano de início e de fim
 anoi=2007
 anof=$(date +%Y)
 anof=$((anof - 1))
-bases='escola turma gestor docente matricula'
 
-# gera o for loop de execução do comando de processamento de dados
+# gera o for loop de execução do comando de processamento de dados,
+# processando todas as tabelas de um ano a partir de uma única leitura
 for ano in $(seq $anoi $anof)
 do
-  for base in $bases
-  do
-    python run.py aquisicao processa-microdado-inep --etl $base --ano "$ano" --reprocessar
-  done
-done
\ No newline at end of file
+  python run.py aquisicao processa-censo-escolar --ano "$ano" --reprocessar --estagio
+done
@@ -1,3 +1,4 @@
+from .inep.censo_ano import CensoEscolarETL
 from .inep.censo_docente import DocenteETL
 from .inep.censo_escola import EscolaETL
 from .inep.censo_gestor import GestorETL
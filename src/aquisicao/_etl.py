@@ -1,13 +1,30 @@
 import abc
+import hashlib
+import importlib
+import inspect
 import logging
 import tempfile
+import threading
 import typing
+from urllib.parse import urlparse
+
+from tqdm import tqdm
 
 from src.io.caminho import CaminhoLocal
 from src.io.caminho import obtem_objeto_caminho
 from src.io.data_store import DataStore
 from src.io.data_store import Documento
-from src.utils.web import download_dados_web
+from src.utils.paralelo import executa_com_limite_grupo
+from src.utils.web import MAX_DOWNLOADS
+from src.utils.web import MAX_DOWNLOADS_HOST
+from src.utils.web import download_em_segmentos
+
+# cache de versões do código por classe de ETL
+_CACHE_VERSOES: typing.Dict[type, str] = dict()
+
+# módulos que determinam como os dados são lidos e escritos e, portanto,
+# compõem a versão do código de qualquer ETL
+MODULOS_CODIGO = ["src.io.le_dados", "src.io.escreve_dados"]
 
 
 class BaseETL(abc.ABC):
@@ -23,6 +40,9 @@ class BaseETL(abc.ABC):
     _dados_saida: typing.List[Documento]
     _logger: logging.Logger
 
+    # módulos auxiliares cujo código também compõe a versão do ETL
+    _modulos_codigo: typing.List[str] = []
+
     def __init__(
         self,
         ds: DataStore,
@@ -76,19 +96,121 @@ class BaseETL(abc.ABC):
         """
         raise NotImplementedError("Você deve implementar o método para a classe filha")
 
-    def download_conteudo(self) -> None:
+    def baixa_documento(
+        self,
+        doc: Documento,
+        link: str,
+        progresso: typing.Optional[tqdm] = None,
+        conexoes: typing.Optional[threading.Semaphore] = None,
+    ) -> None:
+        """
+        Realiza o download de um documento de algum local remoto
+
+        :param doc: documento a ser baixado
+        :param link: endereço do documento
+        :param progresso: barra de progresso compartilhada com outros downloads
+        :param conexoes: semáforo de conexões compartilhado com os downloads
+        do mesmo servidor
+        """
+        cam = self._ds.gera_caminho(doc, criar_caminho=self._criar_caminho)
+        if isinstance(cam, CaminhoLocal):
+            download_em_segmentos(
+                cam.obtem_caminho(doc.nome),
+                link,
+                progresso=progresso,
+                conexoes=conexoes,
+            )
+        else:
+            with tempfile.TemporaryDirectory() as temp:
+                cam2 = obtem_objeto_caminho(temp)
+                download_em_segmentos(
+                    cam2.obtem_caminho(doc.nome),
+                    link,
+                    progresso=progresso,
+                    conexoes=conexoes,
+                )
+                cam2.copia_conteudo(doc.nome, cam)
+
+    def _tenta_baixar_documento(
+        self,
+        doc: Documento,
+        link: str,
+        progresso: tqdm,
+        conexoes: threading.Semaphore,
+    ) -> typing.Optional[Exception]:
+        """
+        Realiza o download de um documento devolvendo o erro ao invés de
+        levantá-lo, de forma que a falha de um download não interrompa os
+        demais downloads simultâneos
+
+        :param doc: documento a ser baixado
+        :param link: endereço do documento
+        :param progresso: barra de progresso compartilhada com outros downloads
+        :param conexoes: semáforo de conexões compartilhado com os downloads
+        do mesmo servidor
+        :return: erro ocorrido no download, caso exista
+        """
+        try:
+            self.baixa_documento(doc, link, progresso, conexoes)
+        except Exception as e:
+            return e
+        return None
+
+    def download_conteudo(
+        self,
+        max_trabalhadores: int = MAX_DOWNLOADS,
+        max_por_host: int = MAX_DOWNLOADS_HOST,
+    ) -> None:
         """
         Realiza o download dos dados de algum local remoto
+
+        Por padrão, havendo mais de um documento a ser baixado, os downloads
+        são feitos em paralelo (max_trabalhadores igual a 1 mantém o download
+        em série). O limite por servidor vale para o total de conexões abertas,
+        uma vez que os segmentos de todos os documentos de um mesmo servidor
+        compartilham um único semáforo. Os documentos cujo download falhar em
+        paralelo são baixados novamente em série
+
+        :param max_trabalhadores: número máximo de documentos baixados ao
+        mesmo tempo (1 baixa os documentos em série)
+        :param max_por_host: número máximo de conexões simultâneas a um
+        mesmo servidor
         """
-        for doc, link in self.dicionario_para_baixar().items():
-            cam = self._ds.gera_caminho(doc)
-            if isinstance(cam, CaminhoLocal):
-                download_dados_web(cam.obtem_caminho(doc.nome), link)
-            else:
-                with tempfile.TemporaryDirectory() as temp:
-                    cam2 = obtem_objeto_caminho(temp)
-                    download_dados_web(cam2.obtem_caminho(doc.nome), link)
-                    cam2.copia_conteudo(doc.nome, cam)
+        para_baixar = self.dicionario_para_baixar()
+        hosts = {doc: urlparse(link).netloc for doc, link in para_baixar.items()}
+        conexoes = {
+            host: threading.BoundedSemaphore(max_por_host)
+            for host in set(hosts.values())
+        }
+
+        if max_trabalhadores > 1 and len(para_baixar) > 1:
+            self._logger.info(
+                f"Baixando {len(para_baixar)} documentos em paralelo, com até "
+                f"{max_por_host} conexões por servidor"
+            )
+            with tqdm(total=0, unit="iB", unit_scale=True) as progresso:
+                erros = executa_com_limite_grupo(
+                    self._tenta_baixar_documento,
+                    {
+                        doc: (doc, link, progresso, conexoes[hosts[doc]])
+                        for doc, link in para_baixar.items()
+                    },
+                    hosts,
+                    max_trabalhadores,
+                    max_por_host,
+                )
+            for doc, erro in erros.items():
+                if erro is not None:
+                    self._logger.warning(
+                        f"O download de {doc} falhou em paralelo ({erro}), "
+                        f"tentando novamente em série"
+                    )
+            para_baixar = {
+                doc: link for doc, link in para_baixar.items() if erros[doc] is not None
+            }
+
+        for doc, link in para_baixar.items():
+            self.baixa_documento(doc, link, conexoes=conexoes[hosts[doc]])
 
     @property
     def dados_entrada(self) -> typing.List[Documento]:
@@ -134,14 +256,95 @@ class BaseETL(abc.ABC):
         for doc in self.dados_saida:
             self._ds.salva_documento(doc)
 
+    @property
+    def documentos_manifesto(self) -> typing.List[Documento]:
+        """
+        Gera a lista de documentos de manifesto, salvos junto aos dados
+        de saída com a assinatura das entradas que os geraram
+
+        :return: lista de documentos de manifesto
+        """
+        return []
+
+    def versao_codigo(self) -> str:
+        """
+        Calcula a versão do código do ETL como o hash dos arquivos fonte
+        das classes que compõem o objeto, dos módulos de leitura e escrita
+        e dos módulos auxiliares declarados por cada classe
+
+        :return: hash hexadecimal dos arquivos fonte
+        """
+        global _CACHE_VERSOES
+
+        classe = type(self)
+        if classe not in _CACHE_VERSOES:
+            classes = [c for c in classe.__mro__ if c.__module__.split(".")[0] == "src"]
+            modulos = MODULOS_CODIGO + [
+                m for c in classes for m in c.__dict__.get("_modulos_codigo", [])
+            ]
+            arquivos = set(
+                [inspect.getfile(c) for c in classes]
+                + [inspect.getfile(importlib.import_module(m)) for m in modulos]
+            )
+            sha = hashlib.sha1()
+            for arquivo in sorted(arquivos):
+                with open(arquivo, "rb") as f:
+                    sha.update(f.read())
+            _CACHE_VERSOES[classe] = sha.hexdigest()
+        return _CACHE_VERSOES[classe]
+
+    def assinatura(self) -> typing.Union[typing.Dict[str, str], None]:
+        """
+        Gera a assinatura das entradas do ETL, que é comparada contra os
+        manifestos dos dados de saída para decidir se o ETL deve ser
+        executado novamente
+
+        :return: dicionário com os hashes das entradas ou None caso o ETL
+        não utilize manifestos
+        """
+        return None
+
+    def atualizado(self) -> bool:
+        """
+        Verifica se os dados de saída já foram gerados e, caso o ETL
+        utilize manifestos, se eles foram gerados a partir das mesmas
+        entradas, configurações e versão do código, de acordo com os
+        manifestos salvos na partição de cada dado de saída
+
+        :return: True se o ETL não precisar ser executado
+        """
+        if self._reprocessar:
+            return False
+
+        # sem manifestos verificamos apenas a existência dos dados de saída
+        assinatura = self.assinatura()
+        if assinatura is None or len(self.documentos_manifesto) == 0:
+            return all([doc.exists() for doc in self.documentos_saida])
+
+        # os manifestos são salvos apenas depois dos dados de saída
+        for doc in self.documentos_manifesto:
+            if not doc.exists() or self._ds.carrega_como_objeto(doc) != assinatura:
+                self._logger.info(f"As entradas de {doc} foram alteradas")
+                return False
+        return True
+
+    def salva_manifestos(self) -> None:
+        """
+        Salva a assinatura das entradas do ETL nos manifestos dos dados de saída
+        """
+        assinatura = self.assinatura()
+        if assinatura is None:
+            return
+
+        for doc in self.documentos_manifesto:
+            doc.data = assinatura
+            self._ds.salva_documento(doc)
+
     def pipeline(self) -> None:
         """
         Executa o pipeline completo de tratamento de dados
         """
-        if (
-            all([doc.exists() for doc in self.documentos_saida])
-            and not self._reprocessar
-        ):
+        if self.atualizado():
             self._logger.info(f"DADOS DE {self} JÁ FORAM PROCESSADOS")
             return
 
@@ -153,3 +356,4 @@ class BaseETL(abc.ABC):
 
         self._logger.info(f"CARREGANDO DADOS {self}")
         self.load()
+        self.salva_manifestos()
@@ -1,3 +1,6 @@
+import typing
+
+from src.aquisicao import CensoEscolarETL
 from src.aquisicao.opcoes import ETL
 from src.aquisicao.opcoes import ETL_DICT
 from src.aquisicao.opcoes import MD_INEP_DICT
@@ -8,7 +11,11 @@ from src.utils.logs import log_erros
 
 @log_erros
 def executa_etl(
-    etl: str, ds: DataStore, criar_caminho: bool, reprocessar: bool
+    etl: str,
+    ds: DataStore,
+    criar_caminho: bool,
+    reprocessar: bool,
+    usar_estagio: bool = False,
 ) -> None:
     """
     Executa o pipeline de ETL de uma determinada fonte
@@ -17,16 +24,33 @@ def executa_etl(
     :param ds: instância de objeto data store
     :param criar_caminho: flag indicando se devemos criar os caminhos
     :param reprocessar: flag indicando se devemos reprocessar a base
+    :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+    arquivos de entrada já lidos
     """
     objeto = ETL_DICT[ETL(etl)](
-        ds=ds, criar_caminho=criar_caminho, reprocessar=reprocessar
+        ds=ds,
+        criar_caminho=criar_caminho,
+        reprocessar=reprocessar,
+        usar_estagio=usar_estagio,
     )
     objeto.pipeline()
 
 
 @log_erros
 def executa_etl_microdado_inep(
-    etl: str, ds: DataStore, ano: str, criar_caminho: bool, reprocessar: bool
+    etl: str,
+    ds: DataStore,
+    ano: str,
+    criar_caminho: bool,
+    reprocessar: bool,
+    tamanho_bloco: typing.Optional[int] = None,
+    usar_estagio: bool = False,
+    reduzir_tipos: bool = False,
+    offline: bool = False,
+    validade_links: typing.Optional[int] = None,
+    max_trabalhadores: int = 1,
+    memoria_trabalhador: typing.Optional[int] = None,
+    limite_memoria_regiao: typing.Optional[int] = None,
 ) -> None:
     """
     Executa o pipeline de ETL de uma determinada base de Microdados do INEP
@@ -36,11 +60,91 @@ def executa_etl_microdado_inep(
     :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
     :param criar_caminho: flag indicando se devemos criar os caminhos
     :param reprocessar: flag indicando se devemos reprocessar a base
+    :param tamanho_bloco: número de linhas por bloco para processar os
+    dados em blocos (None processa a tabela inteira em memória)
+    :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+    arquivos do censo já lidos com as mesmas configurações
+    :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+    numéricas de saída para os menores tipos sem perda de informação
+    :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+    sem acessar a página do INEP
+    :param validade_links: tempo, em segundos, pelo qual o índice de links da
+    página do INEP salvo no data store é reaproveitado
+    :param max_trabalhadores: número máximo de regiões da matrícula
+    processadas ao mesmo tempo, cada uma em um processo próprio
+    :param memoria_trabalhador: memória, em bytes, reservada para o
+    processamento de cada região da matrícula
+    :param limite_memoria_regiao: memória, em bytes, acima da qual uma região
+    da matrícula é processada em blocos
     """
+    kwargs: typing.Dict[str, typing.Any] = dict()
+    if MicroINEPETL(etl) == MicroINEPETL.MATRICULA:
+        kwargs["max_trabalhadores"] = max_trabalhadores
+        kwargs["memoria_trabalhador"] = memoria_trabalhador
+        kwargs["limite_memoria_regiao"] = limite_memoria_regiao
+
     objeto = MD_INEP_DICT[MicroINEPETL(etl)](
         ds=ds,
         criar_caminho=criar_caminho,
         reprocessar=reprocessar,
         ano=int(ano) if ano.isnumeric() else ano,
+        tamanho_bloco=tamanho_bloco,
+        usar_estagio=usar_estagio,
+        reduzir_tipos=reduzir_tipos,
+        offline=offline,
+        validade_links=validade_links,
+        **kwargs,
+    )
+    objeto.pipeline()
+
+
+@log_erros
+def executa_etl_censo_escolar(
+    ds: DataStore,
+    ano: str,
+    criar_caminho: bool,
+    reprocessar: bool,
+    tamanho_bloco: typing.Optional[int] = None,
+    usar_estagio: bool = False,
+    reduzir_tipos: bool = False,
+    offline: bool = False,
+    validade_links: typing.Optional[int] = None,
+    max_trabalhadores: int = 1,
+    limite_memoria: typing.Optional[int] = None,
+) -> None:
+    """
+    Executa o pipeline de ETL de todas as tabelas do censo escolar de um ano
+
+    :param ds: instância de objeto data store
+    :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
+    :param criar_caminho: flag indicando se devemos criar os caminhos
+    :param reprocessar: flag indicando se devemos reprocessar a base
+    :param tamanho_bloco: número de linhas por bloco para processar os
+    dados em blocos (None processa a tabela inteira em memória)
+    :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+    arquivos do censo já lidos com as mesmas configurações
+    :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+    numéricas de saída para os menores tipos sem perda de informação
+    :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+    sem acessar a página do INEP
+    :param validade_links: tempo, em segundos, pelo qual o índice de links da
+    página do INEP salvo no data store é reaproveitado
+    :param max_trabalhadores: número máximo de tabelas processadas ao mesmo
+    tempo, cada uma em um processo próprio
+    :param limite_memoria: memória máxima, em bytes, estimada para as tabelas
+    em processamento, sendo por padrão uma fração da memória disponível
+    """
+    objeto = CensoEscolarETL(
+        ds=ds,
+        criar_caminho=criar_caminho,
+        reprocessar=reprocessar,
+        ano=int(ano) if ano.isnumeric() else ano,
+        tamanho_bloco=tamanho_bloco,
+        usar_estagio=usar_estagio,
+        reduzir_tipos=reduzir_tipos,
+        offline=offline,
+        validade_links=validade_links,
+        max_trabalhadores=max_trabalhadores,
+        limite_memoria=limite_memoria,
     )
     objeto.pipeline()
@@ -1,4 +1,6 @@
 import abc
+import hashlib
+import json
 import re
 import typing
 
@@ -7,11 +9,62 @@ import pandas as pd
 from tqdm import tqdm
 
 from src.aquisicao.inep._micro_inep import BaseINEPETL
+from src.configs import COLECAO_DADOS_WEB
 from src.io.data_store import DataStore
 from src.io.data_store import Documento
+from src.io.escreve_dados import EscritorParquet
+from src.utils.categorico import MapaCategorico
+from src.utils.datas import converte_datas
+from src.utils.datas import gera_datas
+from src.utils.info import calcula_hash_info
 from src.utils.info import carrega_excel
 from src.utils.info import carrega_yaml
 
+# formatos aceitos nas colunas de data do censo, em ordem de preferência
+FORMATOS_DATA = ("%d/%m/%Y", "%d%b%Y:00:00:00")
+
+# tipos reduzidos das colunas numéricas de saída por prefixo do nome, sendo
+# aplicados apenas quando não há perda de valores e o tipo é menor que o atual
+# (os tipos inteiros anuláveis são substituídos pelos não anuláveis sem nulos)
+POLITICA_TIPOS = {
+    "IN_": "Int8",
+    "ID_": "UInt32",
+    "NU_": "UInt32",
+    "QT_": "UInt32",
+    "CO_": "category",
+}
+
+# número máximo de valores distintos de uma coluna de código, e fração
+# máxima em relação ao número de linhas, para que ela seja convertida em
+# categórica (códigos com muitos valores, como o da escola, são mantidos)
+LIMITE_CATEGORIAS = 2**15 - 1
+FRACAO_CATEGORIAS = 0.5
+
+# número de entidades repetidas cujas linhas são comparadas para verificar
+# que as colunas da base são determinadas pela chave antes de deduplicá-la
+AMOSTRA_CONSISTENCIA = 1000
+
+# chave do segundo hash das linhas deduplicadas em blocos por todas as
+# colunas, que junto ao hash padrão do pandas forma um hash de 128 bits
+CHAVE_HASH_LINHAS = "censo_escolar_01"
+
+# tipo do vetor de hashes de 128 bits das linhas já exportadas
+TIPO_HASH_LINHAS = np.dtype([("h1", "uint64"), ("h2", "uint64")])
+
+# cache de schemas compilados para tipos de dados do pandas
+_CACHE_SCHEMAS: typing.Dict[
+    typing.Tuple[bool, typing.Tuple[typing.Tuple[str, str], ...]],
+    typing.Dict[str, typing.Any],
+] = dict()
+
+# cache de planos de comparação por schema da base e configuração
+_CACHE_PLANOS: typing.Dict[
+    typing.Tuple[
+        typing.Tuple[str, ...], typing.Tuple[typing.Tuple[str, str, str], ...]
+    ],
+    typing.List[typing.Tuple[str, typing.List[str], str]],
+] = dict()
+
 
 class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
     """
@@ -27,6 +80,14 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
     _dtype: typing.Dict[str, str]
     _rename: typing.Dict[str, str]
     _cols_in: typing.List[str]
+    _mapas_tp: typing.Dict[str, MapaCategorico]
+    _formatos_dt: typing.Dict[typing.Tuple[str, str], str]
+    _tamanho_bloco: typing.Optional[int]
+    _usar_estagio: bool
+    _reduzir_tipos: bool
+    _planos_tipos: typing.Dict[str, typing.Dict[str, str]]
+
+    _modulos_codigo = ["src.utils.categorico", "src.utils.datas"]
 
     def __init__(
         self,
@@ -36,6 +97,11 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
         criar_caminho: bool = True,
         reprocessar: bool = False,
         regioes: typing.Sequence[str] = ("CO", "NORDESTE", "NORTE", "SUDESTE", "SUL"),
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL Censo Escolar
@@ -46,6 +112,16 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
         :param regioes: lista de regiões que devem ser processadas
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
         """
         super().__init__(
             ds,
@@ -53,12 +129,26 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
             ano=ano,
             criar_caminho=criar_caminho,
             reprocessar=reprocessar,
+            offline=offline,
+            validade_links=validade_links,
         )
         self._tabela = tabela
+        self._tamanho_bloco = tamanho_bloco
+        self._usar_estagio = usar_estagio
+        self._reduzir_tipos = reduzir_tipos
+        self._planos_tipos = dict()
 
         # carrega o arquivo YAML de configurações
         self._configs = carrega_yaml(f"aquis_censo_{tabela}.yml")
 
+        # compila os de-paras das colunas de tipo para categorias
+        self._mapas_tp = {
+            c: MapaCategorico(d) for c, d in self._configs["DEPARA_TP"].items()
+        }
+
+        # formatos das colunas de data detectados por arquivo do censo
+        self._formatos_dt = dict()
+
         # gera um regex de seleção de regiões
         self._regioes = "|".join([f"_{r.lower()}|_{r.upper()}" for r in regioes])
 
@@ -93,6 +183,42 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
             .to_list()
         )
 
+    @property
+    def padrao_comp(self) -> str:
+        """
+        Expressão regular que seleciona os arquivos da tabela dentro
+        do arquivo comprimido do censo
+
+        :return: string com expressão regular
+        """
+        return (
+            f"({self._tabela.lower()}|{self._tabela.upper()}|{self._tabela.lower().title()})"
+            f"({self._regioes})?"
+            f"[.](csv|CSV|rar|RAR|zip|ZIP)"
+        )
+
+    def assinatura(self) -> typing.Union[typing.Dict[str, str], None]:
+        """
+        Gera a assinatura das entradas do ETL a partir do hash dos arquivos
+        do censo, dos arquivos de configuração da tabela e do código
+
+        :return: dicionário com os hashes das entradas
+        """
+        return dict(
+            entrada=",".join(
+                [
+                    self._ds.obtem_hash(doc) if doc.exists() else ""
+                    for doc in self.documentos_entrada
+                ]
+            ),
+            configuracao=calcula_hash_info(
+                f"aquis_censo_{self._tabela}.yml",
+                f"aquis_censo_{self._tabela}_cols.xlsx",
+            ),
+            tipos="reduzidos" if self._reduzir_tipos else "schema",
+            codigo=self.versao_codigo(),
+        )
+
     def extract(self) -> None:
         """
         Extraí os dados do objeto
@@ -105,30 +231,24 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
 
         # para cada arquivo do censo demográfico
         for censo in tqdm(self.documentos_entrada):
-            conf = dict(
-                como_df=True,
-                padrao_comp=(
-                    f"({self._tabela.lower()}|{self._tabela.upper()}|{self._tabela.lower().title()})"
-                    f"({self._regioes})?"
-                    f"[.](csv|CSV|rar|RAR|zip|ZIP)"
-                ),
+            # lê os cabeçalhos dos arquivos e compara contra os valores reais
+            cabecalhos = self._ds.obtem_cabecalhos(
+                documento=censo,
+                padrao_comp=self.padrao_comp,
                 sep="|",
                 encoding="latin-1",
             )
-
-            # carrega uma versão dummy dos dados e compara contra os valores reais
-            dummy = self._ds.carrega_como_objeto(documento=censo, nrows=10, **conf)
-            if isinstance(dummy, dict):
-                dummy = pd.concat(list(dummy.values()))
-            total_cols = set(dummy.columns)
+            total_cols = set([c for cols in cabecalhos.values() for c in cols])
             if len(total_cols - set(self._dtype)) > 0:
                 self._logger.warning(
                     f"As colunas {total_cols - set(self._dtype)} foram adicionadas ao dataset, avalie se não é necessário adiciona-las ao arquivo de configuração"
                 )
 
-            conf["usecols"] = self._carrega_cols
-            conf["dtype"] = self._dtype
-            censo.obtem_dados(**conf)
+            conf = self.conf_leitura
+            if self._usar_estagio:
+                censo.data = self.carrega_com_estagio(censo, conf)
+            else:
+                censo.obtem_dados(**conf)
 
             if censo._data is not None:
                 if isinstance(censo.data, dict):
@@ -142,64 +262,280 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
                 f"de entrada -> {self._base} / {self._tabela} / {self._ano}"
             )
 
+    def pasta_estagio(
+        self, censo: Documento, conf: typing.Dict[str, typing.Any]
+    ) -> str:
+        """
+        Gera a pasta de estágio de um arquivo do censo, identificada
+        pelo hash dos conteúdos do arquivo e das configurações de leitura
+
+        :param censo: documento do arquivo do censo
+        :param conf: configurações de leitura do arquivo
+        :return: pasta de estágio na coleção de dados externos
+        """
+        hash_conf = hashlib.sha1(
+            json.dumps(conf, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        hash_censo = self._ds.obtem_hash(censo)
+        return f"{self._base}/estagio/{hash_censo[:16]}_{hash_conf[:16]}"
+
+    def manifesto_estagio(
+        self, censo: Documento, conf: typing.Dict[str, typing.Any]
+    ) -> Documento:
+        """
+        Gera o documento de manifesto do estágio de um arquivo do censo,
+        que só existe quando todos os arquivos internos foram salvos
+
+        :param censo: documento do arquivo do censo
+        :param conf: configurações de leitura do arquivo
+        :return: documento de manifesto do estágio
+        """
+        return Documento(
+            self._ds,
+            referencia=dict(
+                nome="membros.json",
+                colecao=COLECAO_DADOS_WEB,
+                pasta=self.pasta_estagio(censo, conf),
+            ),
+        )
+
+    def carrega_com_estagio(
+        self, censo: Documento, conf: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        """
+        Carrega os dados de um arquivo do censo reaproveitando a cópia em
+        parquet de cada arquivo interno que foi salva na primeira leitura
+        de um arquivo com os mesmos conteúdos e configurações de leitura
+
+        :param censo: documento do arquivo do censo
+        :param conf: configurações de leitura do arquivo
+        :return: dados carregados como seriam devolvidos pelo data store
+        """
+        pasta = self.pasta_estagio(censo, conf)
+        manifesto = self.manifesto_estagio(censo, conf)
+
+        # caso o estágio exista, carrega cada arquivo a partir do parquet
+        if manifesto.exists():
+            self._logger.info(f"Carregando {censo} a partir do estágio {pasta}")
+            membros = manifesto.obtem_dados()
+            objs = dict()
+            for membro, nome in membros["membros"].items():
+                df = self._ds.carrega_como_objeto(
+                    Documento(
+                        self._ds,
+                        referencia=dict(
+                            nome=nome, colecao=COLECAO_DADOS_WEB, pasta=pasta
+                        ),
+                    ),
+                    como_df=True,
+                )
+
+                # o parquet não guarda float16 e lê nulos de texto como None
+                cols_obj = [c for c in df if df[c].dtype == "object"]
+                df[cols_obj] = df[cols_obj].fillna(np.nan)
+                objs[membro] = df.astype(
+                    {
+                        c: t
+                        for c, t in conf["dtype"].items()
+                        if c in df and t not in ["str", "object"] and df[c].dtype != t
+                    }
+                )
+            if len(objs) == 0:
+                return None
+            return objs if membros["dicionario"] else list(objs.values())[0]
+
+        # caso contrário, carrega os dados do arquivo e salva o estágio
+        dados = self._ds.carrega_como_objeto(censo, **conf)
+        objs = dados if isinstance(dados, dict) else {censo.nome: dados}
+        if not all([isinstance(df, pd.DataFrame) for df in objs.values()]):
+            return dados
+
+        membros = dict()
+        for i, (membro, df) in enumerate(objs.items()):
+            nome = f"{i}_{re.sub(r'[^0-9A-Za-z_.-]', '_', membro)}.parquet"
+            self._ds.salva_documento(
+                Documento(
+                    self._ds,
+                    referencia=dict(nome=nome, colecao=COLECAO_DADOS_WEB, pasta=pasta),
+                    data=df.astype(
+                        {c: "float32" for c in df if df[c].dtype == "float16"}
+                    ),
+                )
+            )
+            membros[membro] = nome
+
+        # o manifesto é salvo por último e indica que o estágio está completo
+        manifesto.data = dict(membros=membros, dicionario=isinstance(dados, dict))
+        self._ds.salva_documento(manifesto)
+        return dados
+
     @staticmethod
     def obtem_operacao(
         op: str,
-    ) -> typing.Callable[[pd.DataFrame, typing.List[str]], pd.Series]:
+    ) -> typing.Callable[[np.ndarray], np.ndarray]:
         """
         Recebe uma string com o tipo de operação de comparação
-        a ser realiza e retorna uma função que receberá um dataframe
-        e uma lista de colunas e devolverá uma série de booleanos
-        comparando a soma desta lista de colunas por linha ao valor 0
+        a ser realiza e retorna uma função que receberá a soma de
+        uma lista de colunas por linha e devolverá um array de booleanos
+        comparando esta soma ao valor 0
 
         :param op: operação de comparação (=, >, <, >=, <=, !=)
         :return: função que compara soma de colunas ao valor 0
         """
         if op == "=":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) == 0
+            return lambda s: s == 0
         elif op == ">":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) > 0
+            return lambda s: s > 0
         elif op == "<":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) < 0
+            return lambda s: s < 0
         elif op == ">=":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) >= 0
+            return lambda s: s >= 0
         elif op == "<=":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) <= 0
+            return lambda s: s <= 0
         elif op == "!=":
-            return lambda f, c: f.reindex(columns=c).sum(axis=1) != 0
+            return lambda s: s != 0
         else:
             raise ValueError(
                 f"O operador {op} não faz parte da lista de operações disponíveis"
             )
 
+    @staticmethod
+    def obtem_plano_comparacao(
+        colunas: typing.Tuple[str, ...],
+        colunas_a_tratar: typing.Tuple[typing.Tuple[str, str, str], ...],
+    ) -> typing.List[typing.Tuple[str, typing.List[str], str]]:
+        """
+        Resolve, para um schema de base, quais colunas devem ser criadas
+        por comparação e quais são as suas colunas de origem, guardando
+        o plano em cache para as demais bases com o mesmo schema
+
+        :param colunas: colunas existentes na base
+        :param colunas_a_tratar: tuplas com coluna, padrão e operação
+        :return: lista com coluna a ser criada, colunas de origem e operação
+        """
+        global _CACHE_PLANOS
+
+        chave = (colunas, colunas_a_tratar)
+        if chave not in _CACHE_PLANOS:
+            plano = list()
+            disponiveis = list(colunas)
+            for coluna, padrao, operacao in colunas_a_tratar:
+                regex = re.compile(padrao)
+                origem = [c for c in disponiveis if regex.search(c) is not None]
+
+                # a coluna só é criada se não existir e se tivermos colunas de origem
+                if coluna not in disponiveis and len(origem) > 0:
+                    plano.append((coluna, origem, operacao))
+                    disponiveis.append(coluna)
+            _CACHE_PLANOS[chave] = plano
+        return _CACHE_PLANOS[chave]
+
+    @staticmethod
+    def converte_coluna_origem(valores: typing.Any) -> np.ndarray:
+        """
+        Converte os valores de uma coluna de origem das comparações em um
+        vetor com nulos preenchidos por 0. O tipo da coluna é verificado
+        antes da conversão, de forma que colunas inteiras ou booleanas cujos
+        valores caibam em int8, como as colunas indicadoras, são convertidas
+        diretamente para int8 e apenas as demais passam por float64
+
+        :param valores: valores da coluna de origem
+        :return: vetor int8 ou float64 com os valores da coluna
+        """
+        serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+        if pd.api.types.is_bool_dtype(serie):
+            return serie.to_numpy(dtype="int8", na_value=0)
+        if pd.api.types.is_integer_dtype(serie):
+            if serie.dtype == "int8":
+                return serie.to_numpy()
+            minimo, maximo = serie.min(), serie.max()
+            if pd.isna(minimo) or (minimo >= -128 and maximo <= 127):
+                return serie.to_numpy(dtype="int8", na_value=0)
+
+        reais = serie.to_numpy(dtype="float64", na_value=0)
+        if np.all(np.abs(reais) <= 127) and np.all(np.trunc(reais) == reais):
+            return reais.astype("int8")
+        return reais
+
     @staticmethod
     def gera_coluna_por_comparacao(
         base: pd.DataFrame,
         colunas_a_tratar: typing.Dict[str, typing.List[str]],
+        novas: typing.Dict[str, pd.Series],
     ) -> None:
         """
-        Realiza a criação de novas colunas na base passada a partir
-        de um outro conjunto de colunas que são somadas linha a linha
-        e comparadas com o valor 0 por meio de algum operador
+        Realiza a criação de novas colunas a partir de um outro conjunto
+        de colunas que são somadas linha a linha e comparadas com o valor 0
+        por meio de algum operador
+
+        As colunas de origem de todas as comparações são convertidas uma
+        única vez, cada uma no menor tipo que comporte os seus valores, e as
+        somas são feitas em int32 sempre que todas as suas origens forem
+        int8. As colunas criadas são adicionadas ao dicionário de novas
+        colunas, que também é consultado como origem das comparações seguintes
 
         :param base: base de dados a ser processada
         :param colunas_a_tratar: dicionário com configurações de tratamento
+        :param novas: dicionário de novas colunas a serem anexadas à base
+        """
+        plano = BaseCensoEscolarETL.obtem_plano_comparacao(
+            (*base.columns, *novas),
+            tuple([(c, p, o) for c, (p, o) in colunas_a_tratar.items()]),
+        )
+        if len(plano) == 0:
+            return
+
+        # converte as colunas de origem que já existem
+        criadas = [coluna for coluna, _, _ in plano]
+        origem = {
+            c: BaseCensoEscolarETL.converte_coluna_origem(
+                novas[c] if c in novas else base[c]
+            )
+            for _, cols, _ in plano
+            for c in cols
+            if c not in criadas
+        }
+
+        # soma as colunas de origem de cada comparação coluna a coluna
+        resultados: typing.Dict[str, np.ndarray] = dict()
+        for coluna, cols, operacao in plano:
+            vetores = [origem[c] if c in origem else resultados[c] for c in cols]
+            inteiros = all([v.dtype.kind in "iu" for v in vetores])
+            soma = np.zeros(base.shape[0], dtype="int32" if inteiros else "float64")
+            for vetor in vetores:
+                soma += vetor
+
+            # aplica a função de geração de colunas
+            func = BaseCensoEscolarETL.obtem_operacao(operacao)
+            resultados[coluna] = func(soma).astype("int")
+            novas[coluna] = pd.Series(resultados[coluna], index=base.index)
+
+    @staticmethod
+    def anexa_colunas(base: Documento, novas: typing.Dict[str, typing.Any]) -> None:
         """
-        # percorre o dicionário de configurações
-        for coluna, tratamento in colunas_a_tratar.items():
-            # extraí o padrão de colunas de origem e a operação de comparação
-            padrao, operacao = tratamento
+        Anexa as novas colunas à base de uma única vez, substituindo as
+        colunas que já existirem, evitando a fragmentação do data frame
+        causada pela inserção de colunas uma a uma
 
-            # obtém a lista de colunas de origem que devem ser utilizadas
-            colunas_origem = [
-                c for c in base.columns if re.search(padrao, c) is not None
-            ]
+        :param base: documento com os dados a serem tratados
+        :param novas: dicionário com o nome e os valores das novas colunas
+        """
+        if len(novas) == 0:
+            return
 
-            # se a coluna não existir na base e se nós temos colunas de origem
-            if (coluna not in base.columns) and len(colunas_origem) > 0:
-                # aplica a função de geração de colunas
-                func = BaseCensoEscolarETL.obtem_operacao(operacao)
-                base[coluna] = func(base, colunas_origem).astype("int")
+        base.data = pd.concat(
+            [
+                base.data.drop(columns=[c for c in novas if c in base.data]),
+                pd.DataFrame(
+                    {
+                        c: v.values if isinstance(v, pd.Series) else v
+                        for c, v in novas.items()
+                    },
+                    index=base.data.index,
+                ),
+            ],
+            axis=1,
+        )
 
     def gera_dt_nascimento(self, base: Documento) -> None:
         """
@@ -212,31 +548,28 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
             and "NU_MES" in base.data
             and "DT_NASCIMENTO" in self._configs["DADOS_SCHEMA"]
         ):
-            if "NU_DIA" in base.data:
-                base.data["DT_NASCIMENTO"] = pd.to_datetime(
-                    base.data["NU_ANO"].astype(str)
-                    + base.data["NU_MES"].astype(str)
-                    + base.data["NU_DIA"].astype(str),
-                    format="%Y%m%d",
-                )
-            else:
-                base.data["DT_NASCIMENTO"] = pd.to_datetime(
-                    base.data["NU_ANO"].astype(str) + base.data["NU_MES"].astype(str),
-                    format="%Y%m",
-                )
+            base.data["DT_NASCIMENTO"] = gera_datas(
+                base.data["NU_ANO"],
+                base.data["NU_MES"],
+                base.data["NU_DIA"] if "NU_DIA" in base.data else None,
+            )
 
     def processa_dt(self, base: Documento) -> None:
         """
         Realiza a conversão das colunas de datas de texto para datetime
 
+        O formato de cada coluna é detectado na primeira conversão do
+        arquivo do censo e reaproveitado nas seguintes, como nos blocos
+        de um mesmo arquivo
+
         :param base: documento com os dados a serem tratados
         """
         colunas_data = [c for c in base.data.columns if c.startswith("DT_")]
         for c in colunas_data:
-            try:
-                base.data[c] = pd.to_datetime(base.data[c], format="%d/%m/%Y")
-            except ValueError:
-                base.data[c] = pd.to_datetime(base.data[c], format="%d%b%Y:00:00:00")
+            chave = (base.nome, c)
+            base.data[c], self._formatos_dt[chave] = converte_datas(
+                base.data[c], FORMATOS_DATA, self._formatos_dt.get(chave)
+            )
 
     def processa_qt(self, base: Documento) -> None:
         """
@@ -266,16 +599,20 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
             )
 
         # preenche bases com colunas IN quando há uma coluna QT
+        novas: typing.Dict[str, pd.Series] = dict()
         for col in base.data:
             if (
                 col[:2] == "QT"
                 and f"IN{col[2:]}" in cols
                 and f"IN{col[2:]}" not in base.data
             ):
-                base.data[f"IN{col[2:]}"] = (base.data[col] > 0).astype("int")
+                novas[f"IN{col[2:]}"] = (base.data[col] > 0).astype("int")
 
         # realiza o tratamento das colunas IN_ a partir das configurações
-        self.gera_coluna_por_comparacao(base.data, self._configs["TRATAMENTO_IN"])
+        self.gera_coluna_por_comparacao(
+            base.data, self._configs["TRATAMENTO_IN"], novas
+        )
+        self.anexa_colunas(base, novas)
 
     def processa_tp(self, base: Documento) -> None:
         """
@@ -284,27 +621,19 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
         :param base: documento com os dados a serem tratados
         """
         # converte a coluna para tipo categórico
-        for c, d in self._configs["DEPARA_TP"].items():
+        for c, mapa in self._mapas_tp.items():
             if c in base.data:
-                # lista os valores a serem categorizados
-                vals = list(d.values())
-
-                # obtém os valores
-                unicos = set(base.data[c].dropna().replace(d))
-                esperado = set(vals)
+                serie, inesperados = mapa.aplica(base.data[c])
 
                 # verifica que não há nenhum erro com os dados a serem preenchidos
-                if not esperado.issuperset(unicos):
+                if len(inesperados) > 0:
                     raise ValueError(
                         f"A coluna {c} da base {base.nome} possuí os valores "
-                        f"{unicos - esperado} a mais"
+                        f"{inesperados} a mais"
                     )
 
-                # cria o tipo categórico
-                cat = pd.Categorical(vals).dtype
-
                 # realiza a conversão da coluna
-                base.data[c] = base.data[c].replace(d).astype(cat)
+                base.data[c] = serie
 
     def remove_duplicatas(self, base: Documento) -> typing.Union[None, Documento]:
         """
@@ -317,7 +646,13 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
         """
         if len(self._configs["COLS_DEPARA"]) == 0:
             return None
-        cols = [self._configs["COL_ID"], "ANO"] + self._configs["COLS_DEPARA"]
+        chave = [self._configs["COL_ID"], "ANO"]
+        cols = chave + self._configs["COLS_DEPARA"]
+
+        # projeta apenas as colunas do de-para, criando as que não existirem
+        depara = base.data[[c for c in cols if c in base.data]]
+        if depara.shape[1] < len(cols):
+            depara = depara.reindex(columns=cols)
         base_id = Documento(
             ds=self._ds,
             referencia=dict(
@@ -325,17 +660,118 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
                 colecao=base.colecao.nome,
                 pasta=base.colecao.pasta,
             ),
-            data=base.data.reindex(columns=cols),
+            data=depara,
         )
         self._logger.debug(base, base.data.shape)
         base.data.drop(
             columns=self._configs["COLS_DEPARA"], errors="ignore", inplace=True
         )
-        base.data.drop_duplicates(inplace=True)
+
+        # quando as colunas da entidade são determinadas pela chave, apenas
+        # ela é considerada na remoção de duplicatas
+        if self._configs["DEDUPLICA_POR_ID"]:
+            duplicadas = base.data.duplicated(subset=chave)
+            if self.verifica_consistencia_chave(base.data, chave, duplicadas):
+                base.data = base.data.loc[~duplicadas]
+            else:
+                self._logger.warning(
+                    f"As colunas de {base.nome} não são determinadas por {chave}, "
+                    f"removendo duplicatas a partir de todas as colunas"
+                )
+                base.data.drop_duplicates(inplace=True)
+        else:
+            base.data.drop_duplicates(inplace=True)
         self._logger.debug(base, base.data.shape)
 
         return base_id
 
+    def chave_deduplicacao(self, i: int) -> typing.Optional[typing.List[str]]:
+        """
+        Obtém as colunas que identificam as linhas de um documento de saída
+        na remoção de duplicatas, seguindo o tratamento de remove_duplicatas
+
+        Apenas a base da entidade é deduplicada, quando há de-para, sendo
+        a chave o identificador da entidade (o ano é o mesmo em todos os
+        blocos) ou todas as colunas da base
+
+        :param i: posição do documento de saída
+        :return: colunas da chave ou None caso o documento não seja deduplicado
+        """
+        if i > 0 or len(self._configs["COLS_DEPARA"]) == 0:
+            return None
+        if self._configs["DEDUPLICA_POR_ID"]:
+            return [self._configs["COL_ID"]]
+        return list(self.dados_saida[i].data.columns)
+
+    @staticmethod
+    def remove_exportados(
+        dados: pd.DataFrame,
+        chave: typing.List[str],
+        exportados: typing.Optional[np.ndarray] = None,
+    ) -> typing.Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Remove as linhas cuja chave já foi exportada em blocos anteriores e
+        adiciona as novas chaves ao vetor de chaves exportadas
+
+        As chaves são guardadas como um vetor ordenado de hashes, de forma que
+        a busca é feita por bisseção sem manter os valores originais em
+        memória. Para uma única coluna inteira o hash de 64 bits do pandas é
+        uma bijeção dos próprios valores, e para as demais chaves são
+        combinados dois hashes de 64 bits com chaves distintas, tornando
+        colisões entre linhas diferentes desprezíveis
+
+        :param dados: bloco de dados de um documento de saída
+        :param chave: colunas que identificam cada linha
+        :param exportados: vetor ordenado das chaves já exportadas
+        :return: tupla com o bloco sem as linhas já exportadas e o vetor
+        ordenado de chaves atualizado
+        """
+        objeto = dados[chave[0]] if len(chave) == 1 else dados[chave]
+        valores = pd.util.hash_pandas_object(objeto, index=False).to_numpy()
+        if len(chave) > 1 or not pd.api.types.is_integer_dtype(objeto):
+            linhas = np.empty(len(valores), dtype=TIPO_HASH_LINHAS)
+            linhas["h1"] = valores
+            linhas["h2"] = pd.util.hash_pandas_object(
+                objeto, index=False, hash_key=CHAVE_HASH_LINHAS
+            ).to_numpy()
+            valores = linhas
+        if exportados is None:
+            exportados = np.empty(0, dtype=valores.dtype)
+
+        pos = np.searchsorted(exportados, valores)
+        repetidas = np.zeros(len(valores), dtype=bool)
+        validas = pos < len(exportados)
+        repetidas[validas] = exportados[pos[validas]] == valores[validas]
+
+        # os dois vetores já estão ordenados, o que torna a ordenação estável
+        # equivalente a uma intercalação
+        novos = np.unique(valores[~repetidas])
+        exportados = np.sort(np.concatenate([exportados, novos]), kind="stable")
+        return dados.loc[~repetidas], exportados
+
+    @staticmethod
+    def verifica_consistencia_chave(
+        dados: pd.DataFrame, chave: typing.List[str], duplicadas: pd.Series
+    ) -> bool:
+        """
+        Verifica, para uma amostra das entidades com linhas repetidas, se
+        todas as linhas de cada entidade são idênticas, ou seja, se as
+        colunas da base são determinadas pela chave
+
+        :param dados: base de dados sem as colunas do de-para
+        :param chave: colunas que identificam cada entidade
+        :param duplicadas: série indicando as linhas com chave repetida
+        :return: True se as linhas da amostra forem consistentes com a chave
+        """
+        ids = dados.loc[duplicadas.values, chave[0]].drop_duplicates()
+        if len(ids) == 0:
+            return True
+        amostra = ids.sample(min(len(ids), AMOSTRA_CONSISTENCIA), random_state=0)
+        linhas = dados.loc[dados[chave[0]].isin(amostra).values]
+        return linhas.drop_duplicates().shape[0] == (
+            linhas.drop_duplicates(subset=chave).shape[0]
+        )
+
     def gera_documento_saida(
         self, base: Documento, base_id: typing.Union[None, Documento]
     ) -> None:
@@ -351,6 +787,38 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
             self.documentos_saida[1].data = base_id.data
         self._dados_saida += self.documentos_saida
 
+    @staticmethod
+    def compila_schema(
+        schema: typing.Dict[str, str], texto_arrow: bool = False
+    ) -> typing.Dict[str, typing.Any]:
+        """
+        Converte o schema das configurações em um mapa de tipos de dados
+        do pandas, guardando o resultado em cache para as próximas bases
+
+        As colunas de texto são mantidas no tipo object, sendo convertidas
+        por converte_texto, exceto no modo texto_arrow, em que passam ao
+        tipo string do pandas guardado nos buffers do arrow
+
+        :param schema: dicionário de tipo de dados por coluna
+        :param texto_arrow: flag se as colunas de texto devem ser mantidas
+        nos buffers do arrow (string[pyarrow])
+        :return: dicionário de tipo de dados do pandas por coluna
+        """
+        global _CACHE_SCHEMAS
+
+        chave = (texto_arrow, tuple(schema.items()))
+        if chave not in _CACHE_SCHEMAS:
+            tipos: typing.Dict[str, typing.Any] = dict()
+            for c, dtype in schema.items():
+                if dtype.startswith("pd."):
+                    tipos[c] = eval(dtype)
+                elif dtype == "str":
+                    tipos[c] = pd.StringDtype("pyarrow") if texto_arrow else "object"
+                else:
+                    tipos[c] = dtype
+            _CACHE_SCHEMAS[chave] = tipos
+        return _CACHE_SCHEMAS[chave]
+
     def ajusta_schema(
         self,
         base: Documento,
@@ -374,18 +842,166 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
         base.data = base.data.reindex(columns=schema)
 
         # preenche nulos com valores fixos
-        for c, p in fill.items():
-            if c in base.data:
-                base.data[c] = base.data[c].fillna(p)
-
-        # ajusta o schema
-        for c, dtype in schema.items():
-            if dtype.startswith("pd."):
-                base.data[c] = base.data[c].astype(eval(dtype))
-            elif dtype == "str":
-                base.data[c] = base.data[c].astype(dtype).replace({"nan": None})
+        base.data = base.data.fillna({c: p for c, p in fill.items() if c in base.data})
+
+        # ajusta o schema, mantendo nos buffers do arrow as colunas de texto
+        # do tipo object quando o data store estiver no modo texto_arrow
+        tipos = self.compila_schema(schema, self._ds.texto_arrow)
+        if self._ds.texto_arrow:
+            tipos = {
+                c: t
+                for c, t in tipos.items()
+                if not (t == "object" and base.data[c].dtype == "string")
+            }
+        base.data = base.data.astype(tipos)
+
+        if not self._ds.texto_arrow:
+            for c in [c for c, dtype in schema.items() if dtype == "str"]:
+                base.data[c] = self.converte_texto(base.data[c])
+
+    @staticmethod
+    def converte_texto(serie: pd.Series) -> pd.Series:
+        """
+        Converte os valores de uma coluna em texto no tipo object, mantendo
+        os valores faltantes como None, com uma única validação dos valores
+        pelo tipo string do pandas
+
+        :param serie: coluna a ser convertida
+        :return: coluna de texto do tipo object
+        """
+        return pd.Series(
+            serie.astype("string").to_numpy(dtype=object, na_value=None),
+            index=serie.index,
+            name=serie.name,
+        )
+
+    @staticmethod
+    def largura_tipo(tipo: typing.Any) -> float:
+        """
+        Calcula a memória ocupada por valor de um tipo numérico, contando
+        um byte adicional para a máscara de nulos dos tipos anuláveis
+
+        :param tipo: tipo de dados do pandas ou do numpy
+        :return: número de bytes por valor
+        """
+        tipo = pd.api.types.pandas_dtype(tipo)
+        if isinstance(tipo, pd.api.extensions.ExtensionDtype):
+            return getattr(tipo, "itemsize", np.inf) + 1
+        return tipo.itemsize
+
+    @staticmethod
+    def planeja_tipos(
+        dados: pd.DataFrame, em_blocos: bool = False
+    ) -> typing.Dict[str, str]:
+        """
+        Gera o plano de redução de tipos de uma base. Os tipos inteiros são
+        definidos pelo prefixo de cada coluna, de acordo com a política de
+        tipos, e só são aplicados quando ocupam menos memória que o tipo atual
+        da coluna. As colunas sem nulos recebem o tipo inteiro não anulável,
+        e apenas as colunas de código não inteiras são convertidas em
+        categóricas, caso tenham poucos valores distintos e os códigos e as
+        categorias ocupem menos memória que os valores atuais
+
+        :param dados: base de dados (ou o primeiro bloco dela)
+        :param em_blocos: flag se a base é o primeiro bloco de uma tabela, de
+        forma que apenas as colunas de tipo inteiro são consideradas sem nulos
+        :return: dicionário com a coluna e o tipo reduzido
+        """
+        plano: typing.Dict[str, str] = dict()
+        for c in dados:
+            tipo = next((t for p, t in POLITICA_TIPOS.items() if c.startswith(p)), None)
+            serie = dados[c]
+            if (
+                tipo is None
+                or not pd.api.types.is_numeric_dtype(serie)
+                or pd.api.types.is_bool_dtype(serie)
+            ):
+                continue
+
+            largura = BaseCensoEscolarETL.largura_tipo(serie.dtype)
+            if tipo == "category":
+                # códigos inteiros já são mantidos no menor tipo pelo schema, e
+                # as categorias são guardadas como inteiros ou reais de 64 bits
+                if pd.api.types.is_integer_dtype(serie):
+                    continue
+                n_valores = serie.nunique()
+                if n_valores > min(LIMITE_CATEGORIAS, FRACAO_CATEGORIAS * len(serie)):
+                    continue
+                codigos = BaseCensoEscolarETL.largura_tipo(
+                    "int8" if n_valores < 2**7 else "int16"
+                )
+                if codigos * len(serie) + 8 * n_valores >= largura * len(serie):
+                    continue
             else:
-                base.data[c] = base.data[c].astype(dtype)
+                sem_nulos = pd.api.types.is_integer_dtype(serie) and not (
+                    pd.api.types.is_extension_array_dtype(serie)
+                )
+                if not em_blocos and not serie.hasnans:
+                    sem_nulos = True
+                if sem_nulos:
+                    tipo = tipo.lower()
+                if BaseCensoEscolarETL.largura_tipo(tipo) >= largura:
+                    continue
+            plano[c] = tipo
+        return plano
+
+    def reduz_tipos(self, base: Documento) -> None:
+        """
+        Reduz os tipos das colunas numéricas de uma base de acordo com o
+        plano de tipos. Os tipos inteiros só são aplicados quando todos os
+        valores da coluna são inteiros e cabem no tipo, caso contrário a
+        coluna mantém o tipo do schema
+
+        No processamento em blocos o plano é gerado no primeiro bloco e
+        fixado para os demais, de forma que todos os blocos do arquivo
+        parquet tenham os mesmos tipos. Um bloco com valores que não cabem
+        no tipo do plano interrompe o processamento com um erro
+
+        :param base: documento com os dados a serem modificados
+        """
+        antes = base.data.memory_usage(deep=True).sum()
+
+        em_blocos = self._tamanho_bloco is not None
+        if em_blocos and base.nome in self._planos_tipos:
+            plano = self._planos_tipos[base.nome]
+        else:
+            plano = self.planeja_tipos(base.data, em_blocos)
+
+        # verifica que os valores cabem no tipo inteiro sem perda
+        tipos: typing.Dict[str, str] = dict()
+        for c, tipo in plano.items():
+            if c not in base.data:
+                continue
+            serie = base.data[c]
+            if tipo != "category":
+                limites = np.iinfo(tipo.lower())
+                valores = serie.dropna()
+                if len(valores) > 0 and (
+                    valores.min() < limites.min
+                    or valores.max() > limites.max
+                    or not (valores % 1 == 0).all()
+                ):
+                    if em_blocos and base.nome in self._planos_tipos:
+                        raise ValueError(
+                            f"A coluna {c} de {base.nome} não cabe no tipo {tipo} "
+                            f"fixado no primeiro bloco, processe a tabela sem "
+                            f"reduzir os tipos"
+                        )
+                    self._logger.warning(
+                        f"A coluna {c} de {base.nome} não cabe no tipo {tipo} "
+                        f"e manterá o tipo {serie.dtype}"
+                    )
+                    continue
+            tipos[c] = tipo
+
+        if em_blocos:
+            self._planos_tipos.setdefault(base.nome, tipos)
+        base.data = base.data.astype(tipos)
+        depois = base.data.memory_usage(deep=True).sum()
+        self._logger.info(
+            f"Memória de {base.nome}: {antes / 2 ** 20:.1f} MB -> "
+            f"{depois / 2 ** 20:.1f} MB"
+        )
 
     def transform(self) -> None:
         """
@@ -425,3 +1041,139 @@ class BaseCensoEscolarETL(BaseINEPETL, abc.ABC):
                 fill=self._configs["PREENCHER_NULOS"],
                 schema=self._configs["DEPARA_SCHEMA"],
             )
+
+        if self._reduzir_tipos:
+            self._logger.info("Reduzindo os tipos das colunas numéricas")
+            for doc in self.documentos_saida:
+                self.reduz_tipos(doc)
+
+    @property
+    def conf_leitura(self) -> typing.Dict[str, typing.Any]:
+        """
+        Parâmetros de leitura dos arquivos do censo como data frames,
+        que também identificam o estágio dos dados lidos
+
+        :return: dicionário com os parâmetros de leitura
+        """
+        return dict(como_df=True, **self.conf_blocos)
+
+    @property
+    def conf_blocos(self) -> typing.Dict[str, typing.Any]:
+        """
+        Parâmetros de leitura dos arquivos do censo em blocos de linhas
+
+        :return: dicionário com os parâmetros de leitura
+        """
+        return dict(
+            padrao_comp=self.padrao_comp,
+            sep="|",
+            encoding="latin-1",
+            usecols=self._carrega_cols,
+            dtype=self._dtype,
+        )
+
+    def mede_memoria_linha(self, n_linhas: int = 1000) -> float:
+        """
+        Mede a memória ocupada por linha dos dados carregados, lendo
+        apenas um bloco de amostra do início de cada documento de entrada
+
+        :param n_linhas: número de linhas do bloco de amostra
+        :return: maior memória por linha observada, em bytes
+        """
+        medidas = list()
+        for censo in self.documentos_entrada:
+            blocos = self._ds.carrega_em_blocos(censo, n_linhas, **self.conf_blocos)
+            for _, bloco in blocos:
+                if len(bloco) > 0:
+                    memoria = bloco.memory_usage(index=True, deep=True).sum()
+                    medidas.append(memoria / len(bloco))
+                    break
+
+        return max(medidas) if len(medidas) > 0 else 1.0
+
+    def processa_em_blocos(self) -> None:
+        """
+        Executa o ETL lendo os dados de entrada em blocos de linhas
+
+        Cada bloco passa pelo mesmo tratamento de transform e é adicionado
+        como um row group ao arquivo parquet da partição do ano, de forma
+        que o pico de memória depende do tamanho do bloco e não do tamanho
+        da tabela. Tratamentos que dependem dos valores da tabela (como
+        verificações de mínimo e máximo) são avaliados a cada bloco
+        """
+        if self._tamanho_bloco is None:
+            raise ValueError("É preciso definir tamanho_bloco para processar em blocos")
+
+        # realiza o download dos dados do censo
+        self.download_conteudo()
+
+        conf = self.conf_blocos
+
+        # objetos de escrita e chaves já exportadas por posição do documento
+        # de saída, utilizadas para remover duplicatas em blocos distintos
+        escritores: typing.Dict[int, EscritorParquet] = dict()
+        exportados: typing.Dict[int, np.ndarray] = dict()
+
+        # os planos de redução de tipos são gerados no primeiro bloco
+        self._planos_tipos = dict()
+
+        try:
+            for censo in self.documentos_entrada:
+                blocos = self._ds.carrega_em_blocos(censo, self._tamanho_bloco, **conf)
+                for arq, bloco in tqdm(blocos):
+                    self._logger.debug(f"Processando bloco de {arq}")
+                    censo.data = bloco.rename(columns=self._rename)
+                    self._dados_entrada = [censo]
+                    self.transform()
+
+                    # exporta o bloco para cada documento de saída, removendo
+                    # as linhas cuja chave já foi exportada
+                    for i, doc in enumerate(self.dados_saida):
+                        chave = self.chave_deduplicacao(i)
+                        if chave is not None:
+                            n_linhas = len(doc.data)
+                            doc.data, exportados[i] = self.remove_exportados(
+                                doc.data, chave, exportados.get(i)
+                            )
+                            removidas = n_linhas - len(doc.data)
+                            if removidas > 0:
+                                colunas = chave[0] if len(chave) == 1 else "linha"
+                                self._logger.info(
+                                    f"{removidas} linhas de {doc.nome} já "
+                                    f"exportadas em blocos anteriores foram "
+                                    f"removidas pelo hash de {colunas}"
+                                )
+                        if i not in escritores:
+                            escritores[i] = self._ds.gera_escritor_parquet(
+                                self.gera_particao(doc)
+                            )
+                        escritores[i].escreve(doc.data.drop(columns=["ANO"]))
+                censo.data = None
+        finally:
+            for escritor in escritores.values():
+                escritor.close()
+
+        if len(escritores) == 0:
+            raise ValueError(
+                f"As configurações do objeto não geraram qualquer base de dados"
+                f"de entrada -> {self._base} / {self._tabela} / {self._ano}"
+            )
+
+    def pipeline(self) -> None:
+        """
+        Executa o pipeline completo de tratamento de dados, processando
+        os dados em blocos caso tamanho_bloco tenha sido definido
+        """
+        if self._tamanho_bloco is None:
+            super().pipeline()
+            return
+
+        if self.atualizado():
+            self._logger.info(f"DADOS DE {self} JÁ FORAM PROCESSADOS")
+            return
+
+        self._logger.info(
+            f"PROCESSANDO DADOS {self} EM BLOCOS DE {self._tamanho_bloco} LINHAS"
+        )
+        self.processa_em_blocos()
+        self.salva_manifestos()
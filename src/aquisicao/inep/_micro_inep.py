@@ -1,11 +1,14 @@
 import abc
+import re
+import time
 import typing
 
 from src.aquisicao._etl import BaseETL
 from src.configs import COLECAO_DADOS_WEB
+from src.io.data_store import Colecao
 from src.io.data_store import DataStore
 from src.io.data_store import Documento
-from src.utils.web import obtem_pagina
+from src.utils.web import obtem_links
 
 
 class BaseINEPETL(BaseETL, abc.ABC):
@@ -21,6 +24,8 @@ class BaseINEPETL(BaseETL, abc.ABC):
     _base: str
     _url: str
     _inep: typing.Dict[Documento, str]
+    _offline: bool
+    _validade_links: typing.Optional[int]
 
     def __init__(
         self,
@@ -29,6 +34,8 @@ class BaseINEPETL(BaseETL, abc.ABC):
         ano: typing.Union[int, str] = "ultimo",
         criar_caminho: bool = True,
         reprocessar: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL INEP
@@ -38,12 +45,18 @@ class BaseINEPETL(BaseETL, abc.ABC):
         :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
         """
         super().__init__(ds, criar_caminho, reprocessar)
 
         self._base = base.replace("-", "_")
         self._ano = ano
         self._url = f"{self.URL}/{base}"
+        self._offline = offline
+        self._validade_links = validade_links
 
     @property
     def inep(self) -> typing.Dict[Documento, str]:
@@ -53,20 +66,72 @@ class BaseINEPETL(BaseETL, abc.ABC):
         :return: dicionário com nome do arquivo e link para a página
         """
         if not hasattr(self, "_inep"):
-            soup = obtem_pagina(self._url)
-            self._inep = {
-                Documento(
-                    self._ds,
-                    referencia=dict(
-                        nome=tag["href"].split("_")[-1],
-                        colecao=COLECAO_DADOS_WEB,
-                        pasta=self._base,
-                    ),
-                ): tag["href"]
-                for tag in soup.find_all("a", {"class": "external-link"})
-            }
+            if self._offline:
+                self._inep = {
+                    doc: ""
+                    for doc in Colecao(self._ds, COLECAO_DADOS_WEB, self._base)
+                    if re.match(r"^[0-9]{4}[.]", doc.nome) is not None
+                }
+            else:
+                self._inep = {
+                    Documento(
+                        self._ds,
+                        referencia=dict(
+                            nome=link.split("_")[-1],
+                            colecao=COLECAO_DADOS_WEB,
+                            pasta=self._base,
+                        ),
+                    ): link
+                    for link in self.obtem_links_inep()
+                }
         return self._inep
 
+    def obtem_links_inep(self) -> typing.List[str]:
+        """
+        Obtém os links da página do INEP, reaproveitando o índice de links
+        salvo no data store enquanto ele estiver dentro da validade
+
+        :return: lista com os endereços dos links
+        """
+        if self._validade_links is None:
+            return obtem_links(self._url)
+
+        indice = Documento(
+            self._ds,
+            referencia=dict(
+                nome="_links.json", colecao=COLECAO_DADOS_WEB, pasta=self._base
+            ),
+        )
+        if indice.exists():
+            salvo = self._ds.carrega_como_objeto(indice)
+            if (
+                salvo["url"] == self._url
+                and time.time() - salvo["horario"] < self._validade_links
+            ):
+                return salvo["links"]
+
+        links = obtem_links(self._url)
+        indice.data = dict(url=self._url, horario=time.time(), links=links)
+        self._ds.salva_documento(indice)
+        return links
+
+    def compartilha_inep(self, etl: "BaseINEPETL") -> None:
+        """
+        Compartilha o resultado do web-scraping com outro ETL da mesma
+        base do INEP, evitando que ele tenha que acessar a página novamente
+
+        :param etl: objeto de ETL que receberá os links
+        """
+        etl._inep = {
+            Documento(
+                etl._ds,
+                referencia=dict(
+                    nome=doc.nome, colecao=COLECAO_DADOS_WEB, pasta=etl._base
+                ),
+            ): link
+            for doc, link in self.inep.items()
+        }
+
     @property
     def ano(self) -> int:
         """
@@ -76,6 +141,10 @@ class BaseINEPETL(BaseETL, abc.ABC):
         """
         if isinstance(self._ano, str):
             if self._ano == "ultimo":
+                if len(self.inep) == 0:
+                    raise ValueError(
+                        f"Não há arquivos da base {self._base} para obter o último ano"
+                    )
                 return max([int(b.nome[:4]) for b in self.inep])
             else:
                 raise ValueError(f"Não conseguimos processar ano={self._ano}")
@@ -129,12 +198,49 @@ class BaseINEPETL(BaseETL, abc.ABC):
         """
         pass
 
+    @property
+    def documentos_manifesto(self) -> typing.List[Documento]:
+        """
+        Gera a lista de documentos de manifesto, salvos na partição de
+        cada documento de saída
+
+        :return: lista de documentos de manifesto
+        """
+        particoes = [self.gera_particao(doc) for doc in self.documentos_saida]
+        return [
+            Documento(
+                self._ds,
+                referencia=dict(
+                    nome="_manifesto.json",
+                    colecao=particao.colecao.nome,
+                    pasta=particao.colecao.pasta,
+                ),
+            )
+            for particao in particoes
+        ]
+
+    def gera_particao(self, doc: Documento) -> Documento:
+        """
+        Gera o documento da partição do ano processado em que um documento
+        de saída é exportado, sem alterar o documento de saída
+
+        :param doc: documento de saída
+        :return: documento da partição, com os mesmos dados
+        """
+        return Documento(
+            self._ds,
+            referencia=dict(
+                nome=f"{self.ano}.parquet",
+                colecao=doc.colecao.nome,
+                pasta=f"{doc.nome}/ANO={self.ano}",
+            ),
+            data=doc._data,
+        )
+
     def load(self) -> None:
         """
         Exporta os dados transformados
         """
         for doc in self.dados_saida:
-            doc.pasta = f"{doc.nome}/ANO={self.ano}"
-            doc.nome = f"{self.ano}.parquet"
             doc.data.drop(columns=["ANO"], inplace=True)
-            self._ds.salva_documento(doc)
+            self._ds.salva_documento(self.gera_particao(doc))
@@ -0,0 +1,222 @@
+import re
+import typing
+
+from src.aquisicao.inep._censo_escolar import BaseCensoEscolarETL
+from src.aquisicao.inep._micro_inep import BaseINEPETL
+from src.aquisicao.inep.censo_docente import DocenteETL
+from src.aquisicao.inep.censo_escola import EscolaETL
+from src.aquisicao.inep.censo_gestor import GestorETL
+from src.aquisicao.inep.censo_matricula import MatriculaETL
+from src.aquisicao.inep.censo_turma import TurmaETL
+from src.io.configs import FATOR_MEMORIA_LEITURA
+from src.io.data_store import DataStore
+from src.io.data_store import Documento
+from src.utils.paralelo import executa_com_limite_memoria
+
+
+def _executa_pipeline(etl: BaseCensoEscolarETL) -> None:
+    """
+    Executa o pipeline completo de um ETL de tabela do censo escolar,
+    sendo utilizada pelos trabalhadores do pool de processos
+
+    :param etl: objeto de ETL a ser executado
+    """
+    etl.pipeline()
+
+
+class CensoEscolarETL(BaseINEPETL):
+    """
+    Classe que realiza o processamento de todas as tabelas do censo
+    escolar de um ano, compartilhando entre elas o web-scraping, o
+    download, a leitura do diretório e dos cabeçalhos do arquivo do
+    censo e o estágio dos dados lidos, e executando o ETL de cada
+    tabela em paralelo enquanto houver memória disponível
+    """
+
+    _etls: typing.List[BaseCensoEscolarETL]
+    _max_trabalhadores: int
+    _limite_memoria: typing.Optional[int]
+    _memoria: typing.Dict[int, int]
+
+    def __init__(
+        self,
+        ds: DataStore,
+        criar_caminho: bool = True,
+        reprocessar: bool = False,
+        ano: typing.Union[int, str] = "ultimo",
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
+        max_trabalhadores: int = 1,
+        limite_memoria: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Instância o objeto de ETL de todas as tabelas do Censo Escolar
+
+        :param ds: instância de objeto data store
+        :param criar_caminho: flag indicando se devemos criar os caminhos
+        :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
+        :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
+        :param max_trabalhadores: número máximo de tabelas processadas ao mesmo
+        tempo, cada uma em um processo próprio
+        :param limite_memoria: memória máxima, em bytes, estimada para as tabelas
+        em processamento, sendo por padrão uma fração da memória disponível
+        """
+        super().__init__(
+            ds,
+            "censo-escolar",
+            ano=ano,
+            criar_caminho=criar_caminho,
+            reprocessar=reprocessar,
+            offline=offline,
+            validade_links=validade_links,
+        )
+        self._max_trabalhadores = max_trabalhadores
+        self._limite_memoria = limite_memoria
+
+        # o ano é obtido uma única vez, evitando que cada tabela refaça o scraping
+        kwargs: typing.Dict[str, typing.Any] = dict(
+            ds=ds,
+            criar_caminho=criar_caminho,
+            reprocessar=reprocessar,
+            ano=self.ano,
+            tamanho_bloco=tamanho_bloco,
+            usar_estagio=usar_estagio,
+            reduzir_tipos=reduzir_tipos,
+            offline=offline,
+            validade_links=validade_links,
+        )
+        self._etls = [
+            EscolaETL(**kwargs),
+            TurmaETL(**kwargs),
+            DocenteETL(**kwargs),
+            GestorETL(**kwargs),
+            *MatriculaETL(**kwargs)._etls,
+        ]
+
+    @property
+    def etls(self) -> typing.List[BaseCensoEscolarETL]:
+        """
+        Lista de ETLs de cada tabela do censo, com a matrícula
+        separada em um ETL por região
+
+        :return: lista de objetos de ETL
+        """
+        return self._etls
+
+    @property
+    def documentos_saida(self) -> typing.List[Documento]:
+        """
+        Gera a lista de documentos de saída
+
+        :return: lista de documentos de saída
+        """
+        return [doc for etl in self._etls for doc in etl.documentos_saida]
+
+    @property
+    def documentos_manifesto(self) -> typing.List[Documento]:
+        """
+        Gera a lista de documentos de manifesto, salvos pelo ETL de cada tabela
+
+        :return: lista de documentos de manifesto
+        """
+        return [doc for etl in self._etls for doc in etl.documentos_manifesto]
+
+    def atualizado(self) -> bool:
+        """
+        Verifica se os dados de todas as tabelas já foram gerados a partir
+        das mesmas entradas, configurações e versão do código, de forma que
+        apenas as tabelas com entradas alteradas sejam processadas novamente
+
+        :return: True se o ETL não precisar ser executado
+        """
+        for etl in self._etls:
+            self.compartilha_inep(etl)
+        return all([etl.atualizado() for etl in self._etls])
+
+    def extract(self) -> None:
+        """
+        Extraí os dados do objeto
+
+        O arquivo do censo é baixado uma única vez e os cabeçalhos de todos
+        os arquivos das tabelas são lidos de uma só vez, ficando em cache
+        para os ETLs de cada tabela. Com o estágio ativado, os arquivos
+        do censo também são descomprimidos uma única vez, antes das tabelas
+        serem processadas em paralelo
+        """
+        # realiza o download dos dados do censo
+        self.download_conteudo()
+
+        # compartilha o resultado do web-scraping com os ETLs de cada tabela
+        for etl in self._etls:
+            self.compartilha_inep(etl)
+
+        # lê o diretório e os cabeçalhos do censo uma única vez
+        padrao_comp = "|".join([f"(?:{etl.padrao_comp})" for etl in self._etls])
+        self._memoria = {i: 0 for i in range(len(self._etls))}
+        for censo in self.documentos_entrada:
+            self._ds.obtem_cabecalhos(
+                documento=censo, padrao_comp=padrao_comp, sep="|", encoding="latin-1"
+            )
+            for arq, tamanho in self._ds.obtem_tamanhos(censo).items():
+                for i, etl in enumerate(self._etls):
+                    if re.search(etl.padrao_comp, arq) is not None:
+                        self._memoria[i] += tamanho * FATOR_MEMORIA_LEITURA
+
+        self.prepara_estagios()
+        self._dados_entrada = list()
+
+    def prepara_estagios(self) -> None:
+        """
+        Salva em sequência o estágio em parquet de cada tabela que ainda
+        não o possui, de forma que o arquivo do censo é aberto e cada um dos
+        seus arquivos internos é descomprimido apenas aqui, e os ETLs das
+        tabelas em paralelo apenas leem os arquivos parquet do estágio
+        """
+        for censo in self.documentos_entrada:
+            for etl in self._etls:
+                if not etl._usar_estagio or etl._tamanho_bloco is not None:
+                    continue
+
+                conf = etl.conf_leitura
+                if not etl.manifesto_estagio(censo, conf).exists():
+                    self._logger.info(f"Gerando o estágio de {censo} para {etl}")
+                    etl.carrega_com_estagio(censo, conf)
+
+    def transform(self) -> None:
+        """
+        Transforma os dados e os adequa para os formatos de
+        saída de interesse
+
+        Para este objeto nós executamos o pipeline de cada tabela, com
+        até max_trabalhadores tabelas em paralelo dentro do limite de memória.
+        O tratamento das tabelas é limitado pela CPU, de forma que cada
+        tabela é processada em um processo próprio, assim como as regiões
+        da matrícula, para não ser serializado pelo GIL
+        """
+        executa_com_limite_memoria(
+            _executa_pipeline,
+            {i: (etl,) for i, etl in enumerate(self._etls)},
+            self._memoria,
+            self._max_trabalhadores,
+            tipo_pool="processo",
+            limite_memoria=self._limite_memoria,
+        )
+
+    def load(self) -> None:
+        """
+        Os dados são exportados pelo pipeline de cada tabela
+        """
+        pass
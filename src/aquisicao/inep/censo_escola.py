@@ -1,6 +1,7 @@
 import typing
 
 import numpy as np
+import pandas as pd
 
 from src.aquisicao.inep._censo_escolar import BaseCensoEscolarETL
 from src.io.data_store import CatalogoAquisicao
@@ -23,6 +24,11 @@ class EscolaETL(BaseCensoEscolarETL):
         criar_caminho: bool = True,
         reprocessar: bool = False,
         ano: typing.Union[int, str] = "ultimo",
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL de dados de Escola
@@ -31,9 +37,28 @@ class EscolaETL(BaseCensoEscolarETL):
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
         :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
         """
         super().__init__(
-            ds, "escolas", ano=ano, criar_caminho=criar_caminho, reprocessar=reprocessar
+            ds,
+            "escolas",
+            ano=ano,
+            criar_caminho=criar_caminho,
+            reprocessar=reprocessar,
+            tamanho_bloco=tamanho_bloco,
+            usar_estagio=usar_estagio,
+            reduzir_tipos=reduzir_tipos,
+            offline=offline,
+            validade_links=validade_links,
         )
 
     @property
@@ -59,13 +84,14 @@ class EscolaETL(BaseCensoEscolarETL):
         :param base: documento com os dados a serem tratados
         """
         super(EscolaETL, self).processa_in(base)
+        novas: typing.Dict[str, typing.Any] = dict()
 
         # cria a coluna IN_ENERGIA_OUTROS
         if (
             "IN_ENERGIA_OUTROS" not in base.data
             and "IN_ENERGIA_INEXISTENTE" in base.data
         ):
-            base.data["IN_ENERGIA_OUTROS"] = (
+            novas["IN_ENERGIA_OUTROS"] = (
                 (
                     base.data[
                         [
@@ -84,7 +110,7 @@ class EscolaETL(BaseCensoEscolarETL):
             "IN_LOCAL_FUNC_GALPAO" not in base.data
             and "TP_OCUPACAO_GALPAO" in base.data
         ):
-            base.data["IN_LOCAL_FUNC_GALPAO"] = np.where(
+            novas["IN_LOCAL_FUNC_GALPAO"] = np.where(
                 (base.data["TP_OCUPACAO_GALPAO"] > 0)
                 & (base.data["TP_OCUPACAO_GALPAO"] <= 3),
                 1,
@@ -93,7 +119,7 @@ class EscolaETL(BaseCensoEscolarETL):
 
         # cria a coluna IN_LINGUA_INDIGENA e IN_LINGUA_PORTUGUESA
         if "IN_LINGUA_INDIGENA" not in base.data and "TP_INDIGENA_LINGUA" in base.data:
-            base.data["IN_LINGUA_INDIGENA"] = (
+            novas["IN_LINGUA_INDIGENA"] = (
                 base.data["TP_INDIGENA_LINGUA"].isin([1, 3])
             ).astype("int")
 
@@ -101,7 +127,7 @@ class EscolaETL(BaseCensoEscolarETL):
             "IN_LINGUA_PORTUGUESA" not in base.data
             and "TP_INDIGENA_LINGUA" in base.data
         ):
-            base.data["IN_LINGUA_PORTUGUESA"] = (
+            novas["IN_LINGUA_PORTUGUESA"] = (
                 base.data["TP_INDIGENA_LINGUA"].isin([2, 3])
             ).astype("int")
 
@@ -116,14 +142,18 @@ class EscolaETL(BaseCensoEscolarETL):
 
         # cria a coluna IN_AGUA_POTAVEL
         if "IN_AGUA_POTAVEL" not in base.data and "IN_AGUA_FILTRADA" in base.data:
-            base.data["IN_AGUA_POTAVEL"] = (
-                (base.data["IN_AGUA_FILTRADA"] == 2)
-            ).astype("int")
+            novas["IN_AGUA_POTAVEL"] = ((base.data["IN_AGUA_FILTRADA"] == 2)).astype(
+                "int"
+            )
 
-        # substítui o valor 9 pelo valor nulo
-        for c in base.data:
+        # substítui o valor 9 pelo valor nulo, apenas nas colunas em que ele ocorre
+        for c in [*base.data, *novas]:
             if c.startswith("IN_"):
-                base.data[c] = base.data[c].replace({9: np.nan})
+                valores = novas[c] if c in novas else base.data[c]
+                if (valores == 9).any():
+                    novas[c] = pd.Series(valores).replace({9: np.nan}).values
+
+        self.anexa_colunas(base, novas)
 
     def processa_tp(self, base: Documento) -> None:
         """
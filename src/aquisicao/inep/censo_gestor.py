@@ -21,6 +21,11 @@ class GestorETL(BaseCensoEscolarETL):
         criar_caminho: bool = True,
         reprocessar: bool = False,
         ano: typing.Union[int, str] = "ultimo",
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL de dados de Gestor
@@ -29,9 +34,28 @@ class GestorETL(BaseCensoEscolarETL):
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
         :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
         """
         super().__init__(
-            ds, "gestor", ano=ano, criar_caminho=criar_caminho, reprocessar=reprocessar
+            ds,
+            "gestor",
+            ano=ano,
+            criar_caminho=criar_caminho,
+            reprocessar=reprocessar,
+            tamanho_bloco=tamanho_bloco,
+            usar_estagio=usar_estagio,
+            reduzir_tipos=reduzir_tipos,
+            offline=offline,
+            validade_links=validade_links,
         )
 
     @property
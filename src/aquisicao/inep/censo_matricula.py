@@ -4,6 +4,14 @@ from src.aquisicao.inep._censo_escolar import BaseCensoEscolarETL
 from src.io.data_store import CatalogoAquisicao
 from src.io.data_store import DataStore
 from src.io.data_store import Documento
+from src.utils.paralelo import executa_com_limite_memoria
+
+# memória estimada por padrão para o processamento de uma região
+MEMORIA_REGIAO = 4 * 2**30
+
+# número de cópias dos dados carregados mantidas simultaneamente durante
+# o tratamento de uma região
+FATOR_MEMORIA_TRATAMENTO = 2
 
 
 class _MatriculaRegiaoETL(BaseCensoEscolarETL):
@@ -26,6 +34,11 @@ class _MatriculaRegiaoETL(BaseCensoEscolarETL):
         ano: typing.Union[int, str] = "ultimo",
         criar_caminho: bool = True,
         reprocessar: bool = False,
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL de dados de Matrícula
@@ -35,6 +48,16 @@ class _MatriculaRegiaoETL(BaseCensoEscolarETL):
         :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
         """
         super().__init__(
             ds,
@@ -43,6 +66,11 @@ class _MatriculaRegiaoETL(BaseCensoEscolarETL):
             criar_caminho=criar_caminho,
             reprocessar=reprocessar,
             regioes=[regiao],
+            tamanho_bloco=tamanho_bloco,
+            usar_estagio=usar_estagio,
+            reduzir_tipos=reduzir_tipos,
+            offline=offline,
+            validade_links=validade_links,
         )
         self.reg = regiao.upper()
 
@@ -78,15 +106,38 @@ class _MatriculaRegiaoETL(BaseCensoEscolarETL):
 
         super(_MatriculaRegiaoETL, self).processa_tp(base)
 
-    def load(self) -> None:
+    def gera_particao(self, doc: Documento) -> Documento:
         """
-        Exporta os dados transformados
+        Gera o documento da partição do ano e região processados em que um
+        documento de saída é exportado, sem alterar o documento de saída
+
+        :param doc: documento de saída
+        :return: documento da partição, com os mesmos dados
         """
-        for doc in self.dados_saida:
-            doc.pasta = f"{doc.nome}/ANO={self.ano}/REGIAO={self.reg}"
-            doc.nome = f"{self.reg}_{self.ano}.parquet"
-            doc.data.drop(columns=["ANO"], inplace=True)
-            self._ds.salva_documento(doc)
+        return Documento(
+            self._ds,
+            referencia=dict(
+                nome=f"{self.reg}_{self.ano}.parquet",
+                colecao=doc.colecao.nome,
+                pasta=f"{doc.nome}/ANO={self.ano}/REGIAO={self.reg}",
+            ),
+            data=doc._data,
+        )
+
+
+def _processa_regiao(etl: _MatriculaRegiaoETL) -> None:
+    """
+    Executa a extração, transformação e exportação dos dados de uma
+    região, sendo utilizada pelos trabalhadores do pool de processos
+
+    :param etl: objeto de ETL da região
+    """
+    if etl._tamanho_bloco is not None:
+        etl.processa_em_blocos()
+    else:
+        etl.extract()
+        etl.transform()
+        etl.load()
 
 
 class MatriculaETL(BaseCensoEscolarETL):
@@ -98,6 +149,9 @@ class MatriculaETL(BaseCensoEscolarETL):
     _configs: typing.Dict[str, typing.Any]
     _documentos_saida: typing.List[Documento]
     _etls: typing.List[_MatriculaRegiaoETL]
+    _max_trabalhadores: int
+    _memoria_trabalhador: int
+    _limite_memoria_regiao: typing.Optional[int]
 
     def __init__(
         self,
@@ -105,6 +159,14 @@ class MatriculaETL(BaseCensoEscolarETL):
         criar_caminho: bool = True,
         reprocessar: bool = False,
         ano: typing.Union[int, str] = "ultimo",
+        tamanho_bloco: typing.Optional[int] = None,
+        usar_estagio: bool = False,
+        reduzir_tipos: bool = False,
+        offline: bool = False,
+        validade_links: typing.Optional[int] = None,
+        max_trabalhadores: int = 1,
+        memoria_trabalhador: typing.Optional[int] = None,
+        limite_memoria_regiao: typing.Optional[int] = None,
     ) -> None:
         """
         Instância o objeto de ETL de dados de Matrícula
@@ -113,6 +175,24 @@ class MatriculaETL(BaseCensoEscolarETL):
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
         :param ano: ano da pesquisa a ser processado (pode ser um inteiro ou 'ultimo')
+        :param tamanho_bloco: número de linhas por bloco para processar os
+        dados em blocos (None processa a tabela inteira em memória)
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet dos
+        arquivos do censo já lidos com as mesmas configurações
+        :param reduzir_tipos: flag se devemos reduzir os tipos das colunas
+        numéricas de saída para os menores tipos sem perda de informação
+        :param offline: flag se devemos utilizar apenas os arquivos já baixados,
+        sem acessar a página do INEP
+        :param validade_links: tempo, em segundos, pelo qual o índice de links da
+        página do INEP salvo no data store é reaproveitado (None não salva o índice)
+        :param max_trabalhadores: número máximo de regiões processadas ao mesmo
+        tempo, cada uma em um processo próprio (1 processa as regiões em sequência)
+        :param memoria_trabalhador: memória, em bytes, reservada para o
+        processamento de cada região, limitando o número de processos
+        simultâneos à memória disponível
+        :param limite_memoria_regiao: memória, em bytes, que os dados de uma região
+        podem ocupar, sendo as regiões que excedam o limite processadas em blocos
+        (None processa todas as regiões inteiras em memória)
         """
         super().__init__(
             ds,
@@ -120,7 +200,17 @@ class MatriculaETL(BaseCensoEscolarETL):
             ano=ano,
             criar_caminho=criar_caminho,
             reprocessar=reprocessar,
+            tamanho_bloco=tamanho_bloco,
+            usar_estagio=usar_estagio,
+            reduzir_tipos=reduzir_tipos,
+            offline=offline,
+            validade_links=validade_links,
+        )
+        self._max_trabalhadores = max_trabalhadores
+        self._memoria_trabalhador = (
+            MEMORIA_REGIAO if memoria_trabalhador is None else memoria_trabalhador
         )
+        self._limite_memoria_regiao = limite_memoria_regiao
         self._etls = [
             _MatriculaRegiaoETL(
                 ds=self._ds,
@@ -128,6 +218,11 @@ class MatriculaETL(BaseCensoEscolarETL):
                 ano=self.ano,
                 criar_caminho=self._criar_caminho,
                 reprocessar=self._reprocessar,
+                tamanho_bloco=self._tamanho_bloco,
+                usar_estagio=self._usar_estagio,
+                reduzir_tipos=self._reduzir_tipos,
+                offline=self._offline,
+                validade_links=self._validade_links,
             )
             for reg in ["CO", "NORDESTE", "NORTE", "SUDESTE", "SUL"]
         ]
@@ -152,6 +247,16 @@ class MatriculaETL(BaseCensoEscolarETL):
             ]
         return self._documentos_saida
 
+    @property
+    def documentos_manifesto(self) -> typing.List[Documento]:
+        """
+        Gera a lista de documentos de manifesto, salvos na partição
+        de cada região
+
+        :return: lista de documentos de manifesto
+        """
+        return [doc for etl in self._etls for doc in etl.documentos_manifesto]
+
     def extract(self) -> None:
         """
         Extraí os dados do objeto
@@ -161,22 +266,110 @@ class MatriculaETL(BaseCensoEscolarETL):
         )
         self._dados_entrada = list()
 
+    def ajusta_blocos_regioes(self) -> None:
+        """
+        Estima a memória ocupada pelos dados de cada região e define o
+        processamento em blocos apenas para as regiões que excedam o limite
+        de memória, com blocos de tantas linhas quanto caibam no limite
+
+        O número de linhas é estimado a partir do tamanho descomprimido dos
+        arquivos e do tamanho médio das suas linhas, enquanto a memória por
+        linha é medida sobre um bloco de amostra já carregado, uma vez que
+        o tamanho em memória difere bastante do tamanho em texto
+        """
+        if self._limite_memoria_regiao is None or self._tamanho_bloco is not None:
+            return
+
+        # realiza o download dos dados do censo
+        self.download_conteudo()
+
+        for etl in self._etls:
+            estimativas = [
+                est
+                for censo in etl.documentos_entrada
+                for est in self._ds.estima_linhas(
+                    censo, padrao_comp=etl.padrao_comp
+                ).values()
+            ]
+            if len(estimativas) == 0:
+                continue
+
+            linhas = sum([t / m for t, m in estimativas])
+            linha = etl.mede_memoria_linha() * FATOR_MEMORIA_TRATAMENTO
+            memoria = linhas * linha
+            if memoria <= self._limite_memoria_regiao:
+                continue
+
+            etl._tamanho_bloco = max(1, int(self._limite_memoria_regiao // linha))
+            self._logger.info(
+                f"A região {etl.reg} ocupa aproximadamente {memoria / 2**20:.0f} MB "
+                f"e será processada em blocos de {etl._tamanho_bloco} linhas"
+            )
+
+    def processa_regioes_em_paralelo(self) -> None:
+        """
+        Executa o ETL de cada região de ponta a ponta em um pool de processos,
+        com até max_trabalhadores regiões simultâneas e apenas tantas regiões
+        quanto couberem na memória disponível dada a memória por trabalhador
+        """
+        executa_com_limite_memoria(
+            _processa_regiao,
+            {etl.reg: (etl,) for etl in self._etls},
+            {etl.reg: self._memoria_trabalhador for etl in self._etls},
+            self._max_trabalhadores,
+            tipo_pool="processo",
+        )
+
     def transform(self) -> None:
         """
         Transforma os dados e os adequa para os formatos de
         saída de interesse
 
         Para este objeto nós fazemos o processamento dos dados de
-        cada região por meio de ETLs para cada uma
+        cada região por meio de ETLs para cada uma, que também exportam
+        os dados caso sejam executados em paralelo ou em blocos
         """
+        for etl in self._etls:
+            self.compartilha_inep(etl)
+        self.ajusta_blocos_regioes()
+
+        if self._max_trabalhadores > 1:
+            self.processa_regioes_em_paralelo()
+            return
+
         for etl in self._etls:
             self._logger.info(f"----- PROCESSANDO DADOS PARA REGIÃO {etl.reg} -----")
-            etl.extract()
-            etl.transform()
+            if etl._tamanho_bloco is not None:
+                etl.processa_em_blocos()
+            else:
+                etl.extract()
+                etl.transform()
 
     def load(self) -> None:
         """
         Exporta os dados transformados utilizando o _MatriculaRegiaoETL
         """
+        # em paralelo os dados já foram exportados por cada processo
+        if self._max_trabalhadores > 1:
+            return
+
+        # as regiões processadas em blocos já foram exportadas
+        for etl in self._etls:
+            if etl._tamanho_bloco is None:
+                etl.load()
+
+    def processa_em_blocos(self) -> None:
+        """
+        Executa o ETL em blocos de linhas para cada uma das regiões
+        utilizando o _MatriculaRegiaoETL
+        """
         for etl in self._etls:
-            etl.load()
+            self.compartilha_inep(etl)
+
+        if self._max_trabalhadores > 1:
+            self.processa_regioes_em_paralelo()
+            return
+
+        for etl in self._etls:
+            self._logger.info(f"----- PROCESSANDO DADOS PARA REGIÃO {etl.reg} -----")
+            etl.processa_em_blocos()
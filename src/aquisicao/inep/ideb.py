@@ -1,4 +1,6 @@
 import abc
+import hashlib
+import json
 import os
 import typing
 
@@ -21,12 +23,14 @@ class IDEBETL(BaseETL, abc.ABC):
 
     URL: str = "https://www.gov.br/inep/pt-br/areas-de-atuacao/pesquisas-estatisticas-e-indicadores/ideb/resultados"
     _links: typing.Dict[Documento, str]
+    _usar_estagio: bool
 
     def __init__(
         self,
         ds: DataStore,
         criar_caminho: bool = True,
         reprocessar: bool = False,
+        usar_estagio: bool = False,
     ) -> None:
         """
         Instância o objeto de ETL INEP
@@ -34,8 +38,11 @@ class IDEBETL(BaseETL, abc.ABC):
         :param ds: instância de objeto data store
         :param criar_caminho: flag indicando se devemos criar os caminhos
         :param reprocessar: flag se devemos reprocessar o conteúdo do ETL
+        :param usar_estagio: flag se devemos reutilizar a cópia em parquet
+        das planilhas já lidas de arquivos com os mesmos conteúdos
         """
         super().__init__(ds, criar_caminho, reprocessar)
+        self._usar_estagio = usar_estagio
         self._dados_saida = [
             Documento(self._ds, referencia=dict(CatalogoAquisicao.IDEB))
         ]
@@ -105,13 +112,82 @@ class IDEBETL(BaseETL, abc.ABC):
 
         # para cada arquivo do censo demográfico
         for ideb in tqdm(self.documentos_entrada):
-            ideb.obtem_dados(
+            conf = dict(
                 como_df=True,
                 padrao_comp=f"({os.path.splitext(ideb.nome)[0]})[.](xlsx|XLSX|xls|XLS)",
                 skiprows=9,
             )
+            if self._usar_estagio:
+                ideb.data = self.carrega_com_estagio(ideb, conf)
+            else:
+                ideb.obtem_dados(**conf)
             self._dados_entrada.append(ideb)
 
+    def documento_estagio(
+        self, ideb: Documento, conf: typing.Dict[str, typing.Any]
+    ) -> Documento:
+        """
+        Gera o documento de estágio de um arquivo do IDEB, identificado
+        pelo hash dos conteúdos do arquivo e das configurações de leitura
+
+        :param ideb: documento do arquivo do IDEB
+        :param conf: configurações de leitura do arquivo
+        :return: documento parquet na coleção de dados externos
+        """
+        hash_conf = hashlib.sha1(
+            json.dumps(conf, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        hash_ideb = self._ds.obtem_hash(ideb)
+        return Documento(
+            self._ds,
+            referencia=dict(
+                nome=f"{hash_ideb[:16]}_{hash_conf[:16]}.parquet",
+                colecao=COLECAO_DADOS_WEB,
+                pasta="ideb/estagio",
+            ),
+        )
+
+    def carrega_com_estagio(
+        self, ideb: Documento, conf: typing.Dict[str, typing.Any]
+    ) -> typing.Any:
+        """
+        Carrega a planilha de um arquivo do IDEB reaproveitando a cópia em
+        parquet salva na primeira leitura de um arquivo com os mesmos
+        conteúdos e configurações de leitura, evitando ler o excel novamente
+
+        :param ideb: documento do arquivo do IDEB
+        :param conf: configurações de leitura do arquivo
+        :return: dados carregados como seriam devolvidos pelo data store
+        """
+        estagio = self.documento_estagio(ideb, conf)
+
+        # caso o estágio exista, carrega a planilha a partir do parquet
+        if estagio.exists():
+            self._logger.info(f"Carregando {ideb} a partir do estágio {estagio}")
+            df = self._ds.carrega_como_objeto(estagio, como_df=True, texto_arrow=False)
+
+            # o parquet lê nulos de texto como None
+            cols_obj = [c for c in df if df[c].dtype == "object"]
+            df[cols_obj] = df[cols_obj].fillna(np.nan)
+            return df
+
+        # caso contrário, lê a planilha e salva o estágio
+        dados = self._ds.carrega_como_objeto(ideb, **conf)
+        if not isinstance(dados, pd.DataFrame):
+            return dados
+
+        # as colunas de texto misturam números e marcadores como "-" e "ND",
+        # sendo guardadas como texto, que é como os valores são tratados
+        estagio.data = dados.assign(
+            **{
+                c: dados[c].astype(str).where(dados[c].notna())
+                for c in dados
+                if dados[c].dtype == "object"
+            }
+        )
+        self._ds.salva_documento(estagio)
+        return dados
+
     @staticmethod
     def extrai_turma(doc: Documento) -> str:
         """
@@ -202,31 +278,67 @@ class IDEBETL(BaseETL, abc.ABC):
         return pd.DataFrame(proc)
 
     @staticmethod
-    def formata_resultados(df: pd.DataFrame, dados: pd.DataFrame) -> pd.DataFrame:
+    def limpa_valores(bloco: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte os valores das métricas para float de uma só vez sobre o
+        bloco largo, removendo os marcadores de asterisco, trocando a vírgula
+        decimal por ponto e anulando os valores não divulgados. Apenas os
+        valores distintos do bloco são limpos, sendo o resultado propagado
+        para todas as células por indexação
+
+        :param bloco: data frame com as colunas de métricas
+        :return: data frame com os valores em float32
+        """
+        texto = bloco.select_dtypes(include="object").columns
+        if len(texto) > 0:
+            codigos, unicos = pd.factorize(bloco[texto].to_numpy().ravel())
+            limpos = (
+                pd.Series(unicos, dtype="object")
+                .astype(str)
+                .str.replace("*", "", regex=False)
+                .str.replace(",", ".", regex=False)
+                .replace({"-": np.nan, "ND": np.nan})
+                .astype("float32")
+            )
+
+            # a última posição da tabela recebe os nulos, com código -1
+            tabela = np.append(limpos.to_numpy(), np.float32(np.nan))
+            bloco = bloco.copy()
+            bloco[texto] = tabela[codigos].reshape(len(bloco), len(texto))
+        return bloco.astype("float32")
+
+    @classmethod
+    def formata_resultados(cls, df: pd.DataFrame, dados: pd.DataFrame) -> pd.DataFrame:
         """
         Formata o dataframe para as saídas esperadas da base de IDEB
 
+        Os nomes das colunas são convertidos uma única vez em um índice de
+        métrica e ano, e o ano é levado para as linhas por um `stack`, sem
+        passar por uma base longa com uma linha por valor
+
         :param df: data frame com os dados processados
         :param dados: de-para de coluna e métrica/ano
         :return: base de saída formatada
         """
+        bloco = cls.limpa_valores(df[dados["COLUNA"].to_list()])
+        bloco.index = pd.Index(df["ID_ESCOLA"], name="ID_ESCOLA")
+        bloco.columns = pd.MultiIndex.from_arrays(
+            [dados["METRICA"], dados["ANO"]], names=["METRICA", "ANO"]
+        )
+
+        # colunas ou escolas repetidas mantêm o primeiro valor não nulo
+        if bloco.columns.has_duplicates:
+            bloco = bloco.T.groupby(level=["METRICA", "ANO"], sort=False).first().T
+        if bloco.index.has_duplicates:
+            bloco = bloco.groupby(level="ID_ESCOLA", sort=False).first()
+
+        # o stack descarta as linhas sem nenhum valor, assim como o pivot
         return (
-            df.melt(id_vars="ID_ESCOLA", var_name="COLUNA", value_name="VALOR")
-            .merge(dados)
-            .assign(
-                VALOR=lambda f: f["VALOR"]
-                .astype(str)
-                .str.replace("[*]", "")
-                .str.replace("[,]", ".")
-                .replace({"-": np.nan, "ND": np.nan})
-                .astype("float32")
-            )
-            .pivot_table(
-                index=["ID_ESCOLA", "ANO"],
-                columns=["METRICA"],
-                values="VALOR",
-                aggfunc="first",
-            )
+            bloco.stack(level="ANO")
+            .dropna(axis=1, how="all")
+            .astype("float32")
+            .sort_index()
+            .sort_index(axis=1)
             .reset_index()
         )
 
@@ -235,16 +347,25 @@ class IDEBETL(BaseETL, abc.ABC):
         """
         Concatena as bases de dados de IDEB
 
+        As bases são indexadas e ordenadas por escola e ano e então
+        alinhadas em um único concat lateral, sem os merges sucessivos
+        que copiariam a base acumulada a cada etapa
+
         :param saidas: lista com bases de IDEB
         :return: base concatenada única
         """
-        df = pd.DataFrame()
-        for s in saidas:
-            if df.shape[0] == 0:
-                df = s
-            else:
-                df = df.merge(s, on=["ID_ESCOLA", "ANO"], how="outer")
-        return df
+        if len(saidas) == 0:
+            return pd.DataFrame()
+
+        indexadas = [s.set_index(["ID_ESCOLA", "ANO"]).sort_index() for s in saidas]
+
+        # a união dos índices não preserva o tipo das chaves
+        return (
+            pd.concat(indexadas, axis=1, join="outer")
+            .sort_index()
+            .reset_index()
+            .astype(saidas[0][["ID_ESCOLA", "ANO"]].dtypes.to_dict())
+        )
 
     def transform(self) -> None:
         """
@@ -264,7 +385,7 @@ class IDEBETL(BaseETL, abc.ABC):
             # extraí as métricas reportadas na base
             dados = self.obtem_metricas(df, turma)
 
-            # realiza o melt dos dados e obtém os nomes de campo ajustados
+            # reorganiza os dados por escola e ano com os nomes de campo ajustados
             df = self.formata_resultados(df, dados)
             saidas.append(df)
 
@@ -31,7 +31,12 @@ class MicroINEPETL(Enum):
 
 class ETLClass(typing.Protocol):
     def __call__(
-        self, ds: DataStore, criar_caminho: bool, reprocessar: bool
+        self,
+        *,
+        ds: DataStore,
+        criar_caminho: bool,
+        reprocessar: bool,
+        usar_estagio: bool = ...,
     ) -> BaseETL:
         ...
 
@@ -43,6 +48,11 @@ class INEPMicroClass(typing.Protocol):
         criar_caminho: bool,
         reprocessar: bool,
         ano: typing.Union[str, int],
+        tamanho_bloco: typing.Optional[int],
+        usar_estagio: bool,
+        reduzir_tipos: bool,
+        offline: bool,
+        validade_links: typing.Optional[int],
     ) -> BaseINEPETL:
         ...
 
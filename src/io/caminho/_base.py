@@ -264,15 +264,19 @@ class _CaminhoBase(abc.ABC):
         """
         raise NotImplementedError
 
-    def read_parquet(self, nome_arq: str, **kwargs: typing.Any) -> pd.DataFrame:
+    def read_parquet(
+        self, nome_arq: str, texto_arrow: bool = False, **kwargs: typing.Any
+    ) -> pd.DataFrame:
         """
         Carrega o arquivo como um dataframe pandas de acordo com o arquivo específicado
 
         :param nome_arq: nome do arquivo a ser carregado
+        :param texto_arrow: flag se as colunas de texto devem ser mantidas nos buffers do arrow
         :param kwargs: argumentos de carregamento para serem passados para função pandas
         :return: data frame com objeto carregado
         """
-        return self.read_df(nome_arq, pd.read_parquet, **kwargs)
+        func = le_dados.le_parquet_arrow if texto_arrow else pd.read_parquet
+        return self.read_df(nome_arq, func, **kwargs)
 
     def read_feather(self, nome_arq: str, **kwargs: typing.Any) -> pd.DataFrame:
         """
@@ -14,6 +14,7 @@ from pydrive2.drive import GoogleDrive
 from pydrive2.drive import GoogleDriveFile
 
 from src.io.configs import EXTENSOES_SHAPE
+from src.io.le_dados import le_parquet_arrow
 from src.utils.info import CAMINHO_INFO
 from src.utils.interno import obtem_argumentos_objeto
 from src.utils.interno import obtem_extencao
@@ -415,20 +416,22 @@ class CaminhoGDrive(_CaminhoBase, ABC):
             for cont in os.listdir(tmpp):
                 self.upload_conteudo(cont, tmpp)
 
-    def read_parquet(self, nome_arq: str, **kwargs: typing.Any) -> pd.DataFrame:
+    def read_parquet(
+        self, nome_arq: str, texto_arrow: bool = False, **kwargs: typing.Any
+    ) -> pd.DataFrame:
         """
         Carrega o arquivo como um dataframe pandas de acordo com o arquivo específicado
 
         :param nome_arq: nome do arquivo a ser carregado
+        :param texto_arrow: flag se as colunas de texto devem ser mantidas nos buffers do arrow
         :param kwargs: argumentos de carregamento para serem passados para função pandas
         :return: data frame com objeto carregado
         """
+        func = le_parquet_arrow if texto_arrow else pd.read_parquet
         if self.verifica_se_arquivo(nome_arq):
-            return self.read_df(nome_arq, pd.read_parquet, **kwargs)
+            return self.read_df(nome_arq, func, **kwargs)
         else:
-            return self.from_dir_download(
-                nome_arq, ["parquet"], pd.read_parquet, **kwargs
-            )
+            return self.from_dir_download(nome_arq, ["parquet"], func, **kwargs)
 
     def gpd_read_shape(self, nome_arq: str, **kwargs: typing.Any) -> gpd.GeoDataFrame:
         """
@@ -4,6 +4,7 @@ from pathlib import Path
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
 
 from src.configs import PASTA_DADOS
 
@@ -81,3 +82,51 @@ LEITOR_GEOPANDAS: typing.Dict[str, typing.Callable] = {
     "geojson": gpd.read_file,
     "topojson": gpd.read_file,
 }
+
+# motores disponíveis para leitura de arquivos csv
+MOTORES_CSV = {"pandas", "pyarrow"}
+
+# de-para entre os tipos de dados pandas e os tipos do leitor de csv do
+# pyarrow, que não suporta float16 e portanto lê estas colunas como float32
+TIPOS_ARROW: typing.Dict[str, pa.DataType] = {
+    "str": pa.string(),
+    "object": pa.string(),
+    "float16": pa.float32(),
+    "float32": pa.float32(),
+    "float64": pa.float64(),
+    "int8": pa.int8(),
+    "int16": pa.int16(),
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "uint8": pa.uint8(),
+    "uint16": pa.uint16(),
+    "uint32": pa.uint32(),
+    "uint64": pa.uint64(),
+}
+
+# de-para entre os tipos de texto do arrow e o tipo string do pandas que
+# mantém os dados nos buffers do arrow, utilizado no modo texto_arrow
+TIPOS_TEXTO_ARROW: typing.Dict[pa.DataType, pd.api.extensions.ExtensionDtype] = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.large_string(): pd.StringDtype("pyarrow"),
+}
+
+# fator multiplicativo sobre o tamanho descomprimido de um arquivo para
+# estimar a memória ocupada durante sua leitura
+FATOR_MEMORIA_LEITURA = 2
+
+# programas externos capazes de extrair um único arquivo de um arquivo
+# comprimido para a saída padrão, por ordem de preferência, utilizados
+# quando o python não consegue descomprimir o arquivo (ex.: Deflate64)
+EXTRATORES_EXTERNOS: typing.Dict[str, typing.List[typing.List[str]]] = {
+    "zip": [
+        ["7z", "x", "-so", "{arquivo}", "{membro}"],
+        ["unzip", "-p", "{arquivo}", "{membro}"],
+        ["bsdtar", "-xOf", "{arquivo}", "{membro}"],
+    ],
+    "rar": [
+        ["unrar", "p", "-inul", "{arquivo}", "{membro}"],
+        ["7z", "x", "-so", "{arquivo}", "{membro}"],
+        ["bsdtar", "-xOf", "{arquivo}", "{membro}"],
+    ],
+}
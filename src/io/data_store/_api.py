@@ -13,13 +13,28 @@ from src.io.caminho import CaminhoLocal
 from src.io.caminho import CaminhoSQLite
 from src.io.caminho import obtem_objeto_caminho
 from src.io.caminho._base import _CaminhoBase
-from src.io.configs import DS_ENVS, EXTENSOES_TEXTO
+from src.io.configs import DS_ENVS, EXTENSOES_TEXTO, MOTORES_CSV
+from src.io.escreve_dados import EscritorParquet
+from src.io.le_dados import estima_linhas_comprimidos
+from src.io.le_dados import itera_dados_comprimidos
+from src.io.le_dados import le_como_df
+from src.io.le_dados import le_como_df_em_blocos
 from src.io.le_dados import le_dados_comprimidos
+from src.io.le_dados import obtem_cabecalhos_comprimidos
+from src.io.le_dados import obtem_tamanhos_comprimidos
 from src.utils.info import CAMINHO_INFO
+from src.utils.interno import calcula_hash_arquivo
+from src.utils.interno import obtem_argumentos_objeto
+from src.utils.interno import obtem_chave_arquivo
 from src.utils.interno import obtem_extencao
+from src.utils.paralelo import POOLS
 from ._catalogo import CatalogoInfo
 
 
+# nome do índice de hashes dos documentos salvo em cada pasta
+INDICE_HASHES = "hashes.json"
+
+
 class Documento(Hashable):
     """
     Representa a interface com os dados que podem ser acessados
@@ -231,6 +246,11 @@ class DataStore:
     """
 
     _env: str
+    _motor_csv: str
+    _texto_arrow: bool
+    _max_leitores: int
+    _pool_leitura: str
+    _limite_memoria_leitura: typing.Optional[int]
     caminho_base: _CaminhoBase
     _logger: logging.Logger
 
@@ -239,16 +259,53 @@ class DataStore:
     _df_ep: pd.DataFrame
     _df_cp: pd.DataFrame
 
-    def __init__(self, env: str = "local_completo") -> None:
+    def __init__(
+        self,
+        env: str = "local_completo",
+        motor_csv: str = "pandas",
+        texto_arrow: bool = False,
+        max_leitores: int = 1,
+        pool_leitura: str = "thread",
+        limite_memoria_leitura: typing.Optional[int] = None,
+    ) -> None:
         """
         Gera uma instância do data store
 
         :param env: ambiente do objeto data store
-        """
+        :param motor_csv: motor padrão de leitura de arquivos csv (pandas ou pyarrow)
+        :param texto_arrow: flag se as colunas de texto dos arquivos parquet e
+        dos arquivos csv lidos pelo pyarrow devem ser mantidas nos buffers do
+        arrow (tipo string[pyarrow]) em vez de convertidas para objetos python
+        :param max_leitores: número máximo de arquivos de um mesmo arquivo
+        comprimido lidos simultaneamente
+        :param pool_leitura: tipo de pool utilizado na leitura paralela dos
+        arquivos comprimidos (thread ou processo)
+        :param limite_memoria_leitura: memória máxima, em bytes, dos arquivos
+        em leitura simultânea, sendo por padrão uma fração da memória disponível
+        """
+        if motor_csv not in MOTORES_CSV:
+            raise ValueError(f"O motor de leitura {motor_csv} não existe")
+        if pool_leitura not in POOLS:
+            raise ValueError(f"O tipo de pool {pool_leitura} não existe")
+
         self._env = env
+        self._motor_csv = motor_csv
+        self._texto_arrow = texto_arrow
+        self._max_leitores = max_leitores
+        self._pool_leitura = pool_leitura
+        self._limite_memoria_leitura = limite_memoria_leitura
         self._logger = logging.getLogger(__name__)
         self.caminho_base = obtem_objeto_caminho(DS_ENVS[env])
 
+    @property
+    def texto_arrow(self) -> bool:
+        """
+        Indica se as colunas de texto são mantidas nos buffers do arrow
+
+        :return: flag do modo de texto do arrow
+        """
+        return self._texto_arrow
+
     @property
     def df_ee(self) -> pd.DataFrame:
         """
@@ -386,6 +443,10 @@ class DataStore:
         # obtém o objeto caminho para o documento
         cam = self.gera_caminho(documento=documento)
 
+        # obtém o motor de leitura de arquivos csv
+        motor_csv = kwargs.pop("motor_csv", self._motor_csv)
+        texto_arrow = kwargs.pop("texto_arrow", self._texto_arrow)
+
         # obtém a extenção do arquivo
         if "ext" not in kwargs:
             ext = documento.tipo
@@ -400,6 +461,12 @@ class DataStore:
         # se a extenção do arquivo for zip
         elif ext == "zip":
             # nós vamos processar o zip lendo diversos arquivos
+            if kwargs.get("como_df"):
+                kwargs["motor_csv"] = motor_csv
+                kwargs["texto_arrow"] = texto_arrow
+            kwargs.setdefault("max_trabalhadores", self._max_leitores)
+            kwargs.setdefault("tipo_pool", self._pool_leitura)
+            kwargs.setdefault("limite_memoria", self._limite_memoria_leitura)
             return le_dados_comprimidos(
                 cam.buffer_para_arquivo(documento.nome), ext, **kwargs
             )
@@ -410,7 +477,9 @@ class DataStore:
 
             # se estiver carrega os dados com o pandas
             if ext == "parquet":
-                return cam.read_parquet(nome_arq=documento.nome, **kwargs)
+                return cam.read_parquet(
+                    nome_arq=documento.nome, texto_arrow=texto_arrow, **kwargs
+                )
             elif ext == "hdf" or ext == "h5":
                 return cam.read_hdf(nome_arq=documento.nome, **kwargs)
             elif ext == "pkl":
@@ -418,6 +487,14 @@ class DataStore:
             elif ext == "feather":
                 return cam.read_feather(nome_arq=documento.nome, **kwargs)
             elif ext == "csv" or ext == "txt" or ext == "tsv":
+                if motor_csv == "pyarrow":
+                    return le_como_df(
+                        cam.buffer_para_arquivo(documento.nome),
+                        ext,
+                        motor_csv=motor_csv,
+                        texto_arrow=texto_arrow,
+                        **kwargs,
+                    )
                 return cam.read_csv(nome_arq=documento.nome, **kwargs)
             elif ext == "xlsx" or ext == "xls":
                 return cam.read_excel(nome_arq=documento.nome, **kwargs)
@@ -475,6 +552,177 @@ class DataStore:
                     f"arquivos do tipo {ext}"
                 )
 
+    def obtem_cabecalhos(
+        self, documento: Documento, **kwargs
+    ) -> typing.Dict[str, typing.List[str]]:
+        """
+        Obtém a lista de colunas dos arquivos de texto contidos em um
+        documento comprimido lendo apenas as linhas de cabeçalho
+
+        :param documento: documento a ser inspecionado
+        :param kwargs: parâmetros de leitura (padrao_comp, sep e encoding)
+        :return: dicionário com nome do arquivo e lista de colunas
+        """
+        self._logger.debug(f"Obtendo cabeçalhos do documento {documento}")
+
+        # obtém a extenção do arquivo
+        ext = kwargs.pop("ext", documento.tipo)
+        if ext != "zip" and ext != "rar":
+            raise NotImplementedError(
+                f"Não criamos um método para obter os cabeçalhos de arquivos {ext}"
+            )
+
+        cam = self.gera_caminho(documento=documento)
+        buffer = cam.buffer_para_arquivo(documento.nome)
+        try:
+            return obtem_cabecalhos_comprimidos(
+                buffer,
+                ext,
+                **obtem_argumentos_objeto(obtem_cabecalhos_comprimidos, kwargs),
+            )
+        finally:
+            buffer.close()
+
+    def obtem_tamanhos(self, documento: Documento) -> typing.Dict[str, int]:
+        """
+        Obtém o tamanho descomprimido dos arquivos contidos em um
+        documento comprimido lendo apenas o seu diretório
+
+        :param documento: documento a ser inspecionado
+        :return: dicionário com nome do arquivo e tamanho em bytes
+        """
+        if documento.tipo != "zip" and documento.tipo != "rar":
+            raise NotImplementedError(
+                f"Não criamos um método para obter os tamanhos de arquivos "
+                f"{documento.tipo}"
+            )
+
+        cam = self.gera_caminho(documento=documento)
+        buffer = cam.buffer_para_arquivo(documento.nome)
+        try:
+            return obtem_tamanhos_comprimidos(buffer, documento.tipo)
+        finally:
+            buffer.close()
+
+    def estima_linhas(
+        self, documento: Documento, padrao_comp: str = "^", n_linhas: int = 1000
+    ) -> typing.Dict[str, typing.Tuple[int, float]]:
+        """
+        Estima o tamanho descomprimido e o tamanho médio das linhas dos
+        arquivos de texto contidos em um documento comprimido
+
+        :param documento: documento a ser inspecionado
+        :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+        :param n_linhas: número de linhas lidas para estimar o tamanho médio
+        :return: dicionário com nome do arquivo e tupla com o tamanho
+        descomprimido e o tamanho médio de uma linha, ambos em bytes
+        """
+        if documento.tipo != "zip" and documento.tipo != "rar":
+            raise NotImplementedError(
+                f"Não criamos um método para estimar as linhas de arquivos "
+                f"{documento.tipo}"
+            )
+
+        cam = self.gera_caminho(documento=documento)
+        buffer = cam.buffer_para_arquivo(documento.nome)
+        try:
+            return estima_linhas_comprimidos(
+                buffer, documento.tipo, padrao_comp=padrao_comp, n_linhas=n_linhas
+            )
+        finally:
+            buffer.close()
+
+    def obtem_hash(self, documento: Documento) -> str:
+        """
+        Calcula o hash dos conteúdos de um documento, que pode ser utilizado
+        como identificador da versão do arquivo
+
+        Para arquivos em disco o hash é guardado em um índice na pasta do
+        documento junto ao tamanho e à data de modificação do arquivo, de
+        forma que os conteúdos só são lidos novamente quando um deles mudar
+
+        :param documento: documento a ser inspecionado
+        :return: hash hexadecimal dos conteúdos
+        """
+        cam = self.gera_caminho(documento=documento)
+        buffer = cam.buffer_para_arquivo(documento.nome)
+        try:
+            chave = obtem_chave_arquivo(buffer)
+            if chave is None:
+                return calcula_hash_arquivo(buffer)
+
+            info = dict(tamanho=os.path.getsize(chave[0]), modificacao=chave[1])
+            indice = Documento(
+                self,
+                referencia=dict(
+                    nome=INDICE_HASHES,
+                    colecao=documento.colecao.nome,
+                    pasta=documento.pasta or "",
+                ),
+            )
+            try:
+                hashes = self.carrega_como_objeto(indice) if indice.exists() else {}
+            except ValueError:
+                # um índice corrompido é apenas reconstruído
+                hashes = dict()
+
+            registro = hashes.get(documento.nome, dict())
+            if all([registro.get(k) == v for k, v in info.items()]):
+                return registro["hash"]
+
+            hashes[documento.nome] = dict(hash=calcula_hash_arquivo(buffer), **info)
+            indice.data = hashes
+            self.salva_documento(indice)
+            return hashes[documento.nome]["hash"]
+        finally:
+            buffer.close()
+
+    def carrega_em_blocos(
+        self, documento: Documento, tamanho_bloco: int, **kwargs
+    ) -> typing.Iterator[typing.Tuple[str, pd.DataFrame]]:
+        """
+        Carrega os dados de texto de um determinado documento como uma
+        sequência de data frames com no máximo tamanho_bloco linhas
+
+        :param documento: documento a ser carregado
+        :param tamanho_bloco: número de linhas de cada bloco
+        :param kwargs: parâmetros de carregamento
+        :return: gerador de tuplas com nome do arquivo e bloco de dados
+        """
+        self._logger.debug(f"Carregando documento {documento} em blocos")
+
+        # obtém o objeto caminho para o documento
+        cam = self.gera_caminho(documento=documento)
+
+        # obtém a extenção do arquivo
+        ext = kwargs.pop("ext", documento.tipo)
+        kwargs.pop("como_df", None)
+
+        if ext == "zip" or ext == "rar":
+            yield from itera_dados_comprimidos(
+                cam.buffer_para_arquivo(documento.nome), ext, tamanho_bloco, **kwargs
+            )
+        else:
+            for bloco in le_como_df_em_blocos(
+                cam.buffer_para_arquivo(documento.nome), ext, tamanho_bloco, **kwargs
+            ):
+                yield documento.nome, bloco
+
+    def gera_escritor_parquet(self, documento: Documento, **kwargs) -> EscritorParquet:
+        """
+        Gera um objeto de escrita que permite exportar os dados de um
+        documento parquet bloco a bloco
+
+        :param documento: documento a ser salvo
+        :param kwargs: parâmetros para salvar
+        :return: objeto de escrita do parquet
+        """
+        self._logger.debug(f"Salvando documento {documento} em blocos")
+
+        # obtém o objeto caminho para o documento
+        cam = self.gera_caminho(documento=documento, criar_caminho=True)
+        return EscritorParquet(cam.buffer_para_escrita(documento.nome), **kwargs)
+
     def salva_documento(self, documento: Documento, **kwargs) -> None:
         """
         Insere os dados de um documento para o data store
@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import json
 import pickle
 import typing
@@ -5,6 +7,8 @@ from io import StringIO
 
 import geopandas as gpd
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import yaml
 
 from src.io.configs import ESCREVE_PANDAS, ESCREVE_GEOPANDAS, EXTENSOES_TEXTO
@@ -96,3 +100,83 @@ def escreve_para_buffer(
             raise NotImplementedError(
                 f"Não implementamos um método de escrita para {type(dados)} no formato {ext}"
             )
+
+
+class EscritorParquet:
+    """
+    Escreve uma sequência de data frames como row groups de um
+    único arquivo parquet, permitindo exportar bases maiores do
+    que a memória disponível bloco a bloco
+    """
+
+    _buffer: typing.BinaryIO
+    _escritor: typing.Union[None, pq.ParquetWriter]
+    _schema: typing.Union[None, pa.Schema]
+    _kwargs: typing.Dict[str, typing.Any]
+
+    def __init__(self, buffer: typing.BinaryIO, **kwargs: typing.Any) -> None:
+        """
+        Instancia o objeto de escrita
+
+        :param buffer: buffer que irá reter o conteúdo
+        :param kwargs: argumentos de escrita do parquet
+        """
+        self._buffer = buffer
+        self._escritor = None
+        self._schema = None
+        self._kwargs = obtem_argumentos_objeto(pq.ParquetWriter, kwargs)
+
+    @staticmethod
+    def normaliza_campo(campo: pa.Field) -> pa.Field:
+        """
+        Ajusta o tipo de um campo do primeiro bloco para que ele
+        também comporte os valores dos blocos seguintes
+
+        :param campo: campo do schema do primeiro bloco
+        :return: campo com o tipo ajustado
+        """
+        if pa.types.is_null(campo.type):
+            return campo.with_type(pa.string())
+        if pa.types.is_dictionary(campo.type):
+            return campo.with_type(
+                pa.dictionary(pa.int32(), campo.type.value_type, campo.type.ordered)
+            )
+        return campo
+
+    def escreve(self, dados: pd.DataFrame) -> None:
+        """
+        Adiciona um data frame ao arquivo como um novo row group
+
+        :param dados: data frame a ser exportado
+        """
+        tabela = pa.Table.from_pandas(dados, schema=self._schema, preserve_index=False)
+
+        # o schema do primeiro bloco é fixado para todo o arquivo,
+        # colunas totalmente nulas são tratadas como texto e colunas
+        # categóricas usam índices int32, já que o número de categorias
+        # pode crescer nos blocos seguintes
+        if self._escritor is None:
+            self._schema = pa.schema(
+                [self.normaliza_campo(f) for f in tabela.schema],
+                metadata=tabela.schema.metadata,
+            )
+            tabela = tabela.cast(self._schema)
+            self._escritor = pq.ParquetWriter(
+                self._buffer, self._schema, **self._kwargs
+            )
+
+        self._escritor.write_table(tabela)
+
+    def close(self) -> None:
+        """
+        Finaliza o arquivo parquet e fecha o buffer
+        """
+        if self._escritor is not None:
+            self._escritor.close()
+        self._buffer.close()
+
+    def __enter__(self) -> EscritorParquet:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
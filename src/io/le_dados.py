@@ -3,20 +3,128 @@ import logging
 import os
 import pickle
 import re
+import shutil
+import signal
+import subprocess
 import tempfile
 import typing
+from contextlib import contextmanager
 from io import BytesIO
 from pathlib import Path
 from zipfile import ZipFile
 
 import pandas as pd
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import pyunpack
 import yaml
 from charamel import Detector
 from rarfile import RarFile
 
 from src.io.configs import LEITOR_PANDAS, LEITOR_GEOPANDAS, EXTENSOES_TEXTO
+from src.io.configs import MOTORES_CSV, TIPOS_ARROW, TIPOS_TEXTO_ARROW
+from src.io.configs import FATOR_MEMORIA_LEITURA
+from src.io.configs import EXTRATORES_EXTERNOS
 from src.utils.interno import obtem_argumentos_objeto, obtem_extencao
+from src.utils.interno import obtem_chave_arquivo
+from src.utils.paralelo import executa_com_limite_memoria
+
+# cache de lista de arquivos e de cabeçalhos de arquivos comprimidos, as chaves
+# são formadas pelo caminho do arquivo comprimido e sua data de modificação, e
+# as dos cabeçalhos também pelo arquivo interno, separador e codificação
+_CACHE_ARQUIVOS: typing.Dict[typing.Tuple[str, float], typing.List[str]] = dict()
+_CACHE_CABECALHOS: typing.Dict[
+    typing.Tuple[str, float, str, str, str], typing.Dict[str, typing.List[str]]
+] = dict()
+
+
+def le_csv_arrow(
+    dados: typing.BinaryIO,
+    sep: str = ",",
+    encoding: str = "utf8",
+    usecols: typing.Optional[typing.List[str]] = None,
+    dtype: typing.Optional[typing.Dict[str, str]] = None,
+    nrows: typing.Optional[int] = None,
+    texto_arrow: bool = False,
+) -> pd.DataFrame:
+    """
+    Le os dados de um arquivo csv contido num buffer utilizando o leitor
+    multithread do pyarrow e devolve um data frame pandas
+
+    :param dados: bytes IO com dados de entrada
+    :param sep: separador de colunas
+    :param encoding: codificação do arquivo
+    :param usecols: lista de colunas a serem carregadas
+    :param dtype: dicionário com tipo de dados pandas por coluna
+    :param nrows: número de linhas a serem carregadas
+    :param texto_arrow: flag se as colunas de texto devem ser mantidas
+    nos buffers do arrow em vez de convertidas para objetos python
+    :return: data frame pandas
+    """
+    dtype = dict() if dtype is None else dtype
+    tabela = pa_csv.read_csv(
+        dados,
+        read_options=pa_csv.ReadOptions(
+            encoding=getattr(encoding, "value", encoding), use_threads=True
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types={
+                c: TIPOS_ARROW[t] for c, t in dtype.items() if t in TIPOS_ARROW
+            },
+            strings_can_be_null=True,
+        ),
+    )
+    if nrows is not None:
+        tabela = tabela.slice(0, nrows)
+
+    # converte os dados para pandas e ajusta os tipos que não são suportados
+    # diretamente pelo pyarrow
+    df = tabela.to_pandas(types_mapper=TIPOS_TEXTO_ARROW.get if texto_arrow else None)
+    return df.astype(
+        {
+            c: t
+            for c, t in dtype.items()
+            if c in df and t not in ["str", "object"] and df[c].dtype != t
+        }
+    )
+
+
+def le_parquet_arrow(
+    caminho: typing.Union[str, typing.BinaryIO], **kwargs: typing.Any
+) -> pd.DataFrame:
+    """
+    Le um arquivo ou diretório parquet mantendo as colunas de texto nos
+    buffers do arrow, sem convertê-las para objetos python. As colunas
+    codificadas como dicionário continuam sendo lidas como categóricas
+
+    :param caminho: caminho ou buffer do arquivo parquet
+    :param kwargs: parâmetros de leitura do pyarrow (columns, filters, etc.)
+    :return: data frame pandas
+    """
+    return pq.read_table(caminho, **kwargs).to_pandas(
+        types_mapper=TIPOS_TEXTO_ARROW.get
+    )
+
+
+def detecta_codificacao(dados: typing.IO[bytes]) -> str:
+    """
+    Detecta a codificação de um arquivo de texto a partir dos seus primeiros
+    bytes, sem consumi-los do buffer. Buffers que não permitem retornar a
+    posição inicial, como a saída de um processo, são apenas espiados
+
+    :param dados: bytes IO com dados de entrada
+    :return: codificação detectada ou latin-1 caso não seja possível detectá-la
+    """
+    if dados.seekable():
+        file_bytes = dados.read(10000)
+        dados.seek(0)
+    else:
+        file_bytes = dados.peek(10000)[:10000]  # type: ignore
+    det = Detector(min_confidence=0.5)
+    encoding = det.detect(file_bytes)
+    return "latin-1" if encoding is None else encoding
 
 
 def le_como_df(dados: typing.BinaryIO, ext: str, **kwargs: typing.Any) -> pd.DataFrame:
@@ -25,19 +133,24 @@ def le_como_df(dados: typing.BinaryIO, ext: str, **kwargs: typing.Any) -> pd.Dat
 
     :param dados: bytes IO com dados de entrada
     :param ext: extenção / formato do arquivo
+    :param motor_csv: motor de leitura de arquivos csv (pandas ou pyarrow)
     :param kwargs: parâmetros de leitura
     :return: objeto python
     """
+    # obtém o motor de leitura de arquivos de texto
+    motor_csv = kwargs.pop("motor_csv", "pandas")
+    if motor_csv not in MOTORES_CSV:
+        raise ValueError(f"O motor de leitura {motor_csv} não existe")
+
     # para arquivos csv, tsv e txt, verifica a codificação
     # do mesmo caso não tenha sido fornecido
     if ext in ["csv", "tsv", "txt"]:
         if "encoding" not in kwargs:
-            file_bytes = dados.read(10000)
-            det = Detector(min_confidence=0.5)
-            kwargs["encoding"] = det.detect(file_bytes)
-            if kwargs["encoding"] is None:
-                kwargs["encoding"] = "latin-1"
-            dados.seek(0)
+            kwargs["encoding"] = detecta_codificacao(dados)
+
+        # utiliza o leitor do pyarrow caso tenha sido selecionado
+        if motor_csv == "pyarrow":
+            return le_csv_arrow(dados, **obtem_argumentos_objeto(le_csv_arrow, kwargs))
 
     # para arquivos ods garante que a engine de leitura
     # esteja adequada
@@ -51,6 +164,391 @@ def le_como_df(dados: typing.BinaryIO, ext: str, **kwargs: typing.Any) -> pd.Dat
     )
 
 
+def le_como_df_em_blocos(
+    dados: typing.IO[bytes], ext: str, tamanho_bloco: int, **kwargs: typing.Any
+) -> typing.Iterator[pd.DataFrame]:
+    """
+    Le os dados de texto contidos num buffer como uma sequência de
+    data frames com no máximo tamanho_bloco linhas cada
+
+    :param dados: bytes IO com dados de entrada
+    :param ext: extenção / formato do arquivo
+    :param tamanho_bloco: número de linhas de cada bloco
+    :param kwargs: parâmetros de leitura
+    :return: gerador de data frames
+    """
+    if ext not in ["csv", "tsv", "txt"]:
+        raise NotImplementedError(f"Não implementamos leitura em blocos de {ext}")
+
+    # verifica a codificação do arquivo caso não tenha sido fornecida
+    if "encoding" not in kwargs:
+        kwargs["encoding"] = detecta_codificacao(dados)
+
+    # lê os dados bloco a bloco e fecha o buffer ao final
+    kwargs["chunksize"] = tamanho_bloco
+    with pd.read_csv(dados, **obtem_argumentos_objeto(pd.read_csv, kwargs)) as leitor:
+        for bloco in leitor:
+            yield bloco
+    dados.close()
+
+
+def itera_dados_comprimidos(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    tamanho_bloco: int,
+    **kwargs: typing.Any,
+) -> typing.Iterator[typing.Tuple[str, pd.DataFrame]]:
+    """
+    Lê os arquivos de texto contidos em um arquivo zip ou rar em blocos
+    de linhas, mantendo o arquivo comprimido aberto enquanto os blocos
+    são consumidos. Arquivos comprimidos dentro do arquivo são lidos
+    recursivamente
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param tamanho_bloco: número de linhas de cada bloco
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param kwargs: argumentos de leitura
+    :return: gerador de tuplas com nome do arquivo e bloco de dados
+    """
+    # obtém o padrão de nome de arquivo
+    padrao_comp = kwargs.pop("padrao_comp", "^")
+
+    # selecionamos o objeto de leitura adequado
+    obj_l = RarFile if ext == "rar" else ZipFile
+
+    # flag que indica se algum bloco já foi devolvido, uma vez que
+    # a partir deste ponto não podemos mais recorrer a leitura do disco
+    devolvido = False
+    try:
+        with obj_l(arquivo, **obtem_argumentos_objeto(obj_l, kwargs)) as z:
+            # obtém a lista de arquivos que deve ser lida
+            arqs = [
+                f
+                for f in z.namelist()
+                if re.search(padrao_comp, f) is not None and obtem_extencao(f) != ""
+            ]
+
+            # lê os arquivos bloco a bloco
+            for arq in arqs:
+                ext_arq = obtem_extencao(arq)
+                if ext_arq == "zip" or ext_arq == "rar":
+                    blocos = itera_dados_comprimidos(
+                        z.open(arq), ext_arq, tamanho_bloco, **kwargs
+                    )
+                else:
+                    blocos = (
+                        (arq, b)
+                        for b in le_como_df_em_blocos(
+                            z.open(arq), ext_arq, tamanho_bloco, **kwargs
+                        )
+                    )
+                for nome, bloco in blocos:
+                    devolvido = True
+                    yield nome, bloco
+
+    except (ValueError, NotImplementedError) as e:
+        if devolvido:
+            raise e
+        logging.debug(
+            f"Obtivemos um erro {e} ao carregar o zip, extraindo os arquivos "
+            f"através de um programa externo"
+        )
+        yield from itera_dados_comprimidos_externo(
+            arquivo, ext, tamanho_bloco, padrao_comp=padrao_comp, **kwargs
+        )
+
+
+def obtem_extrator_externo(ext: str) -> typing.Union[typing.List[str], None]:
+    """
+    Obtém o primeiro programa externo instalado capaz de extrair
+    arquivos de um arquivo comprimido para a saída padrão
+
+    :param ext: extensão do arquivo comprimido
+    :return: modelo do comando a ser executado ou None caso não haja
+    nenhum programa disponível
+    """
+    for comando in EXTRATORES_EXTERNOS.get(ext, []):
+        if shutil.which(comando[0]) is not None:
+            return comando
+    return None
+
+
+@contextmanager
+def abre_membro_externo(
+    caminho: typing.Union[str, Path], membro: str, ext: str
+) -> typing.Iterator[typing.BinaryIO]:
+    """
+    Abre um arquivo contido em um arquivo comprimido como um fluxo de
+    bytes vindo da saída padrão de um programa externo de extração, sem
+    escrever os conteúdos do arquivo em disco
+
+    :param caminho: caminho para o arquivo comprimido
+    :param membro: nome do arquivo a ser extraído
+    :param ext: extensão do arquivo comprimido
+    :return: fluxo de bytes com os conteúdos do arquivo
+    """
+    comando = obtem_extrator_externo(ext)
+    if comando is None:
+        raise FileNotFoundError(f"Nenhum programa de extração de {ext} foi encontrado")
+
+    processo = subprocess.Popen(
+        [c.format(arquivo=str(caminho), membro=membro) for c in comando],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    saida = typing.cast(typing.BinaryIO, processo.stdout)
+    try:
+        yield saida
+    finally:
+        saida.close()
+        codigo = processo.wait()
+
+    # o processo é interrompido caso o leitor não consuma toda a saída
+    if codigo not in [0, -signal.SIGPIPE]:
+        raise ValueError(
+            f"O programa {comando[0]} falhou ao extrair {membro} de {caminho}"
+        )
+
+
+@contextmanager
+def abre_membro_comprimido(
+    z: typing.Union[ZipFile, RarFile],
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    membro: str,
+    ext: str,
+) -> typing.Iterator[typing.IO[bytes]]:
+    """
+    Abre um arquivo contido em um arquivo comprimido pelo python ou, caso
+    o seu método de compressão não seja suportado (como o Deflate64),
+    através de um programa externo de extração. Arquivos comprimidos
+    internos extraídos por programas externos são escritos em disco para
+    que possam ser lidos recursivamente
+
+    :param z: objeto de leitura do arquivo comprimido
+    :param arquivo: caminho para, caminho aberto ou dados do arquivo comprimido
+    :param membro: nome do arquivo a ser aberto
+    :param ext: extensão do arquivo comprimido
+    :return: fluxo de bytes com os conteúdos do arquivo
+    """
+    try:
+        f: typing.Optional[typing.IO[bytes]] = z.open(membro)
+    except (ValueError, NotImplementedError) as e:
+        logging.debug(
+            f"Obtivemos um erro {e} ao abrir {membro}, extraindo o arquivo "
+            f"através de um programa externo"
+        )
+        f = None
+
+    if f is not None:
+        with f:
+            yield f
+        return
+
+    ext_membro = obtem_extencao(membro)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        temp = Path(tmpdirname)
+        caminho = obtem_caminho_em_disco(arquivo, ext, temp)
+        if ext_membro != "zip" and ext_membro != "rar":
+            with abre_membro_externo(caminho, membro, ext) as saida:
+                yield saida
+            return
+
+        interno = temp / f"interno.{ext_membro}"
+        with abre_membro_externo(caminho, membro, ext) as saida:
+            with open(interno, "wb") as g:
+                shutil.copyfileobj(saida, g)
+        with open(interno, "rb") as g:
+            yield g
+
+
+def obtem_caminho_em_disco(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    temp: Path,
+) -> str:
+    """
+    Obtém um caminho em disco para um arquivo, escrevendo os seus conteúdos
+    em uma pasta temporária caso ele tenha sido fornecido como um buffer
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param temp: pasta temporária
+    :return: caminho para o arquivo
+    """
+    if isinstance(arquivo, (str, Path)):
+        return str(arquivo)
+
+    chave = obtem_chave_arquivo(arquivo)
+    if chave is not None:
+        return chave[0]
+
+    arquivo.seek(0)
+    with open(temp / f"arq_temp.{ext}", "wb") as f:
+        shutil.copyfileobj(arquivo, f)
+    return str(temp / f"arq_temp.{ext}")
+
+
+def lista_membros(
+    caminho: str, ext: str, padrao_comp: str = "^"
+) -> typing.Union[typing.List[str], None]:
+    """
+    Lista os arquivos contidos em um arquivo comprimido que satisfazem
+    um padrão de nome, utilizando apenas o diretório do arquivo
+
+    :param caminho: caminho para o arquivo comprimido
+    :param ext: extensão do arquivo
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :return: lista de arquivos ou None caso não seja possível listá-los
+    """
+    obj_l = RarFile if ext == "rar" else ZipFile
+    try:
+        with obj_l(caminho) as z:
+            nomes = z.namelist()
+    except Exception as e:
+        logging.debug(f"Obtivemos um erro {e} ao listar os arquivos de {caminho}")
+        return None
+
+    return [
+        f
+        for f in nomes
+        if re.search(padrao_comp, f) is not None
+        and obtem_extencao(f) != ""
+        and not f.endswith("/")
+    ]
+
+
+def le_dados_comprimidos_externo(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    padrao_comp: str = "^",
+    **kwargs: typing.Any,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Lê os arquivos contidos em um arquivo comprimido que não pode ser
+    descomprimido pelo python, como zips com Deflate64, extraindo apenas
+    os arquivos que satisfazem o padrão através de um programa externo
+
+    Os arquivos de dados são lidos diretamente da saída do programa, e
+    apenas arquivos comprimidos internos são escritos em disco para que
+    possam ser lidos recursivamente. Caso não haja programa externo
+    disponível, todos os conteúdos são extraídos para uma pasta temporária
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param kwargs: argumentos de leitura
+    :return: dicionário de arquivos carregados
+    """
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        temp = Path(tmpdirname)
+        caminho = obtem_caminho_em_disco(arquivo, ext, temp)
+        arqs = lista_membros(caminho, ext, padrao_comp)
+
+        # caso não seja possível extrair arquivos individuais, extraí
+        # todos os conteúdos para a pasta temporária
+        if arqs is None or obtem_extrator_externo(ext) is None:
+            pasta = temp / "conteudo"
+            pasta.mkdir()
+            pyunpack.Archive(caminho).extractall(str(pasta))
+            return {
+                os.path.join(path, f): carrega_arquivo(
+                    os.path.join(path, f), obtem_extencao(f), **kwargs
+                )
+                for path, directories, files in os.walk(pasta)
+                for f in files
+                if re.search(padrao_comp, f) is not None and obtem_extencao(f) != ""
+            }
+
+        objs: typing.Dict[str, typing.Any] = dict()
+        for arq in arqs:
+            ext_arq = obtem_extencao(arq)
+
+            # arquivos comprimidos internos são escritos em disco
+            if ext_arq == "zip" or ext_arq == "rar":
+                interno = temp / f"interno.{ext_arq}"
+                with abre_membro_externo(caminho, arq, ext) as saida:
+                    with open(interno, "wb") as f:
+                        shutil.copyfileobj(saida, f)
+                objs[arq] = carrega_arquivo(interno, ext_arq, **kwargs)
+                interno.unlink()
+            else:
+                with abre_membro_externo(caminho, arq, ext) as saida:
+                    objs[arq] = converte_buffer_em_objeto(saida, ext_arq, **kwargs)
+
+    return objs
+
+
+def itera_dados_comprimidos_externo(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    tamanho_bloco: int,
+    padrao_comp: str = "^",
+    **kwargs: typing.Any,
+) -> typing.Iterator[typing.Tuple[str, pd.DataFrame]]:
+    """
+    Lê em blocos de linhas os arquivos de texto contidos em um arquivo
+    comprimido que não pode ser descomprimido pelo python, extraindo
+    apenas os arquivos que satisfazem o padrão através de um programa
+    externo. Caso não haja programa disponível, todos os conteúdos são
+    extraídos para uma pasta temporária
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param tamanho_bloco: número de linhas de cada bloco
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param kwargs: argumentos de leitura
+    :return: gerador de tuplas com nome do arquivo e bloco de dados
+    """
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        temp = Path(tmpdirname)
+        caminho = obtem_caminho_em_disco(arquivo, ext, temp)
+        arqs = lista_membros(caminho, ext, padrao_comp)
+
+        # caso não seja possível extrair arquivos individuais, extraí
+        # todos os conteúdos para a pasta temporária
+        if arqs is None or obtem_extrator_externo(ext) is None:
+            pasta = temp / "conteudo"
+            pasta.mkdir()
+            pyunpack.Archive(caminho).extractall(str(pasta))
+            for path, directories, files in os.walk(pasta):
+                for nome_arq in files:
+                    ext_arq = obtem_extencao(nome_arq)
+                    if re.search(padrao_comp, nome_arq) is None or ext_arq == "":
+                        continue
+                    arq = os.path.join(path, nome_arq)
+                    if ext_arq == "zip" or ext_arq == "rar":
+                        yield from itera_dados_comprimidos(
+                            arq, ext_arq, tamanho_bloco, **kwargs
+                        )
+                    else:
+                        for bloco in le_como_df_em_blocos(
+                            open(arq, "rb"), ext_arq, tamanho_bloco, **kwargs
+                        ):
+                            yield arq, bloco
+            return
+
+        for arq in arqs:
+            ext_arq = obtem_extencao(arq)
+
+            # arquivos comprimidos internos são escritos em disco
+            if ext_arq == "zip" or ext_arq == "rar":
+                interno = temp / f"interno.{ext_arq}"
+                with abre_membro_externo(caminho, arq, ext) as saida:
+                    with open(interno, "wb") as f:
+                        shutil.copyfileobj(saida, f)
+                yield from itera_dados_comprimidos(
+                    interno, ext_arq, tamanho_bloco, **kwargs
+                )
+                interno.unlink()
+            else:
+                with abre_membro_externo(caminho, arq, ext) as saida:
+                    for bloco in le_como_df_em_blocos(
+                        saida, ext_arq, tamanho_bloco, **kwargs
+                    ):
+                        yield arq, bloco
+
+
 def load_json(buffer: typing.BinaryIO) -> typing.Dict:
     """
     Lê os dados de um buffer como um objeto json
@@ -129,6 +627,26 @@ def converte_buffer_em_objeto(
             raise NotImplementedError(f"Não implementamos leitura de arquivos {ext}")
 
 
+def _carrega_membro(
+    origem: typing.Union[str, bytes], ext: str, arq: str, kwargs: typing.Dict
+) -> typing.Any:
+    """
+    Carrega um único arquivo contido em um arquivo comprimido abrindo
+    um objeto de leitura próprio, de forma a poder ser executado
+    em paralelo com a leitura de outros arquivos
+
+    :param origem: caminho ou conteúdo do arquivo comprimido
+    :param ext: extensão do arquivo comprimido
+    :param arq: nome do arquivo a ser carregado
+    :param kwargs: argumentos de leitura
+    :return: dados carregados
+    """
+    obj_l = RarFile if ext == "rar" else ZipFile
+    with obj_l(BytesIO(origem) if isinstance(origem, bytes) else origem) as z:
+        membro = typing.cast(typing.BinaryIO, z.open(arq))
+        return carrega_arquivo(membro, obtem_extencao(arq), **kwargs)
+
+
 def le_dados_comprimidos(
     arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO], ext: str, **kwargs
 ) -> typing.Union[typing.Dict[str, typing.Any], None]:
@@ -137,9 +655,16 @@ def le_dados_comprimidos(
     dicionário de arquivos com os conteúdos carregados de acordo
     com o padrão de leitura selecionado
 
+    Caso max_trabalhadores seja maior que 1, os arquivos são carregados
+    em paralelo, cada um com o seu próprio objeto de leitura
+
     :param arquivo: caminho para, caminho aberto ou dados a serem processados
     :param ext: extensão do arquivo
     :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param max_trabalhadores: número máximo de arquivos lidos simultaneamente
+    :param tipo_pool: tipo de pool utilizado na leitura paralela (thread ou processo)
+    :param limite_memoria: memória máxima, em bytes, dos arquivos em leitura
+    simultânea, sendo por padrão uma fração da memória disponível
     :param kwargs: argumentos de leitura
     :return: dicionário de arquivos carregados
     """
@@ -150,6 +675,12 @@ def le_dados_comprimidos(
     else:
         padrao_comp = "^"
 
+    # obtém as configurações de leitura paralela
+    max_trabalhadores = kwargs.pop("max_trabalhadores", None)
+    tipo_pool = kwargs.pop("tipo_pool", "thread")
+    limite_memoria = kwargs.pop("limite_memoria", None)
+    paralelo = max_trabalhadores is not None and max_trabalhadores > 1
+
     # selecionamos o objeto de leitura adequado
     obj_l = RarFile if ext == "rar" else ZipFile
 
@@ -164,46 +695,48 @@ def le_dados_comprimidos(
             ]
 
             # lê os arquivos para o dicionários
-            objs = {
-                arq: carrega_arquivo(z.open(arq), obtem_extencao(arq), **kwargs)
-                for arq in arqs
-            }
-
-    except ValueError as e:
+            paralelo = paralelo and len(arqs) > 1
+            if paralelo:
+                membros = {
+                    arq: z.getinfo(arq).file_size * FATOR_MEMORIA_LEITURA
+                    for arq in arqs
+                }
+            else:
+                objs = {
+                    arq: carrega_arquivo(
+                        typing.cast(typing.BinaryIO, z.open(arq)),
+                        obtem_extencao(arq),
+                        **kwargs,
+                    )
+                    for arq in arqs
+                }
+
+        # cada trabalhador abre o arquivo por conta própria a partir do
+        # seu caminho ou, caso não esteja no disco, do seu conteúdo
+        if paralelo:
+            chave = obtem_chave_arquivo(arquivo)
+            if chave is not None:
+                origem: typing.Union[str, bytes] = chave[0]
+            else:
+                arquivo.seek(0)  # type: ignore
+                origem = arquivo.read()  # type: ignore
+            objs = executa_com_limite_memoria(
+                _carrega_membro,
+                {arq: (origem, ext, arq, kwargs) for arq in membros},
+                membros,
+                max_trabalhadores,
+                tipo_pool=tipo_pool,
+                limite_memoria=limite_memoria,
+            )
+
+    except (ValueError, NotImplementedError) as e:
         logging.debug(
-            f"Obtivemos um erro {e} ao carregar o zip, fazendo leitura do disco"
+            f"Obtivemos um erro {e} ao carregar o zip, extraindo os arquivos "
+            f"através de um programa externo"
+        )
+        objs = le_dados_comprimidos_externo(
+            arquivo, ext, padrao_comp=padrao_comp, **kwargs
         )
-
-        # cria um diretório temporário
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            temp = Path(tmpdirname)
-
-            # cria um arquivo, caso tenha sido fornecido um bytes IO
-            if not isinstance(arquivo, str) and not isinstance(arquivo, Path):
-                arquivo.seek(0)
-                with open(temp / f"arq_temp.{ext}", "wb") as f:
-                    f.write(arquivo.read())
-                arquivo = temp / f"arq_temp.{ext}"
-
-            # realiza o unpack dos conteúdos do zip
-            azip = pyunpack.Archive(arquivo)
-            azip.extractall(temp)
-
-            # lista os arquivos a serem carregados
-            arqs = [
-                os.path.join(path, f)
-                for path, directories, files in os.walk(temp)
-                for f in files
-                if re.search(padrao_comp, f) is not None
-                and obtem_extencao(f) != ""
-                and f != f"arq_temp.{ext}"
-            ]
-
-            # lê os arquivos para o dicionários
-            objs = {
-                arq: converte_buffer_em_objeto(open(arq, "rb"), ext, **kwargs)
-                for arq in arqs
-            }
 
     # retorna o objeto adequado de acordo com a quantidade de arquivos
     if len(objs) > 1:
@@ -214,6 +747,155 @@ def le_dados_comprimidos(
     return None
 
 
+def obtem_tamanhos_comprimidos(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO], ext: str
+) -> typing.Dict[str, int]:
+    """
+    Obtém o tamanho descomprimido de cada arquivo contido num arquivo
+    zip ou rar lendo apenas o diretório do arquivo
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :return: dicionário com nome do arquivo e tamanho em bytes
+    """
+    obj_l = RarFile if ext == "rar" else ZipFile
+    with obj_l(arquivo) as z:
+        return {
+            info.filename: info.file_size
+            for info in z.infolist()
+            if obtem_extencao(info.filename) != ""
+        }
+
+
+def estima_linhas_comprimidos(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    padrao_comp: str = "^",
+    n_linhas: int = 1000,
+) -> typing.Dict[str, typing.Tuple[int, float]]:
+    """
+    Estima o tamanho de cada arquivo de texto contido num arquivo zip ou
+    rar a partir do seu tamanho descomprimido e do tamanho médio das suas
+    primeiras linhas, sem descomprimir o restante dos arquivos. Arquivos
+    comprimidos dentro do arquivo são inspecionados recursivamente
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param n_linhas: número de linhas lidas para estimar o tamanho médio
+    :return: dicionário com nome do arquivo e tupla com o tamanho
+    descomprimido em bytes e o tamanho médio de uma linha em bytes
+    """
+    obj_l = RarFile if ext == "rar" else ZipFile
+    estimativas: typing.Dict[str, typing.Tuple[int, float]] = dict()
+    with obj_l(arquivo) as z:
+        for info in z.infolist():
+            arq = info.filename
+            ext_arq = obtem_extencao(arq)
+            if ext_arq == "" or re.search(padrao_comp, arq) is None:
+                continue
+
+            with abre_membro_comprimido(z, arquivo, arq, ext) as f:
+                if ext_arq == "zip" or ext_arq == "rar":
+                    for nome, est in estima_linhas_comprimidos(
+                        f, ext_arq, n_linhas=n_linhas
+                    ).items():
+                        estimativas[f"{arq}/{nome}"] = est
+                else:
+                    linhas = [len(f.readline()) for _ in range(n_linhas + 1)][1:]
+                    linhas = [n for n in linhas if n > 0]
+                    media = sum(linhas) / len(linhas) if len(linhas) > 0 else 1.0
+                    estimativas[arq] = (info.file_size, media)
+
+    return estimativas
+
+
+def le_cabecalho(
+    dados: typing.IO[bytes], sep: str = ",", encoding: str = "latin-1"
+) -> typing.List[str]:
+    """
+    Lê apenas a primeira linha de um arquivo de texto e devolve
+    a lista de colunas contidas nela
+
+    :param dados: bytes IO com dados de entrada
+    :param sep: separador de colunas
+    :param encoding: codificação do arquivo
+    :return: lista de colunas
+    """
+    linha = dados.readline().decode(encoding).strip("\r\n")
+    dados.close()
+    return [c.strip('"') for c in linha.split(sep)]
+
+
+def obtem_cabecalhos_comprimidos(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    ext: str,
+    padrao_comp: str = "^",
+    sep: str = ",",
+    encoding: str = "latin-1",
+) -> typing.Dict[str, typing.List[str]]:
+    """
+    Obtém a lista de colunas de cada arquivo de texto contido num
+    arquivo zip ou rar lendo apenas a linha de cabeçalho de cada um
+
+    O resultado é guardado em cache por caminho do arquivo, data de
+    modificação, nome do arquivo interno, separador e codificação, de
+    forma que leituras subsequentes de um mesmo arquivo não precisam
+    abri-lo novamente
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param ext: extensão do arquivo
+    :param padrao_comp: expressão regular para filtrar arquivos em comprimidos
+    :param sep: separador de colunas
+    :param encoding: codificação do arquivo
+    :return: dicionário com nome do arquivo e lista de colunas
+    """
+    global _CACHE_ARQUIVOS, _CACHE_CABECALHOS
+    chave = obtem_chave_arquivo(arquivo)
+
+    # se todos os arquivos já estiverem no cache não abrimos o comprimido
+    if chave is not None and chave in _CACHE_ARQUIVOS:
+        arqs = [f for f in _CACHE_ARQUIVOS[chave] if re.search(padrao_comp, f)]
+        if all([(*chave, f, sep, encoding) in _CACHE_CABECALHOS for f in arqs]):
+            return {
+                nome: cols
+                for f in arqs
+                for nome, cols in _CACHE_CABECALHOS[(*chave, f, sep, encoding)].items()
+            }
+
+    obj_l = RarFile if ext == "rar" else ZipFile
+    cabecalhos: typing.Dict[str, typing.List[str]] = dict()
+    with obj_l(arquivo) as z:
+        # obtém a lista de arquivos que deve ser lida
+        todos = [f for f in z.namelist() if obtem_extencao(f) != ""]
+        arqs = [f for f in todos if re.search(padrao_comp, f) is not None]
+
+        for arq in arqs:
+            ext_arq = obtem_extencao(arq)
+            if chave is not None and (*chave, arq, sep, encoding) in _CACHE_CABECALHOS:
+                cab = _CACHE_CABECALHOS[(*chave, arq, sep, encoding)]
+            elif ext_arq == "zip" or ext_arq == "rar":
+                with abre_membro_comprimido(z, arquivo, arq, ext) as f:
+                    cab = {
+                        f"{arq}/{nome}": cols
+                        for nome, cols in obtem_cabecalhos_comprimidos(
+                            f, ext_arq, sep=sep, encoding=encoding
+                        ).items()
+                    }
+            else:
+                with abre_membro_comprimido(z, arquivo, arq, ext) as f:
+                    cab = {arq: le_cabecalho(f, sep=sep, encoding=encoding)}
+
+            if chave is not None:
+                _CACHE_CABECALHOS[(*chave, arq, sep, encoding)] = cab
+            cabecalhos.update(cab)
+
+    if chave is not None:
+        _CACHE_ARQUIVOS[chave] = todos
+
+    return cabecalhos
+
+
 def carrega_arquivo(
     arquivo: typing.Union[str, Path, typing.BinaryIO],
     ext: str,
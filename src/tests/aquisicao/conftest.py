@@ -0,0 +1,48 @@
+import shutil
+import typing
+
+import pytest
+
+from src.aquisicao.inep._micro_inep import BaseINEPETL
+from src.configs import COLECAO_DADOS_WEB
+from src.io.configs import DS_ENVS
+from src.io.data_store import DataStore
+from src.io.data_store import Documento
+
+
+@pytest.fixture
+def gera_ds_censo(dados_path, tmp_path, monkeypatch):
+    """
+    Gera data stores temporários com uma cópia do arquivo do censo de 2020,
+    cada um em uma pasta própria identificada pelo nome do ambiente
+    """
+
+    def _gera(env: str = "censo") -> DataStore:
+        caminho = tmp_path / env
+        monkeypatch.setitem(DS_ENVS, env, str(caminho))
+        pasta = caminho / COLECAO_DADOS_WEB / "censo_escolar"
+        pasta.mkdir(parents=True)
+        shutil.copy(dados_path / f"{COLECAO_DADOS_WEB}/censo_escolar/2020.zip", pasta)
+        return DataStore(env)
+
+    return _gera
+
+
+@pytest.fixture
+def compartilha_censo() -> typing.Callable:
+    """
+    Define o arquivo do censo de 2020 como único resultado do web-scraping
+    de um ETL, evitando o acesso à página do INEP
+    """
+
+    def _compartilha(etl: BaseINEPETL) -> None:
+        etl._inep = {
+            Documento(
+                etl._ds,
+                referencia=dict(
+                    nome="2020.zip", colecao=COLECAO_DADOS_WEB, pasta=etl._base
+                ),
+            ): ""
+        }
+
+    return _compartilha
@@ -0,0 +1,57 @@
+import unittest
+
+import pandas as pd
+
+import src.aquisicao.inep._micro_inep as micro_inep
+from src.aquisicao import CensoEscolarETL
+from src.configs import COLECAO_AQUISICAO
+from src.io.data_store import _api as data_store_api
+
+
+def test_pipeline(gera_ds_censo, compartilha_censo, tmp_path, monkeypatch) -> None:
+    ds = gera_ds_censo("censo_ano")
+    etl = CensoEscolarETL(ds=ds, ano=2020, max_trabalhadores=3)
+    compartilha_censo(etl)
+
+    # o web-scraping deve ser feito uma única vez pelo orquestrador
+    def _erro(*args, **kwargs):
+        raise AssertionError("Os ETLs das tabelas não deveriam acessar o INEP")
+
+    monkeypatch.setattr(micro_inep, "obtem_links", _erro)
+    etl.pipeline()
+
+    # as tabelas são exportadas pelos processos, junto aos seus manifestos
+    assert len(etl.etls) == 9
+    saida = tmp_path / "censo_ano" / COLECAO_AQUISICAO
+    for tabela in etl.etls:
+        for doc in tabela.documentos_manifesto:
+            assert doc.colecao.nome == COLECAO_AQUISICAO
+            arqs = list((saida / doc.pasta).glob("*.parquet"))
+            assert len(arqs) == 1
+            assert pd.read_parquet(arqs[0]).shape[0] > 0
+    assert etl.atualizado()
+
+
+def test_extract_prepara_estagios(
+    gera_ds_censo, compartilha_censo, tmp_path, monkeypatch
+) -> None:
+    ds = gera_ds_censo("censo_ano")
+    etl = CensoEscolarETL(ds=ds, ano=2020, usar_estagio=True)
+    compartilha_censo(etl)
+    etl.extract()
+
+    # o arquivo do censo é descomprimido apenas pelo orquestrador
+    censo = etl.documentos_entrada[0]
+    for tabela in etl.etls:
+        assert tabela.manifesto_estagio(censo, tabela.conf_leitura).exists()
+
+    def _erro(*args, **kwargs):
+        raise AssertionError("Os ETLs das tabelas não deveriam ler o arquivo do censo")
+
+    monkeypatch.setattr(data_store_api, "le_dados_comprimidos", _erro)
+    etl.etls[0].extract()
+    assert etl.etls[0].dados_entrada[0].data.shape[0] > 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,9 @@ import pytest
 
 from src.aquisicao import DocenteETL
 from src.configs import COLECAO_DADOS_WEB
+from src.io.data_store import DataStore
 from src.io.data_store import Documento
+from src.io.data_store import _api as data_store_api
 
 
 @pytest.fixture(scope="module")
@@ -129,5 +131,65 @@ def test_ajusta_schema(docente_etl) -> None:
             assert docente_etl.dados_saida[1].data[col].dtype == dtype
 
 
+def test_extract_leitura_paralela(compartilha_censo, monkeypatch) -> None:
+    chamadas = list()
+    original = data_store_api.le_dados_comprimidos
+
+    def registra(*args, **kwargs):
+        chaves = ["max_trabalhadores", "tipo_pool", "limite_memoria"]
+        chamadas.append({c: kwargs.get(c) for c in chaves})
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(data_store_api, "le_dados_comprimidos", registra)
+    ds = DataStore("teste", max_leitores=2, limite_memoria_leitura=2**30)
+    etl = DocenteETL(ds=ds, ano=2020)
+    compartilha_censo(etl)
+    etl.extract()
+
+    assert chamadas == [
+        dict(max_trabalhadores=2, tipo_pool="thread", limite_memoria=2**30)
+    ]
+    assert isinstance(etl.dados_entrada[0].data, pd.DataFrame)
+
+
+def test_reduz_tipos_sem_aumentar_colunas(compartilha_censo) -> None:
+    ds = DataStore("teste")
+    etl = DocenteETL(ds=ds, ano=2020)
+    compartilha_censo(etl)
+    etl.extract()
+    etl.transform()
+
+    # nenhuma coluna de saída deve ocupar mais memória depois da redução
+    for doc in etl.documentos_saida:
+        original = doc.data.copy()
+        etl.reduz_tipos(doc)
+        for col in original:
+            assert doc.data[col].memory_usage(deep=True) <= (
+                original[col].memory_usage(deep=True)
+            ), col
+            if pd.api.types.is_integer_dtype(original[col]):
+                assert doc.data[col].dtype.kind in "iu"
+        assert doc.data.memory_usage(deep=True).sum() <= (
+            original.memory_usage(deep=True).sum()
+        )
+
+
+def test_verifica_consistencia_chave() -> None:
+    dados = pd.DataFrame(
+        {
+            "ID_DOCENTE": ["A", "A", "B", "B", "C"],
+            "ANO": 2020,
+            "NU_IDADE": [30, 30, 40, 40, 50],
+        }
+    )
+    chave = ["ID_DOCENTE", "ANO"]
+
+    duplicadas = dados.duplicated(subset=chave)
+    assert DocenteETL.verifica_consistencia_chave(dados, chave, duplicadas)
+
+    dados.loc[3, "NU_IDADE"] = 41
+    assert not DocenteETL.verifica_consistencia_chave(dados, chave, duplicadas)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import os
 import re
+import typing
 import unittest
 
 import numpy as np
@@ -171,5 +172,63 @@ def test_ajusta_schema(escola_etl) -> None:
             assert escola_etl.dados_saida[0].data[col].dtype == dtype
 
 
+def test_gera_coluna_por_comparacao() -> None:
+    base = pd.DataFrame(
+        {
+            "IN_A_1": [0, 1, np.nan, 9],
+            "IN_A_2": [0, 0, 1, np.nan],
+            "QT_B": [0, 300, 0, 2.5],
+        },
+        index=[0, 1, 0, 1],
+    )
+    tratamento = {
+        "IN_A": ["^IN_A_", ">"],
+        "IN_NENHUM": ["^IN_A$", "="],
+        "IN_B": ["^QT_B", ">"],
+        "IN_A_1": ["^IN_A_2", "="],
+    }
+
+    novas: typing.Dict[str, pd.Series] = dict()
+    EscolaETL.gera_coluna_por_comparacao(base, tratamento, novas)
+
+    assert list(novas) == ["IN_A", "IN_NENHUM", "IN_B"]
+    assert novas["IN_A"].to_list() == [0, 1, 1, 1]
+    assert novas["IN_NENHUM"].to_list() == [1, 0, 0, 0]
+    assert novas["IN_B"].to_list() == [0, 1, 0, 1]
+    assert novas["IN_A"].index.equals(base.index)
+
+
+def test_converte_texto() -> None:
+    serie = EscolaETL.converte_texto(pd.Series(["a", np.nan, 1.5], index=[2, 0, 1]))
+    assert serie.dtype == "object"
+    assert serie.to_list() == ["a", None, "1.5"]
+    assert serie.index.to_list() == [2, 0, 1]
+
+
+def test_converte_coluna_origem() -> None:
+    colunas = {
+        "int8": pd.Series([0, 1], dtype="int8"),
+        "anulavel": pd.Series([1, None], dtype="Int8"),
+        "booleana": pd.Series([True, False]),
+        "int64": pd.Series([0, 100], dtype="int64"),
+        "real": pd.Series([1.0, np.nan]),
+        "quantidade": pd.Series([0, 300], dtype="int64"),
+        "fracao": pd.Series([0, 2.5]),
+    }
+    vetores = {c: EscolaETL.converte_coluna_origem(v) for c, v in colunas.items()}
+
+    assert {c: str(v.dtype) for c, v in vetores.items()} == {
+        "int8": "int8",
+        "anulavel": "int8",
+        "booleana": "int8",
+        "int64": "int8",
+        "real": "int8",
+        "quantidade": "float64",
+        "fracao": "float64",
+    }
+    assert vetores["anulavel"].tolist() == [1, 0]
+    assert vetores["quantidade"].tolist() == [0, 300]
+
+
 if __name__ == "__main__":
     unittest.main()
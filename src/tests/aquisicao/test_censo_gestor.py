@@ -2,11 +2,14 @@ import os
 import unittest
 
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 
 from src.aquisicao import GestorETL
+from src.configs import COLECAO_AQUISICAO
 from src.configs import COLECAO_DADOS_WEB
 from src.io.data_store import Documento
+from src.io.data_store import _api as data_store_api
 
 
 @pytest.fixture(scope="module")
@@ -108,5 +111,84 @@ def test_ajusta_schema(gestor_etl) -> None:
             assert gestor_etl.dados_saida[1].data[col].dtype == dtype
 
 
+def test_processa_em_blocos(gera_ds_censo, compartilha_censo, tmp_path) -> None:
+    ds = gera_ds_censo("blocos")
+    etls = [GestorETL(ds=ds, ano=2020), GestorETL(ds=ds, ano=2020, tamanho_bloco=500)]
+    for etl in etls:
+        compartilha_censo(etl)
+
+    etls[0].extract()
+    etls[0].transform()
+    etls[1].pipeline()
+
+    saida = tmp_path / "blocos" / COLECAO_AQUISICAO
+    for doc in etls[0].dados_saida:
+        arq = pq.ParquetFile(saida / doc.nome / "ANO=2020" / "2020.parquet")
+        df = arq.read().to_pandas()
+        assert arq.num_row_groups > 1
+        assert df.shape[0] == doc.data.shape[0]
+        assert set(df.columns) == set(doc.data.columns) - {"ANO"}
+
+
+def test_remove_exportados(monkeypatch) -> None:
+    blocos = [
+        pd.DataFrame({"ID_GESTOR": [3, 1], "TP": ["a", "b"]}),
+        pd.DataFrame({"ID_GESTOR": [2, 3, 5], "TP": ["c", "a", "d"]}),
+    ]
+
+    _, exportados = GestorETL.remove_exportados(blocos[0], ["ID_GESTOR"])
+    saida, exportados = GestorETL.remove_exportados(
+        blocos[1], ["ID_GESTOR"], exportados
+    )
+    assert saida["ID_GESTOR"].to_list() == [2, 5]
+    assert exportados.dtype == "uint64" and len(exportados) == 4
+    assert (exportados[:-1] < exportados[1:]).all()
+
+    # sem chave de entidade as linhas são comparadas por completo
+    bloco, _ = GestorETL.remove_exportados(
+        blocos[1],
+        ["ID_GESTOR", "TP"],
+        GestorETL.remove_exportados(blocos[0], ["ID_GESTOR", "TP"])[1],
+    )
+    assert bloco["ID_GESTOR"].to_list() == [2, 5]
+
+    # linhas distintas com o mesmo hash de 64 bits não são removidas
+    original = pd.util.hash_pandas_object
+
+    def colide(objeto, **kwargs):
+        hashes = original(objeto, **kwargs)
+        return hashes if "hash_key" in kwargs else hashes * 0
+
+    monkeypatch.setattr(pd.util, "hash_pandas_object", colide)
+    _, exportados = GestorETL.remove_exportados(blocos[0], ["ID_GESTOR", "TP"])
+    bloco, _ = GestorETL.remove_exportados(blocos[1], ["ID_GESTOR", "TP"], exportados)
+    assert bloco["ID_GESTOR"].to_list() == [2, 5]
+
+
+def test_extract_com_estagio(
+    gera_ds_censo, compartilha_censo, tmp_path, monkeypatch
+) -> None:
+    ds = gera_ds_censo("estagio")
+    etls = [GestorETL(ds=ds, ano=2020, usar_estagio=True) for _ in range(2)]
+    for etl in etls:
+        compartilha_censo(etl)
+
+    etls[0].extract()
+    pasta = tmp_path / "estagio" / COLECAO_DADOS_WEB / "censo_escolar"
+    assert len(os.listdir(pasta / "estagio")) == 1
+
+    # a segunda leitura não deve descomprimir o arquivo do censo
+    def _erro(*args, **kwargs):
+        raise AssertionError("O arquivo do censo não deveria ser lido")
+
+    monkeypatch.setattr(data_store_api, "le_dados_comprimidos", _erro)
+    etls[1].extract()
+
+    esperado = etls[0].dados_entrada[0].data
+    obtido = etls[1].dados_entrada[0].data
+    assert esperado.dtypes.equals(obtido.dtypes)
+    assert esperado.equals(obtido)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,7 @@ import pytest
 
 from src.aquisicao import MatriculaETL
 from src.aquisicao.inep.censo_matricula import _MatriculaRegiaoETL
+from src.configs import COLECAO_AQUISICAO
 from src.configs import COLECAO_DADOS_WEB
 from src.io.data_store import Documento
 
@@ -149,5 +150,59 @@ def test_transform(matricula_etl) -> None:
         assert isinstance(etl.dados_saida[0].data, pd.DataFrame)
 
 
+def test_pipeline_paralelo(gera_ds_censo, compartilha_censo, tmp_path) -> None:
+    saidas = dict()
+    for max_trabalhadores in [1, 3]:
+        env = f"matricula_{max_trabalhadores}"
+        caminho = tmp_path / env
+        ds = gera_ds_censo(env)
+        etl = MatriculaETL(ds=ds, ano=2020, max_trabalhadores=max_trabalhadores)
+        compartilha_censo(etl)
+        etl.pipeline()
+
+        saidas[max_trabalhadores] = {
+            str(arq.relative_to(caminho)): pd.read_parquet(arq)
+            for arq in (caminho / COLECAO_AQUISICAO).glob("**/*.parquet")
+            if arq.is_file()
+        }
+
+    assert len(saidas[3]) == 10
+    assert set(saidas[1]) == set(saidas[3])
+    for arq, df in saidas[1].items():
+        pd.testing.assert_frame_equal(df, saidas[3][arq])
+
+
+def test_pipeline_limite_memoria_regiao(
+    gera_ds_censo, compartilha_censo, tmp_path
+) -> None:
+    saidas = dict()
+    etls = dict()
+    for limite in [None, 200_000]:
+        env = f"matricula_{limite}"
+        caminho = tmp_path / env
+        ds = gera_ds_censo(env)
+        etl = MatriculaETL(ds=ds, ano=2020, limite_memoria_regiao=limite)
+        compartilha_censo(etl)
+        etl.pipeline()
+        etls[limite] = etl
+
+        saidas[limite] = {
+            str(arq.relative_to(caminho)): pd.read_parquet(arq)
+            for arq in (caminho / COLECAO_AQUISICAO).glob("**/*.parquet")
+            if arq.is_file()
+        }
+
+    blocos = {etl.reg: etl._tamanho_bloco for etl in etls[200_000]._etls}
+    assert all([etl._tamanho_bloco is None for etl in etls[None]._etls])
+    assert blocos["CO"] is None
+    assert blocos["NORDESTE"] is not None and blocos["NORDESTE"] > 0
+
+    assert set(saidas[None]) == set(saidas[200_000])
+    assert all(["ANO=2020/REGIAO=" in arq for arq in saidas[None]])
+    for arq, df in saidas[None].items():
+        assert df.shape == saidas[200_000][arq].shape
+        assert set(df.columns) == set(saidas[200_000][arq].columns)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import os
 import unittest
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -100,5 +101,65 @@ def test_ajusta_schema(turma_etl) -> None:
             assert turma_etl.dados_saida[0].data[col].dtype == dtype
 
 
+@pytest.mark.run(order=7)
+def test_reduz_tipos(turma_etl) -> None:
+    base = turma_etl.documentos_saida[0]
+    original = base.data.copy()
+    turma_etl.reduz_tipos(base)
+
+    # o ID já está no menor tipo do schema e não é convertido em anulável
+    assert base.data["ID_TURMA"].dtype == "uint32"
+    for col in original:
+        if col.startswith("IN_"):
+            assert base.data[col].dtype in ["int8", "Int8"]
+        assert base.data[col].memory_usage(deep=True) <= (
+            original[col].memory_usage(deep=True)
+        )
+        pd.testing.assert_series_equal(
+            base.data[col].astype(original[col].dtype),
+            original[col],
+            check_categorical=False,
+        )
+    assert (
+        base.data.memory_usage(deep=True).sum() < original.memory_usage(deep=True).sum()
+    )
+
+
+def test_reduz_tipos_em_blocos(ds) -> None:
+    etl = TurmaETL(ds=ds, ano=2020, tamanho_bloco=4)
+
+    def bloco(qt: float) -> Documento:
+        return Documento(
+            ds,
+            referencia=dict(nome="turma.parquet", colecao="teste"),
+            data=pd.DataFrame(
+                dict(
+                    CO_ENTIDADE=[1.0, 2.0, 3.0, 4.0],
+                    CO_UF=[11.0, 11.0, 11.0, 12.0],
+                    QT_MATRICULAS=[1.0, 2.0, qt, np.nan],
+                )
+            ),
+        )
+
+    # o plano do primeiro bloco é mantido, mesmo que a cardinalidade mude
+    primeiro = bloco(3.0)
+    etl.reduz_tipos(primeiro)
+    segundo = bloco(4.0).data.assign(CO_UF=[11.0, 12.0, 13.0, 14.0])
+    segundo = Documento(
+        ds, referencia=dict(nome="turma.parquet", colecao="teste"), data=segundo
+    )
+    etl.reduz_tipos(segundo)
+    assert primeiro.data.dtypes.astype(str).to_dict() == dict(
+        CO_ENTIDADE="float64", CO_UF="category", QT_MATRICULAS="UInt32"
+    )
+    assert segundo.data.dtypes.astype(str).to_dict() == (
+        primeiro.data.dtypes.astype(str).to_dict()
+    )
+
+    # um bloco que não cabe no tipo fixado interrompe o processamento
+    with pytest.raises(ValueError):
+        etl.reduz_tipos(bloco(-1.0))
+
+
 if __name__ == "__main__":
     unittest.main()
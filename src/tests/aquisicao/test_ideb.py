@@ -1,4 +1,5 @@
 import os
+import shutil
 import unittest
 
 import pandas as pd
@@ -6,7 +7,10 @@ import pytest
 
 from src.aquisicao import IDEBETL
 from src.configs import COLECAO_DADOS_WEB
+from src.io.configs import DS_ENVS
+from src.io.data_store import DataStore
 from src.io.data_store import Documento
+from src.io.data_store import _api as data_store_api
 
 
 @pytest.fixture(scope="module")
@@ -29,9 +33,11 @@ def data() -> dict:
 
 
 @pytest.mark.run(order=1)
-def test_extract(ideb_etl) -> None:
+def test_extract(ideb_etl, dados_path) -> None:
     ideb_etl.extract()
 
+    assert not (dados_path / f"{COLECAO_DADOS_WEB}/ideb/estagio").exists()
+
     assert ideb_etl.dados_entrada is not None
     assert len(ideb_etl.dados_entrada) == 3
     assert ideb_etl.dados_entrada[0].nome == "divulgacao_anos_finais_escolas_2019.zip"
@@ -100,6 +106,29 @@ def test_formata_resultados(ideb_etl, data) -> None:
     )
 
 
+def test_formata_resultados_valores(ideb_etl) -> None:
+    df = pd.DataFrame(
+        dict(
+            ID_ESCOLA=pd.Series([2, 1, 3], dtype="uint32"),
+            VL_OBSERVADO_2017=["4,5*", "-", "ND"],
+            VL_OBSERVADO_2019=[5.1, None, "ND"],
+            VL_PROJECAO_2019=["ND", "3,2", "-"],
+        )
+    )
+    dados = ideb_etl.obtem_metricas(df, "AF")
+    obtido = ideb_etl.formata_resultados(df, dados)
+
+    # a escola sem nenhum valor divulgado não é mantida
+    assert obtido[["ID_ESCOLA", "ANO"]].values.tolist() == [
+        [1, 2019],
+        [2, 2017],
+        [2, 2019],
+    ]
+    assert obtido["IDEB_AF"].tolist()[1:] == [4.5, pytest.approx(5.1)]
+    assert obtido["IDEB_META_AF"].tolist()[0] == pytest.approx(3.2)
+    assert obtido["IDEB_AF"].dtype == "float32"
+
+
 @pytest.mark.run(order=6)
 def test_concatena_saidas(ideb_etl, data) -> None:
     df2 = ideb_etl.seleciona_dados(ideb_etl.dados_entrada[1])
@@ -150,6 +179,45 @@ def test_concatena_saidas(ideb_etl, data) -> None:
         "REND_EM",
     } == set(res.columns)
 
+    # cada escola e ano aparece uma única vez, em ordem
+    chaves = pd.concat([d[["ID_ESCOLA", "ANO"]] for d in [data["df"], df2, df3]])
+    assert res.shape[0] == chaves.drop_duplicates().shape[0]
+    assert res.set_index(["ID_ESCOLA", "ANO"]).index.is_monotonic_increasing
+    assert res["ID_ESCOLA"].dtype == data["df"]["ID_ESCOLA"].dtype
+
+
+def test_extract_com_estagio(dados_path, tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(DS_ENVS, "estagio_ideb", str(tmp_path))
+    pasta = tmp_path / COLECAO_DADOS_WEB / "ideb"
+    shutil.copytree(dados_path / f"{COLECAO_DADOS_WEB}/ideb", pasta)
+
+    ds = DataStore("estagio_ideb")
+    etls = [IDEBETL(ds=ds, usar_estagio=True) for _ in range(2)]
+    for etl in etls:
+        etl._links = {
+            Documento(
+                ds,
+                referencia=dict(nome=k, colecao=COLECAO_DADOS_WEB, pasta="ideb"),
+            ): ""
+            for k in sorted(os.listdir(dados_path / f"{COLECAO_DADOS_WEB}/ideb"))
+        }
+
+    etls[0].extract()
+    assert len(os.listdir(pasta / "estagio")) == 3
+
+    # a segunda leitura não deve abrir as planilhas
+    def _erro(*args, **kwargs):
+        raise AssertionError("As planilhas do IDEB não deveriam ser lidas")
+
+    monkeypatch.setattr(data_store_api, "le_dados_comprimidos", _erro)
+    etls[1].extract()
+
+    for etl in etls:
+        etl.transform()
+    pd.testing.assert_frame_equal(
+        etls[0].dados_saida[0].data, etls[1].dados_saida[0].data
+    )
+
 
 if __name__ == "__main__":
     unittest.main()
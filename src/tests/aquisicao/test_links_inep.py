@@ -0,0 +1,47 @@
+import unittest
+
+import bs4
+
+from src.aquisicao import GestorETL
+from src.configs import COLECAO_DADOS_WEB
+from src.utils import web
+
+
+def test_links_inep(gera_ds_censo, tmp_path, monkeypatch) -> None:
+    ds = gera_ds_censo("links")
+    pasta = tmp_path / "links" / COLECAO_DADOS_WEB / "censo_escolar"
+
+    paginas = []
+
+    def _pagina(url):
+        paginas.append(url)
+        return bs4.BeautifulSoup(
+            '<a class="external-link" href="http://x/microdados_2019.zip">a</a>'
+            '<a class="external-link" href="http://x/microdados_2020.zip">b</a>',
+            features="html.parser",
+        )
+
+    monkeypatch.setattr(web, "obtem_pagina", _pagina)
+    monkeypatch.setattr(web, "_CACHE_LINKS", dict())
+
+    # a página é acessada uma única vez no processo
+    assert len(GestorETL(ds=ds).inep) == 2
+    assert len(GestorETL(ds=ds, validade_links=3600).inep) == 2
+    assert len(paginas) == 1
+    assert (pasta / "_links.json").exists()
+
+    # o índice salvo no data store é reaproveitado entre processos
+    monkeypatch.setattr(web, "_CACHE_LINKS", dict())
+    assert len(GestorETL(ds=ds, validade_links=3600).inep) == 2
+    assert len(paginas) == 1
+
+    # no modo offline apenas os arquivos já baixados são considerados
+    etl = GestorETL(ds=ds, offline=True)
+    assert etl.ano == 2020
+    assert [doc.nome for doc in etl.inep] == ["2020.zip"]
+    assert len(etl.dicionario_para_baixar()) == 0
+    assert len(paginas) == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import pandas as pd
+
+from src.aquisicao import GestorETL
+from src.configs import COLECAO_AQUISICAO
+
+
+def test_pipeline_manifesto(
+    gera_ds_censo, compartilha_censo, tmp_path, monkeypatch
+) -> None:
+    ds = gera_ds_censo("manifesto")
+
+    def gera_etl() -> GestorETL:
+        etl = GestorETL(ds=ds, ano=2020)
+        compartilha_censo(etl)
+        return etl
+
+    etl = gera_etl()
+    assert not etl.atualizado()
+    etl.pipeline()
+
+    saida = tmp_path / "manifesto" / COLECAO_AQUISICAO / "gestor.parquet"
+    assert (saida / "ANO=2020/_manifesto.json").exists()
+    assert len(pd.read_parquet(saida)) > 0
+
+    # com as mesmas entradas o ETL não deve ser executado novamente
+    etl = gera_etl()
+    assert etl.atualizado()
+
+    def _erro(*args, **kwargs):
+        raise AssertionError("O ETL não deveria ser executado")
+
+    monkeypatch.setattr(etl, "extract", _erro)
+    etl.pipeline()
+
+    # uma nova versão do código invalida o manifesto
+    etl = gera_etl()
+    monkeypatch.setattr(etl, "versao_codigo", lambda: "nova")
+    assert not etl.atualizado()
+    etl.pipeline()
+    assert gera_etl().atualizado() is False
+    assert etl.atualizado()
+
+
+def test_manifestos_independem_da_exportacao(gera_ds_censo, compartilha_censo) -> None:
+    etl = GestorETL(ds=gera_ds_censo("particao"), ano=2020)
+    compartilha_censo(etl)
+    etl.extract()
+    etl.transform()
+    saidas = [(doc.pasta, doc.nome) for doc in etl.documentos_saida]
+    etl.load()
+
+    # a exportação não altera os documentos de saída, de forma que os
+    # manifestos são gerados a partir deles em qualquer momento
+    assert [(doc.pasta, doc.nome) for doc in etl.documentos_saida] == saidas
+    assert [(doc.pasta, doc.nome) for doc in etl.documentos_manifesto] == [
+        (f"{nome}/ANO=2020", "_manifesto.json") for _, nome in saidas
+    ]
+    assert all([etl.gera_particao(doc).exists() for doc in etl.documentos_saida])
+
+
+if __name__ == "__main__":
+    unittest.main()
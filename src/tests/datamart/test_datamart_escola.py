@@ -273,3 +273,26 @@ def test_gera_metricas_adicionais(dados: typing.Dict[str, pd.DataFrame]):
         "CO_REGIAO",
         "CO_UF",
     }.issubset(dados["dm"].columns)
+
+
+def test_datamart_escola_texto_arrow(ano: int):
+    ds = DataStore("teste", texto_arrow=True)
+    dm = dm_escola.processa_censo_escola(ds, ano)
+    texto = [c for c in dm if pd.api.types.is_string_dtype(dm[c].dtype)]
+    assert "NO_ENTIDADE" in texto
+
+    # as colunas de texto são mantidas nos buffers do arrow após os agrupamentos
+    for processa in [
+        dm_escola.processa_turmas,
+        dm_escola.processa_docentes,
+        dm_escola.processa_gestor,
+        dm_escola.processa_matricula,
+        dm_escola.processa_ideb,
+    ]:
+        dm = processa(dm, ds, ano)
+        for c in texto:
+            assert dm[c].dtype == pd.StringDtype("pyarrow"), c
+    dm = dm_escola.gera_metricas_adicionais(dm)
+
+    assert all([dm[c].dtype == pd.StringDtype("pyarrow") for c in texto])
+    assert not (dm.dtypes == object).any()
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import src.io.data_store._api as api
+import src.utils.interno as interno
+from src.configs import COLECAO_DADOS_WEB
+from src.io.configs import DS_ENVS
+from src.io.data_store import DataStore
+from src.io.data_store import Documento
+
+
+def test_obtem_hash_indice(tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(DS_ENVS, "hashes", str(tmp_path))
+    pasta = tmp_path / COLECAO_DADOS_WEB / "censo_escolar"
+    pasta.mkdir(parents=True)
+    (pasta / "2020.zip").write_bytes(b"conteudo")
+
+    ds = DataStore("hashes")
+    doc = Documento(
+        ds,
+        referencia=dict(
+            nome="2020.zip", colecao=COLECAO_DADOS_WEB, pasta="censo_escolar"
+        ),
+    )
+    esperado = hashlib.sha1(b"conteudo").hexdigest()
+    assert ds.obtem_hash(doc) == esperado
+
+    indice = json.loads((pasta / api.INDICE_HASHES).read_text())
+    assert indice["2020.zip"]["hash"] == esperado
+    assert indice["2020.zip"]["tamanho"] == len(b"conteudo")
+
+    # sem alterações no arquivo o hash é obtido do índice, mesmo sem cache
+    def falha(*args, **kwargs):
+        raise AssertionError("O arquivo não deveria ser lido novamente")
+
+    monkeypatch.setattr(interno, "_CACHE_HASHES", dict())
+    monkeypatch.setattr(api, "calcula_hash_arquivo", falha)
+    assert ds.obtem_hash(doc) == esperado
+
+    # uma nova data de modificação força o cálculo do hash
+    (pasta / "2020.zip").write_bytes(b"novo conteudo")
+    os.utime(pasta / "2020.zip", (0, 0))
+    with pytest.raises(AssertionError):
+        ds.obtem_hash(doc)
+
+    monkeypatch.setattr(api, "calcula_hash_arquivo", interno.calcula_hash_arquivo)
+    assert ds.obtem_hash(doc) == hashlib.sha1(b"novo conteudo").hexdigest()
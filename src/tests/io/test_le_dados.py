@@ -0,0 +1,226 @@
+import os
+import sys
+from io import BytesIO
+from zipfile import ZIP_STORED
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+
+import src.io.le_dados as le_dados
+from src.aquisicao import GestorETL
+from src.configs import COLECAO_DADOS_WEB
+
+# extrator externo de testes, que lê os conteúdos guardados sem compressão
+# dos membros marcados como Deflate64
+EXTRATOR_TESTE = (
+    "import sys, zipfile;"
+    "z = zipfile.ZipFile(sys.argv[1]);"
+    "i = z.getinfo(sys.argv[2]);"
+    "i.compress_type = zipfile.ZIP_STORED;"
+    "sys.stdout.buffer.write(z.open(i).read())"
+)
+
+
+@pytest.fixture
+def zip_deflate64(tmp_path, monkeypatch):
+    """
+    Gera um zip cujo membro está marcado com o método de compressão
+    Deflate64 (9), que não é suportado pelo python, e configura um
+    extrator externo capaz de lê-lo
+    """
+    conteudo = "NU_ANO_CENSO|CO_ENTIDADE\n" + "2020|1\n" * 2000
+    caminho = tmp_path / "deflate64.zip"
+    with ZipFile(caminho, "w", compression=ZIP_STORED) as z:
+        z.writestr("dados/gestor.CSV", conteudo)
+
+    # altera o método nos cabeçalhos local e central do membro
+    dados = bytearray(caminho.read_bytes())
+    local = dados.index(b"PK\x03\x04")
+    central = dados.index(b"PK\x01\x02")
+    dados[local + 8 : local + 10] = (9).to_bytes(2, "little")
+    dados[central + 10 : central + 12] = (9).to_bytes(2, "little")
+    caminho.write_bytes(bytes(dados))
+
+    monkeypatch.setitem(
+        le_dados.EXTRATORES_EXTERNOS,
+        "zip",
+        [[sys.executable, "-c", EXTRATOR_TESTE, "{arquivo}", "{membro}"]],
+    )
+    return caminho, conteudo
+
+
+def test_obtem_cabecalhos_comprimidos(dados_path, monkeypatch):
+    arq = dados_path / f"{COLECAO_DADOS_WEB}/censo_escolar/2020.zip"
+    cabecalhos = le_dados.obtem_cabecalhos_comprimidos(
+        arq, "zip", padrao_comp="(gestor)[.](CSV)", sep="|"
+    )
+
+    assert list(cabecalhos) == ["microdados_educacao_basica_2020/DADOS/gestor.CSV"]
+    cols = cabecalhos["microdados_educacao_basica_2020/DADOS/gestor.CSV"]
+    with ZipFile(arq) as z:
+        with z.open("microdados_educacao_basica_2020/DADOS/gestor.CSV") as f:
+            assert cols == f.readline().decode("latin-1").strip().split("|")
+
+    # chamadas subsequentes são resolvidas pelo cache sem abrir o arquivo
+    def _erro(*args, **kwargs):
+        raise AssertionError("O arquivo não deveria ser aberto")
+
+    monkeypatch.setattr(le_dados, "ZipFile", _erro)
+    assert (
+        le_dados.obtem_cabecalhos_comprimidos(
+            arq, "zip", padrao_comp="(gestor)[.](CSV)", sep="|"
+        )
+        == cabecalhos
+    )
+    assert le_dados.obtem_chave_arquivo(arq) == (
+        os.path.abspath(arq),
+        os.path.getmtime(arq),
+    )
+
+
+def test_obtem_cabecalhos_comprimidos_configuracoes(tmp_path):
+    caminho = tmp_path / "dados.zip"
+    with ZipFile(caminho, "w") as z:
+        z.writestr("dados.csv", "AÇÃO;B|C\n1;2|3\n".encode("utf-8"))
+
+    # leituras com outro separador ou codificação não utilizam o cache
+    assert le_dados.obtem_cabecalhos_comprimidos(
+        caminho, "zip", sep="|", encoding="utf-8"
+    ) == {"dados.csv": ["AÇÃO;B", "C"]}
+    assert le_dados.obtem_cabecalhos_comprimidos(
+        caminho, "zip", sep=";", encoding="utf-8"
+    ) == {"dados.csv": ["AÇÃO", "B|C"]}
+    assert le_dados.obtem_cabecalhos_comprimidos(
+        caminho, "zip", sep=";", encoding="latin-1"
+    ) == {"dados.csv": ["AÇÃO".encode("utf-8").decode("latin-1"), "B|C"]}
+
+
+def test_obtem_cabecalhos_comprimidos_externo(zip_deflate64):
+    caminho, _ = zip_deflate64
+    with ZipFile(caminho) as z:
+        with pytest.raises(NotImplementedError):
+            z.open("dados/gestor.CSV")
+
+    assert le_dados.obtem_cabecalhos_comprimidos(caminho, "zip", sep="|") == {
+        "dados/gestor.CSV": ["NU_ANO_CENSO", "CO_ENTIDADE"]
+    }
+
+    # o arquivo também é lido a partir de um buffer
+    with open(caminho, "rb") as f:
+        assert le_dados.obtem_cabecalhos_comprimidos(
+            BytesIO(f.read()), "zip", sep="|"
+        ) == {"dados/gestor.CSV": ["NU_ANO_CENSO", "CO_ENTIDADE"]}
+
+
+def test_estima_linhas_comprimidos_externo(zip_deflate64):
+    caminho, conteudo = zip_deflate64
+    assert le_dados.estima_linhas_comprimidos(caminho, "zip", n_linhas=100) == {
+        "dados/gestor.CSV": (len(conteudo), len("2020|1\n"))
+    }
+
+
+def test_le_csv_arrow(ds, dados_path):
+    etl = GestorETL(ds=ds, ano=2020)
+    arq = dados_path / f"{COLECAO_DADOS_WEB}/censo_escolar/2020.zip"
+    conf = dict(
+        como_df=True,
+        padrao_comp=etl.padrao_comp,
+        sep="|",
+        encoding="latin-1",
+        usecols=etl._carrega_cols,
+        dtype=etl._dtype,
+    )
+
+    df_pandas = le_dados.le_dados_comprimidos(arq, "zip", **conf)
+    df_arrow = le_dados.le_dados_comprimidos(arq, "zip", motor_csv="pyarrow", **conf)
+
+    pd.testing.assert_frame_equal(df_pandas, df_arrow[df_pandas.columns])
+
+
+def test_le_parquet_arrow(tmp_path):
+    df = pd.DataFrame(
+        {
+            "NO_ENTIDADE": ["A", None, "B"],
+            "TP_ZONA": pd.Categorical(["RURAL", "URBANA", "RURAL"]),
+            "QT_TURMAS": [1, 2, 3],
+        }
+    )
+    df.to_parquet(tmp_path / "dados.parquet")
+
+    obtido = le_dados.le_parquet_arrow(str(tmp_path / "dados.parquet"))
+    assert obtido["NO_ENTIDADE"].dtype == pd.StringDtype("pyarrow")
+    assert obtido["TP_ZONA"].dtype == "category"
+    assert obtido["NO_ENTIDADE"].fillna("").to_list() == ["A", "", "B"]
+    pd.testing.assert_frame_equal(
+        obtido.drop(columns=["NO_ENTIDADE"]),
+        pd.read_parquet(tmp_path / "dados.parquet").drop(columns=["NO_ENTIDADE"]),
+    )
+
+    obtido = le_dados.le_parquet_arrow(
+        str(tmp_path / "dados.parquet"),
+        columns=["NO_ENTIDADE"],
+        filters=[("QT_TURMAS", ">", 1)],
+    )
+    assert obtido["NO_ENTIDADE"].isna().to_list() == [True, False]
+
+
+def test_le_dados_comprimidos_paralelo(dados_path):
+    arq = dados_path / f"{COLECAO_DADOS_WEB}/censo_escolar/2020.zip"
+    conf = dict(como_df=True, padrao_comp="docentes_", sep="|", encoding="latin-1")
+
+    serial = le_dados.le_dados_comprimidos(arq, "zip", **conf)
+    assert len(serial) == 5
+
+    # o limite de memória mínimo força a leitura de um arquivo por vez
+    for tipo_pool, limite_memoria in [
+        ("thread", None),
+        ("thread", 1),
+        ("processo", None),
+    ]:
+        with open(arq, "rb") as f:
+            paralelo = le_dados.le_dados_comprimidos(
+                f,
+                "zip",
+                max_trabalhadores=3,
+                tipo_pool=tipo_pool,
+                limite_memoria=limite_memoria,
+                **conf,
+            )
+        assert list(paralelo) == list(serial)
+        for nome, df in serial.items():
+            pd.testing.assert_frame_equal(df, paralelo[nome])
+
+
+@pytest.mark.skipif(
+    le_dados.obtem_extrator_externo("zip") is None,
+    reason="Nenhum programa de extração de zip instalado",
+)
+def test_le_dados_comprimidos_externo(dados_path, monkeypatch):
+    arq = dados_path / f"{COLECAO_DADOS_WEB}/censo_escolar/2020.zip"
+    conf = dict(
+        como_df=True, padrao_comp="docentes_", sep="|", encoding="latin-1", dtype=str
+    )
+    esperado = le_dados.le_dados_comprimidos(arq, "zip", **conf)
+
+    # simula um zip com um método de compressão não suportado pelo python
+    class ZipNaoSuportado(ZipFile):
+        def open(self, *args, **kwargs):
+            raise NotImplementedError("That compression method is not supported")
+
+    def _erro(*args, **kwargs):
+        raise AssertionError("O arquivo não deveria ser extraído por completo")
+
+    monkeypatch.setattr(le_dados, "ZipFile", ZipNaoSuportado)
+    monkeypatch.setattr(le_dados.pyunpack, "Archive", _erro)
+
+    with open(arq, "rb") as f:
+        obtido = le_dados.le_dados_comprimidos(BytesIO(f.read()), "zip", **conf)
+    assert list(obtido) == list(esperado)
+    assert all([df.equals(obtido[nome]) for nome, df in esperado.items()])
+
+    blocos = list(le_dados.itera_dados_comprimidos(arq, "zip", 100, **conf))
+    assert [n for n, _ in blocos][0] == list(esperado)[0]
+    assert pd.concat([b for _, b in blocos], ignore_index=True).equals(
+        pd.concat(esperado.values(), ignore_index=True)
+    )
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from src.utils.categorico import MapaCategorico
+
+
+def test_mapa_categorico():
+    depara = {1: "RURAL", 2: "URBANA", 9: "NÃO INFORMADO", "U": "URBANA"}
+    serie = pd.Series([1, 2, np.nan, 9, "U", "RURAL", 2], name="TP_ZONA")
+    mapa = MapaCategorico(depara)
+
+    obtido, inesperados = mapa.aplica(serie)
+    esperado = serie.replace(depara).astype(pd.Categorical(list(depara.values())).dtype)
+
+    assert len(inesperados) == 0
+    pd.testing.assert_series_equal(obtido, esperado)
+
+    _, inesperados = mapa.aplica(pd.Series([1.0, 3.0, np.nan, 4.0]))
+    assert inesperados == {3.0, 4.0}
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.datas import converte_datas
+from src.utils.datas import gera_datas
+
+
+def test_converte_datas():
+    formatos = ["%d/%m/%Y", "%d%b%Y:00:00:00"]
+    serie = pd.Series(
+        ["01/02/2020", None, "01/02/2020", "31/12/2019"], index=[3, 2, 1, 0]
+    )
+
+    obtido, formato = converte_datas(serie, formatos)
+    assert formato == "%d/%m/%Y"
+    pd.testing.assert_series_equal(obtido, pd.to_datetime(serie, format=formato))
+
+    # um formato detectado que não converte os valores é detectado novamente
+    serie = pd.Series(["01FEB2020:00:00:00", "31DEC2019:00:00:00"])
+    obtido, formato = converte_datas(serie, formatos, formato="%d/%m/%Y")
+    assert formato == "%d%b%Y:00:00:00"
+    assert obtido.to_list() == [pd.Timestamp(2020, 2, 1), pd.Timestamp(2019, 12, 31)]
+
+
+def test_gera_datas():
+    ano = pd.Series([2000, 2001, np.nan, 1999])
+    mes = pd.Series([1, 12, 3, 2])
+    dia = pd.Series([12, 31, 1, 28])
+
+    obtido = gera_datas(ano, mes, dia)
+    assert obtido.to_list()[:2] == [
+        pd.Timestamp(2000, 1, 12),
+        pd.Timestamp(2001, 12, 31),
+    ]
+    assert pd.isna(obtido[2])
+    assert obtido[3] == pd.Timestamp(1999, 2, 28)
+
+    obtido = gera_datas(ano, mes)
+    assert obtido[1] == pd.Timestamp(2001, 12, 1)
+
+    with pytest.raises(ValueError):
+        gera_datas(pd.Series([2001]), pd.Series([2]), pd.Series([29]))
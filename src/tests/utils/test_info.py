@@ -1,3 +1,6 @@
+import os
+
+import src.utils.info as utils_info
 from src.utils.info import carrega_yaml
 
 
@@ -6,3 +9,24 @@ def test_carrega_yaml():
 
     assert isinstance(info, dict)
     assert "DADOS_SCHEMA" in info
+
+
+def test_compila_arquivo_info(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_info, "CAMINHO_INFO", tmp_path)
+    arq = tmp_path / "teste.yml"
+    arq.write_text("COL_ID: ID_ESCOLA\n")
+
+    assert carrega_yaml("teste.yml") == {"COL_ID": "ID_ESCOLA"}
+    assert (tmp_path / utils_info.PASTA_COMPILADOS / "teste.yml.pkl").exists()
+
+    # o conteúdo devolvido é uma cópia do conteúdo em cache
+    carrega_yaml("teste.yml")["COL_ID"] = "ID_TURMA"
+    assert carrega_yaml("teste.yml") == {"COL_ID": "ID_ESCOLA"}
+
+    # a modificação do arquivo invalida o cache e o arquivo compilado
+    arq.write_text("COL_ID: ID_TURMA\n")
+    os.utime(arq, (os.path.getmtime(arq) + 10, os.path.getmtime(arq) + 10))
+    assert carrega_yaml("teste.yml") == {"COL_ID": "ID_TURMA"}
+
+    utils_info._CACHE_INFO.clear()
+    assert carrega_yaml("teste.yml") == {"COL_ID": "ID_TURMA"}
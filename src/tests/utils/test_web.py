@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.aquisicao import IDEBETL
+from src.configs import COLECAO_DADOS_WEB
+from src.io.configs import DS_ENVS
+from src.io.data_store import DataStore
+from src.io.data_store import Documento
+from src.utils.web import download_em_segmentos
+
+CONTEUDO = os.urandom(10_000)
+
+
+class ServidorParcial(BaseHTTPRequestHandler):
+    """
+    Servidor de testes que devolve CONTEUDO aceitando requisições parciais
+    """
+
+    aceita_parcial = True
+    requisicoes: list = []
+    falhas = 0
+    ativos = 0
+    max_ativos = 0
+    trava = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(CONTEUDO)))
+        self.send_header("ETag", '"v1"')
+        if self.aceita_parcial:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        intervalo = self.headers.get("Range")
+        self.requisicoes.append(intervalo)
+
+        cls = type(self)
+        with cls.trava:
+            cls.ativos += 1
+            cls.max_ativos = max(cls.max_ativos, cls.ativos)
+            falha = cls.falhas > 0
+            cls.falhas -= 1 if falha else 0
+        time.sleep(0.05)
+        with cls.trava:
+            cls.ativos -= 1
+
+        if falha:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if intervalo is None or not self.aceita_parcial:
+            self.send_response(200)
+            dados = CONTEUDO
+        else:
+            inicio, fim = [int(v) for v in re.findall(r"[0-9]+", intervalo)]
+            dados = CONTEUDO[inicio : fim + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(CONTEUDO)}")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+
+@pytest.fixture
+def servidor(monkeypatch):
+    monkeypatch.setattr(ServidorParcial, "requisicoes", [])
+    monkeypatch.setattr(ServidorParcial, "max_ativos", 0)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ServidorParcial)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/dados.zip"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download_em_segmentos(servidor, tmp_path) -> None:
+    caminho = tmp_path / "dados.zip"
+    download_em_segmentos(
+        caminho,
+        servidor,
+        tamanho_segmento=1024,
+        max_trabalhadores=4,
+        hash_esperado=hashlib.sha1(CONTEUDO).hexdigest(),
+    )
+
+    assert caminho.read_bytes() == CONTEUDO
+    assert os.listdir(tmp_path) == ["dados.zip"]
+    assert len(ServidorParcial.requisicoes) == 10
+
+    # um hash diferente descarta o arquivo baixado
+    with pytest.raises(ValueError):
+        download_em_segmentos(
+            tmp_path / "errado.zip", servidor, tamanho_segmento=1024, hash_esperado="0"
+        )
+    assert os.listdir(tmp_path) == ["dados.zip"]
+
+
+def test_download_em_segmentos_retoma(servidor, tmp_path) -> None:
+    # simula um download interrompido com a primeira metade concluída
+    caminho = tmp_path / "dados.zip"
+    (tmp_path / "dados.zip.parcial").write_bytes(
+        CONTEUDO[:5120] + bytes(len(CONTEUDO) - 5120)
+    )
+    estado = dict(
+        url=servidor,
+        tamanho=len(CONTEUDO),
+        validador='"v1"',
+        tamanho_segmento=1024,
+        concluidos=[0, 1024, 2048, 3072, 4096],
+    )
+    (tmp_path / "dados.zip.segmentos.json").write_text(json.dumps(estado))
+
+    download_em_segmentos(caminho, servidor, tamanho_segmento=1024)
+
+    assert caminho.read_bytes() == CONTEUDO
+    assert sorted(ServidorParcial.requisicoes) == [
+        f"bytes={i}-{min(i + 1024, len(CONTEUDO)) - 1}"
+        for i in range(5120, len(CONTEUDO), 1024)
+    ]
+
+
+def test_download_em_segmentos_conexoes(servidor, tmp_path) -> None:
+    # dois downloads simultâneos dividem o limite de conexões ao servidor
+    conexoes = threading.BoundedSemaphore(2)
+    downloads = [
+        threading.Thread(
+            target=download_em_segmentos,
+            args=(tmp_path / f"{i}.zip", f"{servidor}?arquivo={i}"),
+            kwargs=dict(tamanho_segmento=1024, conexoes=conexoes),
+        )
+        for i in range(2)
+    ]
+    for download in downloads:
+        download.start()
+    for download in downloads:
+        download.join()
+
+    assert all([(tmp_path / f"{i}.zip").read_bytes() == CONTEUDO for i in range(2)])
+    assert len(ServidorParcial.requisicoes) == 20
+    assert ServidorParcial.max_ativos == 2
+
+
+def test_download_sem_parcial(servidor, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(ServidorParcial, "aceita_parcial", False)
+    caminho = tmp_path / "dados.zip"
+    download_em_segmentos(caminho, servidor, tamanho_segmento=1024)
+
+    assert caminho.read_bytes() == CONTEUDO
+    assert ServidorParcial.requisicoes == [None]
+
+
+def test_download_conteudo_paralelo(servidor, tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(DS_ENVS, "downloads", str(tmp_path))
+    monkeypatch.setattr(ServidorParcial, "falhas", 1)
+    ds = DataStore("downloads")
+    etl = IDEBETL(ds=ds)
+    etl._links = {
+        Documento(
+            ds,
+            referencia=dict(nome=f"{i}.zip", colecao=COLECAO_DADOS_WEB, pasta="ideb"),
+        ): f"{servidor}?arquivo={i}"
+        for i in range(5)
+    }
+
+    etl.download_conteudo(max_trabalhadores=4, max_por_host=2)
+
+    # o download que falhou em paralelo é refeito em série
+    pasta = tmp_path / COLECAO_DADOS_WEB / "ideb"
+    assert sorted(os.listdir(pasta)) == [f"{i}.zip" for i in range(5)]
+    assert all([(pasta / f"{i}.zip").read_bytes() == CONTEUDO for i in range(5)])
+    assert len(ServidorParcial.requisicoes) == 6
+    assert ServidorParcial.max_ativos == 2
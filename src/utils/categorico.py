@@ -0,0 +1,54 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+
+class MapaCategorico:
+    """
+    De-para de valores brutos para um tipo categórico, compilado uma
+    única vez em uma tabela de códigos das categorias
+
+    A conversão de uma coluna é feita em uma única passagem vetorizada
+    sobre os dados: os valores distintos da coluna são obtidos pela
+    fatoração da série e apenas eles são procurados no de-para, sendo os
+    códigos das categorias propagados para todas as linhas por indexação
+    """
+
+    dtype: pd.CategoricalDtype
+    _codigos: typing.Dict[typing.Any, int]
+
+    def __init__(self, depara: typing.Dict[typing.Any, typing.Any]) -> None:
+        """
+        Compila o de-para de valores em um mapa de códigos das categorias
+
+        :param depara: dicionário com os valores brutos e suas categorias
+        """
+        self.dtype = pd.Categorical(list(depara.values())).dtype
+        posicoes = {v: i for i, v in enumerate(self.dtype.categories)}
+
+        # os valores que já são categorias são mantidos, assim como no replace
+        self._codigos = {
+            **posicoes,
+            **{k: posicoes[v] for k, v in depara.items()},
+        }
+
+    def aplica(
+        self, serie: pd.Series
+    ) -> typing.Tuple[pd.Series, typing.Set[typing.Any]]:
+        """
+        Converte uma série de valores brutos para o tipo categórico
+
+        :param serie: série com os valores brutos
+        :return: série categórica e conjunto de valores fora do de-para
+        """
+        codigos, unicos = pd.factorize(serie)
+
+        # a última posição da tabela recebe os nulos, com código -1
+        tabela = np.array(
+            [self._codigos.get(u, -1) for u in unicos] + [-1], dtype="int32"
+        )
+        inesperados = set([u for u in unicos if u not in self._codigos])
+
+        categorias = pd.Categorical.from_codes(tabela[codigos], dtype=self.dtype)
+        return pd.Series(categorias, index=serie.index, name=serie.name), inesperados
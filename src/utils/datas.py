@@ -0,0 +1,96 @@
+import typing
+
+import numpy as np
+import pandas as pd
+
+
+def detecta_formato_data(
+    valores: typing.Union[pd.Index, np.ndarray], formatos: typing.Sequence[str]
+) -> str:
+    """
+    Detecta o primeiro formato de data capaz de converter todos os valores
+
+    :param valores: valores de texto a serem convertidos
+    :param formatos: lista de formatos candidatos, em ordem de preferência
+    :return: formato de data detectado
+    """
+    for formato in formatos:
+        try:
+            pd.to_datetime(valores, format=formato)
+        except ValueError:
+            continue
+        return formato
+    raise ValueError(f"Nenhum dos formatos {formatos} converte os valores de data")
+
+
+def converte_datas(
+    serie: pd.Series,
+    formatos: typing.Sequence[str],
+    formato: typing.Optional[str] = None,
+) -> typing.Tuple[pd.Series, str]:
+    """
+    Converte uma série de datas em texto para datetime, convertendo cada
+    valor distinto uma única vez e propagando o resultado para as linhas
+
+    :param serie: série com as datas em texto
+    :param formatos: lista de formatos candidatos, em ordem de preferência
+    :param formato: formato já detectado para a coluna, que é verificado
+    novamente caso não seja capaz de converter os valores
+    :return: série de datas e formato utilizado na conversão
+    """
+    codigos, unicos = pd.factorize(serie)
+
+    if formato is None:
+        formato = detecta_formato_data(unicos, formatos)
+    try:
+        datas = pd.to_datetime(unicos, format=formato)
+    except ValueError:
+        formato = detecta_formato_data(unicos, formatos)
+        datas = pd.to_datetime(unicos, format=formato)
+
+    # a última posição recebe os nulos, com código -1
+    valores = np.append(np.asarray(datas, dtype="datetime64[ns]"), np.datetime64("NaT"))
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name), formato
+
+
+def gera_datas(
+    ano: pd.Series, mes: pd.Series, dia: typing.Optional[pd.Series] = None
+) -> pd.Series:
+    """
+    Gera uma série de datas a partir das colunas numéricas de ano, mês e
+    dia, de forma aritmética e sem passar por uma representação em texto.
+    Linhas com algum componente nulo geram datas nulas
+
+    :param ano: série com os anos
+    :param mes: série com os meses
+    :param dia: série com os dias (o primeiro dia do mês caso não informada)
+    :return: série de datas
+    """
+    componentes = [ano, mes] if dia is None else [ano, mes, dia]
+    nulos = np.logical_or.reduce([c.isna().to_numpy() for c in componentes])
+    a, m, d = [
+        c.to_numpy(dtype="float64", na_value=1970).astype("int64") for c in componentes
+    ] + ([np.ones(len(ano), dtype="int64")] if dia is None else [])
+
+    meses = (a - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (m - 1)
+    datas = meses.astype("datetime64[D]") + (d - 1)
+
+    # verifica que o ano cabe no datetime do pandas e que o mês e o dia
+    # são válidos, ou seja, que não avançaram o mês
+    invalidos = ~nulos & (
+        (a <= pd.Timestamp.min.year)
+        | (a >= pd.Timestamp.max.year)
+        | (m < 1)
+        | (m > 12)
+        | (d < 1)
+        | (datas.astype("datetime64[M]") != meses)
+    )
+    if invalidos.any():
+        raise ValueError(
+            f"Há {invalidos.sum()} datas inválidas, como "
+            f"{a[invalidos][0]}-{m[invalidos][0]}-{d[invalidos][0]}"
+        )
+
+    datas = datas.astype("datetime64[ns]")
+    datas[nulos] = np.datetime64("NaT")
+    return pd.Series(datas, index=ano.index)
@@ -1,3 +1,8 @@
+import copy
+import hashlib
+import logging
+import os
+import pickle
 import typing
 from pathlib import Path
 
@@ -6,6 +11,86 @@ import yaml
 
 CAMINHO_INFO = Path(__file__).parent.parent / "info"
 
+# pasta com os arquivos da pasta info compilados em pickle
+PASTA_COMPILADOS = ".compilados"
+
+# cache de conteúdos compilados de arquivos da pasta info, as chaves são
+# formadas pelo caminho do arquivo e sua data de modificação
+_CACHE_INFO: typing.Dict[typing.Tuple[str, float], typing.Any] = dict()
+
+
+def le_arquivo_info(nome: str) -> typing.Any:
+    """
+    Lê e interpreta um arquivo da pasta info da ferramenta, sendo os
+    arquivos excel lidos com todas as suas abas
+
+    :param nome: nome do arquivo
+    :return: dicionário com o conteúdo do yaml ou com um data frame por aba
+    """
+    global CAMINHO_INFO
+    if nome.endswith((".yml", ".yaml")):
+        with open(CAMINHO_INFO / nome, "r", encoding="UTF-8") as f:
+            return yaml.load(f, Loader=yaml.FullLoader)
+    return pd.read_excel(CAMINHO_INFO / nome, sheet_name=None)
+
+
+def compila_arquivo_info(nome: str) -> typing.Any:
+    """
+    Compila um arquivo da pasta info em um pickle, junto com a data de
+    modificação do arquivo de origem, e o guarda no cache do processo.
+    O pickle é reaproveitado enquanto o arquivo não for modificado
+
+    :param nome: nome do arquivo
+    :return: conteúdo interpretado do arquivo
+    """
+    global CAMINHO_INFO, _CACHE_INFO
+    mtime = os.path.getmtime(CAMINHO_INFO / nome)
+    chave = (str(CAMINHO_INFO / nome), mtime)
+    if chave in _CACHE_INFO:
+        return _CACHE_INFO[chave]
+
+    compilado = CAMINHO_INFO / PASTA_COMPILADOS / f"{nome}.pkl"
+    conteudo = None
+    if compilado.exists():
+        with open(compilado, "rb") as f:
+            salvo = pickle.load(f)
+        if salvo["mtime"] == mtime:
+            conteudo = salvo["conteudo"]
+
+    # o pickle é gerado novamente caso não exista ou esteja desatualizado
+    if conteudo is None:
+        conteudo = le_arquivo_info(nome)
+        try:
+            compilado.parent.mkdir(exist_ok=True)
+            with open(compilado, "wb") as f:
+                pickle.dump(dict(mtime=mtime, conteudo=conteudo), f)
+        except OSError:
+            logging.getLogger(__name__).warning(
+                f"Não foi possível salvar o arquivo compilado de {nome}"
+            )
+
+    _CACHE_INFO[chave] = conteudo
+    return conteudo
+
+
+def compila_info() -> typing.List[str]:
+    """
+    Compila todos os arquivos yaml e excel da pasta info da ferramenta
+
+    :return: lista com os nomes dos arquivos compilados
+    """
+    global CAMINHO_INFO
+    nomes = sorted(
+        [
+            p.name
+            for p in CAMINHO_INFO.iterdir()
+            if p.suffix in [".yml", ".yaml", ".xlsx"]
+        ]
+    )
+    for nome in nomes:
+        compila_arquivo_info(nome)
+    return nomes
+
 
 def carrega_yaml(nome_yaml: str) -> typing.Dict[str, typing.Any]:
     """
@@ -14,18 +99,41 @@ def carrega_yaml(nome_yaml: str) -> typing.Dict[str, typing.Any]:
     :param nome_yaml: nome do arquivo yaml
     :return: dicionário com conteúdo do arquivo
     """
-    global CAMINHO_INFO
-    with open(CAMINHO_INFO / f"{nome_yaml}", "r", encoding="UTF-8") as f:
-        return yaml.load(f, Loader=yaml.FullLoader)
+    return copy.deepcopy(compila_arquivo_info(nome_yaml))
 
 
 def carrega_excel(nome_excel: str, **kwargs) -> pd.DataFrame:
     """
-    Carrega arquivo excel da pasta info da ferramenta
+    Carrega arquivo excel da pasta info da ferramenta. Quando apenas a aba
+    é informada, ela é obtida do arquivo compilado
 
     :param nome_excel: nome do arquivo excel
     :param kwargs: argumentos de carregamento
     :return: data frame pandas com conteúdo
     """
     global CAMINHO_INFO
-    return pd.read_excel(CAMINHO_INFO / nome_excel, **kwargs)
+    if set(kwargs) - {"sheet_name"}:
+        return pd.read_excel(CAMINHO_INFO / nome_excel, **kwargs)
+
+    abas = compila_arquivo_info(nome_excel)
+    aba = kwargs.get("sheet_name", 0)
+    if isinstance(aba, int):
+        aba = list(abas)[aba]
+    if aba not in abas:
+        raise ValueError(f"Worksheet named '{aba}' not found")
+    return abas[aba].copy()
+
+
+def calcula_hash_info(*nomes: str) -> str:
+    """
+    Calcula o hash dos conteúdos de arquivos da pasta info da ferramenta
+
+    :param nomes: nomes dos arquivos
+    :return: hash hexadecimal dos conteúdos dos arquivos
+    """
+    global CAMINHO_INFO
+    sha = hashlib.sha1()
+    for nome in nomes:
+        with open(CAMINHO_INFO / nome, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
@@ -1,7 +1,14 @@
+import hashlib
 import inspect
 import os
 import types
 import typing
+from io import BytesIO
+from pathlib import Path
+
+# cache de hashes dos conteúdos de arquivos, as chaves são formadas pelo
+# caminho do arquivo e sua data de modificação
+_CACHE_HASHES: typing.Dict[typing.Tuple[str, float], str] = dict()
 
 
 def obtem_argumentos_objeto(
@@ -38,3 +45,67 @@ def obtem_extencao(arquivo: str) -> str:
     :return: string com extenção sem .
     """
     return os.path.splitext(arquivo)[-1][1:].lower()
+
+
+def obtem_memoria_disponivel() -> typing.Union[int, None]:
+    """
+    Obtém a quantidade de memória física disponível no sistema
+
+    :return: memória disponível em bytes ou None caso o sistema
+    operacional não permita consultá-la
+    """
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def obtem_chave_arquivo(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO]
+) -> typing.Union[None, typing.Tuple[str, float]]:
+    """
+    Gera uma chave de cache para um arquivo a partir do seu caminho
+    e da sua data de modificação
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :return: tupla com caminho e data de modificação ou None caso o
+    arquivo não esteja no disco
+    """
+    caminho = (
+        arquivo if isinstance(arquivo, (str, Path)) else getattr(arquivo, "name", None)
+    )
+    if not isinstance(caminho, (str, Path)) or not os.path.isfile(caminho):
+        return None
+    return os.path.abspath(caminho), os.path.getmtime(caminho)
+
+
+def calcula_hash_arquivo(
+    arquivo: typing.Union[str, Path, typing.IO[bytes], BytesIO],
+    tamanho_leitura: int = 2**20,
+) -> str:
+    """
+    Calcula o hash sha1 dos conteúdos de um arquivo lendo-o aos poucos
+
+    O resultado é guardado em cache por caminho do arquivo e data de
+    modificação, de forma que um mesmo arquivo só é lido uma vez
+
+    :param arquivo: caminho para, caminho aberto ou dados a serem processados
+    :param tamanho_leitura: número de bytes lidos por vez
+    :return: hash hexadecimal dos conteúdos
+    """
+    global _CACHE_HASHES
+    chave = obtem_chave_arquivo(arquivo)
+    if chave is not None and chave in _CACHE_HASHES:
+        return _CACHE_HASHES[chave]
+
+    if isinstance(arquivo, (str, Path)):
+        with open(arquivo, "rb") as f:
+            return calcula_hash_arquivo(f, tamanho_leitura)
+
+    sha = hashlib.sha1()
+    for bloco in iter(lambda: arquivo.read(tamanho_leitura), b""):  # type: ignore
+        sha.update(bloco)
+
+    if chave is not None:
+        _CACHE_HASHES[chave] = sha.hexdigest()
+    return sha.hexdigest()
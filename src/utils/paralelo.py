@@ -0,0 +1,142 @@
+import typing
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from src.utils.interno import obtem_memoria_disponivel
+
+# tipos de pool disponíveis para execução paralela
+POOLS: typing.Dict[str, typing.Callable[..., Executor]] = {
+    "thread": ThreadPoolExecutor,
+    "processo": ProcessPoolExecutor,
+}
+
+# fração da memória disponível que pode ser ocupada por tarefas paralelas
+FRACAO_MEMORIA = 0.5
+
+Chave = typing.TypeVar("Chave", bound=typing.Hashable)
+
+
+def executa_com_limite_memoria(
+    funcao: typing.Callable,
+    argumentos: typing.Dict[Chave, typing.Tuple],
+    memoria: typing.Dict[Chave, int],
+    max_trabalhadores: int,
+    tipo_pool: str = "thread",
+    limite_memoria: typing.Union[int, None] = None,
+) -> typing.Dict[Chave, typing.Any]:
+    """
+    Executa uma função para cada conjunto de argumentos em um pool de
+    trabalhadores, limitando a memória estimada das tarefas em execução
+
+    Novas tarefas só são submetidas enquanto a soma da memória estimada
+    das tarefas em execução couber no limite de memória, de forma que
+    ao menos uma tarefa sempre estará sendo executada
+
+    :param funcao: função a ser executada
+    :param argumentos: dicionário com identificador e argumentos de cada tarefa
+    :param memoria: dicionário com identificador e memória estimada de cada tarefa
+    :param max_trabalhadores: número máximo de trabalhadores
+    :param tipo_pool: tipo de pool utilizado (thread ou processo)
+    :param limite_memoria: memória máxima, em bytes, das tarefas em execução,
+    sendo por padrão uma fração da memória disponível
+    :return: dicionário com identificador e resultado de cada tarefa
+    """
+    if tipo_pool not in POOLS:
+        raise ValueError(
+            f"O tipo de pool {tipo_pool} não é suportado, utilize um de {set(POOLS)}"
+        )
+    if limite_memoria is None:
+        disponivel = obtem_memoria_disponivel()
+        if disponivel is not None:
+            limite_memoria = int(disponivel * FRACAO_MEMORIA)
+
+    pendentes = list(argumentos)
+    resultados: typing.Dict[Chave, typing.Any] = dict()
+    em_execucao: typing.Dict[Future, Chave] = dict()
+    ocupada = 0
+    with POOLS[tipo_pool](max_workers=max_trabalhadores) as pool:
+        while len(pendentes) > 0 or len(em_execucao) > 0:
+            # submete novas tarefas enquanto houver trabalhadores e memória
+            while (
+                len(pendentes) > 0
+                and len(em_execucao) < max_trabalhadores
+                and (
+                    len(em_execucao) == 0
+                    or limite_memoria is None
+                    or ocupada + memoria[pendentes[0]] <= limite_memoria
+                )
+            ):
+                chave = pendentes.pop(0)
+                em_execucao[pool.submit(funcao, *argumentos[chave])] = chave
+                ocupada += memoria[chave]
+
+            # aguarda a finalização de alguma das tarefas em execução
+            finalizadas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+            for fut in finalizadas:
+                chave = em_execucao.pop(fut)
+                ocupada -= memoria[chave]
+                resultados[chave] = fut.result()
+
+    # mantém a ordem original das tarefas
+    return {chave: resultados[chave] for chave in argumentos}
+
+
+def executa_com_limite_grupo(
+    funcao: typing.Callable,
+    argumentos: typing.Dict[Chave, typing.Tuple],
+    grupos: typing.Mapping[Chave, typing.Hashable],
+    max_trabalhadores: int,
+    max_por_grupo: int,
+    tipo_pool: str = "thread",
+) -> typing.Dict[Chave, typing.Any]:
+    """
+    Executa uma função para cada conjunto de argumentos em um pool de
+    trabalhadores, limitando o número de tarefas de um mesmo grupo em
+    execução ao mesmo tempo
+
+    Novas tarefas são submetidas na ordem original, pulando as tarefas
+    cujo grupo já atingiu o limite, de forma que os trabalhadores livres
+    são ocupados por tarefas de outros grupos
+
+    :param funcao: função a ser executada
+    :param argumentos: dicionário com identificador e argumentos de cada tarefa
+    :param grupos: dicionário com identificador e grupo de cada tarefa
+    :param max_trabalhadores: número máximo de trabalhadores
+    :param max_por_grupo: número máximo de tarefas de um grupo em execução
+    :param tipo_pool: tipo de pool utilizado (thread ou processo)
+    :return: dicionário com identificador e resultado de cada tarefa
+    """
+    if tipo_pool not in POOLS:
+        raise ValueError(
+            f"O tipo de pool {tipo_pool} não é suportado, utilize um de {set(POOLS)}"
+        )
+
+    pendentes = list(argumentos)
+    resultados: typing.Dict[Chave, typing.Any] = dict()
+    em_execucao: typing.Dict[Future, Chave] = dict()
+    ocupados: typing.Dict[typing.Hashable, int] = dict()
+    with POOLS[tipo_pool](max_workers=max_trabalhadores) as pool:
+        while len(pendentes) > 0 or len(em_execucao) > 0:
+            # submete novas tarefas enquanto houver trabalhadores e grupos livres
+            for chave in list(pendentes):
+                if len(em_execucao) >= max_trabalhadores:
+                    break
+                if ocupados.get(grupos[chave], 0) >= max_por_grupo:
+                    continue
+                pendentes.remove(chave)
+                em_execucao[pool.submit(funcao, *argumentos[chave])] = chave
+                ocupados[grupos[chave]] = ocupados.get(grupos[chave], 0) + 1
+
+            # aguarda a finalização de alguma das tarefas em execução
+            finalizadas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+            for fut in finalizadas:
+                chave = em_execucao.pop(fut)
+                ocupados[grupos[chave]] -= 1
+                resultados[chave] = fut.result()
+
+    # mantém a ordem original das tarefas
+    return {chave: resultados[chave] for chave in argumentos}
@@ -1,11 +1,36 @@
+import json
+import os
+import threading
 import typing
 import urllib.request
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from pathlib import Path
 
 import bs4
 import requests
 from tqdm import tqdm
 
+from src.utils.interno import calcula_hash_arquivo
+
+# cache de links de páginas web por url e classe dos links, compartilhado
+# por todos os objetos do processo
+_CACHE_LINKS: typing.Dict[typing.Tuple[str, str], typing.List[str]] = dict()
+
+# tamanho padrão, em bytes, dos segmentos baixados em paralelo
+TAMANHO_SEGMENTO = 64 * 1024 * 1024
+
+# campos do estado de um download que identificam o arquivo sendo baixado
+CAMPOS_ESTADO = ["url", "tamanho", "validador", "tamanho_segmento"]
+
+# número máximo de arquivos baixados ao mesmo tempo, no total e por servidor
+MAX_DOWNLOADS = 4
+MAX_DOWNLOADS_HOST = 2
+
+# trava das barras de progresso compartilhadas entre downloads simultâneos
+_TRAVA_PROGRESSO = threading.Lock()
+
 
 def obtem_pagina(url: str) -> bs4.BeautifulSoup:
     """
@@ -19,10 +44,46 @@ def obtem_pagina(url: str) -> bs4.BeautifulSoup:
     return bs4.BeautifulSoup(res, features="html.parser")
 
 
+def obtem_links(url: str, classe: str = "external-link") -> typing.List[str]:
+    """
+    Obtém os endereços dos links de uma determinada classe de uma página
+    Web, guardando o resultado em cache para as demais consultas do processo
+
+    :param url: url para processar
+    :param classe: classe html dos links de interesse
+    :return: lista com os endereços dos links
+    """
+    global _CACHE_LINKS
+
+    chave = (url, classe)
+    if chave not in _CACHE_LINKS:
+        soup = obtem_pagina(url)
+        _CACHE_LINKS[chave] = [
+            str(tag["href"]) for tag in soup.find_all("a", {"class": classe})
+        ]
+    return list(_CACHE_LINKS[chave])
+
+
+def atualiza_progresso(progresso: tqdm, n: int, total: int = 0) -> None:
+    """
+    Atualiza uma barra de progresso que pode ser compartilhada por
+    downloads simultâneos, somando o tamanho de novos arquivos ao total
+
+    :param progresso: barra de progresso
+    :param n: número de bytes baixados
+    :param total: número de bytes a ser somado ao total da barra
+    """
+    with _TRAVA_PROGRESSO:
+        if total != 0:
+            progresso.total += total
+        progresso.update(n)
+
+
 def download_dados_web(
     caminho: typing.Union[str, Path, typing.IO[bytes], typing.BinaryIO],
     url: str,
     block_size: int = 300 * 1024,
+    progresso: typing.Optional[tqdm] = None,
 ) -> typing.Union[typing.IO[bytes], typing.BinaryIO]:
     """
     Realiza o download dos dados em um link da Web
@@ -30,6 +91,8 @@ def download_dados_web(
     :param caminho: caminho para extração dos dados
     :param url: endereço do site a ser baixado
     :param block_size: bloco em bytes para processar o arquivo
+    :param progresso: barra de progresso compartilhada com outros downloads
+    (uma barra própria é criada caso não seja fornecida)
     :return: objeto buffer para o arquivo
     """
     # garante que o caminho é um buffer para um arquivo local
@@ -43,11 +106,220 @@ def download_dados_web(
     total_size_in_bytes = int(response.headers.get("content-length", 0))
 
     # processa a base
-    progress_bar = tqdm(total=total_size_in_bytes, unit="iB", unit_scale=True)
+    if progresso is None:
+        progresso = tqdm(total=total_size_in_bytes, unit="iB", unit_scale=True)
+    else:
+        atualiza_progresso(progresso, 0, total_size_in_bytes)
     for data in response.iter_content(block_size):
-        progress_bar.update(len(data))
+        atualiza_progresso(progresso, len(data))
         arq.write(data)
     arq.close()
 
     # retorna o buffer
     return arq
+
+
+def obtem_info_download(url: str) -> typing.Dict[str, typing.Any]:
+    """
+    Consulta o tamanho, o validador de versão e o suporte a requisições
+    parciais de um arquivo na Web, sem baixar os seus conteúdos
+
+    :param url: endereço do arquivo
+    :return: dicionário com a url final, o tamanho, o validador e o
+    suporte a requisições parciais do arquivo
+    """
+    resposta = requests.head(url, allow_redirects=True)
+    resposta.raise_for_status()
+    return dict(
+        url=resposta.url,
+        tamanho=int(resposta.headers.get("content-length", 0)),
+        parcial=resposta.headers.get("accept-ranges", "").lower() == "bytes",
+        validador=resposta.headers.get(
+            "etag", resposta.headers.get("last-modified", "")
+        ),
+    )
+
+
+def baixa_segmento(
+    caminho: Path,
+    url: str,
+    inicio: int,
+    fim: int,
+    progresso: tqdm,
+    tentativas: int = 3,
+    block_size: int = 300 * 1024,
+    conexoes: typing.Optional[threading.Semaphore] = None,
+) -> None:
+    """
+    Baixa um segmento de um arquivo na Web através de uma requisição
+    parcial, escrevendo os dados na sua posição do arquivo local
+
+    :param caminho: caminho para o arquivo local, já alocado
+    :param url: endereço do arquivo
+    :param inicio: posição do primeiro byte do segmento
+    :param fim: posição do último byte do segmento
+    :param progresso: barra de progresso compartilhada pelos segmentos
+    :param tentativas: número de tentativas de download do segmento
+    :param block_size: bloco em bytes para processar o segmento
+    :param conexoes: semáforo que limita as conexões simultâneas ao servidor
+    """
+    for tentativa in range(tentativas):
+        escritos = 0
+        try:
+            with conexoes or nullcontext():
+                resposta = requests.get(
+                    url, headers={"Range": f"bytes={inicio}-{fim}"}, stream=True
+                )
+                resposta.raise_for_status()
+                if resposta.status_code != 206:
+                    raise ValueError(
+                        f"O servidor não devolveu o segmento {inicio}-{fim} de {url}"
+                    )
+
+                with open(caminho, "r+b") as arq:
+                    arq.seek(inicio)
+                    for data in resposta.iter_content(block_size):
+                        arq.write(data)
+                        escritos += len(data)
+                        atualiza_progresso(progresso, len(data))
+
+            if escritos != fim - inicio + 1:
+                raise ValueError(
+                    f"O segmento {inicio}-{fim} de {url} foi recebido com "
+                    f"{escritos} bytes"
+                )
+            return
+        except (requests.RequestException, ValueError):
+            atualiza_progresso(progresso, -escritos)
+            if tentativa == tentativas - 1:
+                raise
+
+
+def download_em_segmentos(
+    caminho: typing.Union[str, Path],
+    url: str,
+    tamanho_segmento: int = TAMANHO_SEGMENTO,
+    max_trabalhadores: int = 4,
+    hash_esperado: typing.Optional[str] = None,
+    tentativas: int = 3,
+    block_size: int = 300 * 1024,
+    progresso: typing.Optional[tqdm] = None,
+    conexoes: typing.Optional[threading.Semaphore] = None,
+) -> Path:
+    """
+    Realiza o download de um arquivo da Web dividindo-o em segmentos
+    baixados em paralelo através de requisições parciais
+
+    Os dados são escritos em um arquivo `.parcial` e os segmentos já
+    concluídos são registrados em um arquivo `.segmentos.json`, de forma
+    que um download interrompido é retomado a partir dos segmentos
+    pendentes. Caso o servidor não suporte requisições parciais, ou o
+    arquivo caiba em um único segmento, o download é feito em uma única
+    requisição. Downloads simultâneos de um mesmo servidor podem compartilhar
+    um semáforo de conexões, de forma que o limite de conexões ao servidor
+    vale para o total de segmentos em andamento e não para cada arquivo
+
+    :param caminho: caminho para o arquivo local
+    :param url: endereço do arquivo a ser baixado
+    :param tamanho_segmento: tamanho, em bytes, de cada segmento
+    :param max_trabalhadores: número máximo de segmentos baixados ao mesmo tempo
+    :param hash_esperado: hash sha1 esperado dos conteúdos do arquivo
+    :param tentativas: número de tentativas de download de cada segmento
+    :param block_size: bloco em bytes para processar o arquivo
+    :param progresso: barra de progresso compartilhada com outros downloads
+    (uma barra própria é criada caso não seja fornecida)
+    :param conexoes: semáforo que limita as conexões simultâneas ao servidor
+    :return: caminho para o arquivo baixado
+    """
+    caminho = Path(caminho)
+    parcial = caminho.with_name(f"{caminho.name}.parcial")
+    arq_estado = caminho.with_name(f"{caminho.name}.segmentos.json")
+
+    # servidores que não respondem a consultas HEAD são baixados diretamente
+    try:
+        with conexoes or nullcontext():
+            info = obtem_info_download(url)
+    except requests.RequestException:
+        info = dict(url=url, tamanho=0, parcial=False, validador="")
+    tamanho = info["tamanho"]
+    if not info["parcial"] or tamanho <= tamanho_segmento:
+        with conexoes or nullcontext():
+            download_dados_web(parcial, url, block_size, progresso)
+    else:
+        estado: typing.Dict[str, typing.Any] = dict(
+            url=url,
+            tamanho=tamanho,
+            validador=info["validador"],
+            tamanho_segmento=tamanho_segmento,
+            concluidos=list(),
+        )
+
+        # reaproveita os segmentos de um download interrompido do mesmo arquivo
+        if arq_estado.exists() and parcial.exists():
+            anterior = json.loads(arq_estado.read_text())
+            if (
+                all([anterior.get(c) == estado[c] for c in CAMPOS_ESTADO])
+                and parcial.stat().st_size == tamanho
+            ):
+                estado["concluidos"] = anterior["concluidos"]
+        if len(estado["concluidos"]) == 0:
+            with open(parcial, "wb") as arq:
+                arq.truncate(tamanho)
+            arq_estado.write_text(json.dumps(estado))
+
+        segmentos = {
+            inicio: min(inicio + tamanho_segmento, tamanho) - 1
+            for inicio in range(0, tamanho, tamanho_segmento)
+            if inicio not in estado["concluidos"]
+        }
+        concluido = tamanho - sum([f - i + 1 for i, f in segmentos.items()])
+
+        # o estado é salvo a cada segmento concluído, mesmo que outro falhe
+        erro: typing.Optional[BaseException] = None
+        barra = progresso
+        if barra is None:
+            barra = tqdm(total=0, unit="iB", unit_scale=True)
+        atualiza_progresso(barra, concluido, tamanho)
+        with ThreadPoolExecutor(max_workers=max_trabalhadores) as pool:
+            futuros = {
+                pool.submit(
+                    baixa_segmento,
+                    parcial,
+                    info["url"],
+                    inicio,
+                    fim,
+                    barra,
+                    tentativas,
+                    block_size,
+                    conexoes,
+                ): inicio
+                for inicio, fim in segmentos.items()
+            }
+            for fut in as_completed(futuros):
+                if fut.exception() is not None:
+                    erro = erro or fut.exception()
+                    continue
+                estado["concluidos"].append(futuros[fut])
+                arq_temp = arq_estado.with_name(f"{arq_estado.name}.tmp")
+                arq_temp.write_text(json.dumps(estado))
+                os.replace(arq_temp, arq_estado)
+        if progresso is None:
+            barra.close()
+        if erro is not None:
+            raise erro
+
+    # verifica o tamanho e o hash dos dados antes de disponibilizar o arquivo
+    if tamanho > 0 and parcial.stat().st_size != tamanho:
+        raise ValueError(
+            f"O arquivo {caminho} foi baixado com {parcial.stat().st_size} "
+            f"bytes, mas deveria ter {tamanho}"
+        )
+    if hash_esperado is not None and calcula_hash_arquivo(parcial) != hash_esperado:
+        parcial.unlink()
+        arq_estado.unlink(missing_ok=True)
+        raise ValueError(f"O hash do arquivo {caminho} não é {hash_esperado}")
+
+    os.replace(parcial, caminho)
+    if arq_estado.exists():
+        arq_estado.unlink()
+    return caminho